@@ -0,0 +1,60 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Scaling of the comparison backends on a 4K frame, as one region and as 16 regions.
+Run from the repository root:
+>python benchmarks/compare_backends.py
+"""
+
+import os
+import sys
+import timeit
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from autoscanner.tools.region import Region
+from autoscanner.tools.backends import ThreadBackend, ProcessPoolBackend
+
+WIDTH = 3840
+HEIGHT = 2160
+WORKERS = [1, 2, 4, 8]
+REPEAT = 5
+
+
+def layouts():
+    single = [Region("full", 0, 0, WIDTH, HEIGHT, 100.0)]
+    grid = [
+        Region("r{0}{1}".format(row, col), col * WIDTH // 4, row * HEIGHT // 4, WIDTH // 4, HEIGHT // 4, 100.0)
+        for row in range(4) for col in range(4)
+    ]
+    return [("1 region", single), ("16 regions", grid)]
+
+
+def measure(backend, arr_init, arr_cyclic, regions):
+    backend.start(arr_init, regions)
+    try:
+        backend.compare(arr_cyclic)  # warm up
+        return min(timeit.repeat(lambda: backend.compare(arr_cyclic), number=1, repeat=REPEAT))
+    finally:
+        backend.stop()
+
+
+def main():
+    random = numpy.random.RandomState(0)
+    arr_init = random.randint(0, 256, (HEIGHT, WIDTH, 3)).astype(numpy.uint8)
+    arr_cyclic = random.randint(0, 256, (HEIGHT, WIDTH, 3)).astype(numpy.uint8)
+
+    for name, regions in layouts():
+        reference = measure(ThreadBackend(), arr_init, arr_cyclic, regions)
+        print("{0}, thread: {1:.1f} ms".format(name, reference * 1000))
+
+        for workers in WORKERS:
+            elapsed = measure(ProcessPoolBackend(workers), arr_init, arr_cyclic, regions)
+            print("{0}, {1} process(es): {2:.1f} ms, x{3:.2f}".format(
+                name, workers, elapsed * 1000, reference / elapsed))
+
+if __name__ == "__main__":
+    main()
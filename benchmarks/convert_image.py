@@ -0,0 +1,64 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Compares the PNG round-trip conversion with the zero-copy conversion of QImages.
+Run from the repository root:
+>python benchmarks/convert_image.py
+"""
+
+import os
+import sys
+import timeit
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PySide import QtGui, QtCore
+from autoscanner.tools.scantools import ScanTools
+
+SIZES = [(320, 240), (1920, 1080), (3840, 2160)]
+REPEAT = 5
+
+
+def synthetic_image(width, height):
+    pixels = numpy.random.RandomState(0).randint(0, 256, (height, width, 4)).astype(numpy.uint8)
+    pixels[:, :, 3] = 255
+    img = QtGui.QImage(pixels.tostring(), width, height, QtGui.QImage.Format_RGB32)
+    return img.copy()  # detach from the numpy buffer
+
+
+def png_extra_bytes(img):
+    # encoded PNG, its cStringIO copy and the decoded PIL image
+    buffer1 = QtCore.QBuffer()
+    buffer1.open(QtCore.QIODevice.ReadWrite)
+    img.save(buffer1, "PNG")
+    encoded = buffer1.data().size()
+    buffer1.close()
+    return 2 * encoded + img.width() * img.height() * 3
+
+
+def array_extra_bytes(img):
+    arr = ScanTools.convert_image(img)
+    return 0 if numpy.may_share_memory(arr, ScanTools.image_buffer(img)) else arr.nbytes
+
+
+def main():
+    for width, height in SIZES:
+        img = synthetic_image(width, height)
+
+        png_time = min(timeit.repeat(lambda: numpy.asarray(ScanTools.convert_image_png(img)), number=1, repeat=REPEAT))
+        arr_time = min(timeit.repeat(lambda: ScanTools.convert_image(img), number=1, repeat=REPEAT))
+
+        print("{0}x{1}: png {2:.2f} ms, array {3:.3f} ms, speedup x{4:.0f}, extra memory {5} -> {6} bytes".format(
+            width, height,
+            png_time * 1000,
+            arr_time * 1000,
+            png_time / arr_time,
+            png_extra_bytes(img),
+            array_extra_bytes(img)
+        ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Cold-start import cost of the entry points, per module.
+Every measure runs in a fresh interpreter; the slowest modules are listed
+with their own import time and the time including the modules they import.
+Results are written as JSON and can be compared with a previous run.
+Run from the repository root:
+>python benchmarks/startup.py --output startup.json
+>python benchmarks/startup.py --baseline startup.json
+"""
+
+import os
+import sys
+import json
+import timeit
+import argparse
+import subprocess
+import __builtin__
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+TARGETS = [
+    ("gui", "autoscanner.app"),
+    ("headless", "autoscanner.daemon"),
+    ("core", "autoscanner.tools.imageprocessor"),
+]
+REPEAT = 3
+TOP = 15
+REGRESSION = 1.10  # slower than the baseline by more than 10%
+
+
+def measure_imports(module_name):
+    # wraps __import__, only the calls that load new modules are accounted for
+    original_import = __builtin__.__import__
+    children = []
+    own_times = {}
+    total_times = {}
+
+    def timed_import(name, *args, **kwargs):
+        loaded = len(sys.modules)
+        children.append(0.0)
+        started = timeit.default_timer()
+        try:
+            return original_import(name, *args, **kwargs)
+        finally:
+            elapsed = timeit.default_timer() - started
+            nested = children.pop()
+            if children:
+                children[-1] += elapsed
+
+            if len(sys.modules) != loaded:
+                own_times[name] = own_times.get(name, 0.0) + elapsed - nested
+                total_times[name] = total_times.get(name, 0.0) + elapsed
+
+    sys.path.insert(0, SRC)
+    __builtin__.__import__ = timed_import
+    started = timeit.default_timer()
+    try:
+        __import__(module_name)
+        error = None
+    except ImportError as e:
+        error = str(e)
+    finally:
+        total = timeit.default_timer() - started
+        __builtin__.__import__ = original_import
+
+    return {
+        "total_ms": total * 1000,
+        "error": error,
+        "modules": dict(
+            (name, {"own_ms": own_times[name] * 1000, "total_ms": total_times[name] * 1000})
+            for name in own_times
+        )
+    }
+
+
+def run_target(module_name):
+    # fastest of several cold starts, each in a fresh interpreter
+    runs = [
+        json.loads(subprocess.check_output([sys.executable, os.path.abspath(__file__), "--module", module_name]))
+        for _ in range(REPEAT)
+    ]
+    return min(runs, key=lambda run: run["total_ms"])
+
+
+def report(name, result, stream):
+    if result["error"]:
+        stream.write("{0}: import failed: {1}\n".format(name, result["error"]))
+
+    stream.write("{0}: {1:.1f} ms\n".format(name, result["total_ms"]))
+    slowest = sorted(result["modules"].items(), key=lambda item: item[1]["own_ms"], reverse=True)[:TOP]
+    for module_name, times in slowest:
+        stream.write("  {0:<45} own {1:8.1f} ms  total {2:8.1f} ms\n".format(
+            module_name, times["own_ms"], times["total_ms"]))
+
+
+def compare_runs(results, baseline, stream):
+    for name, result in sorted(results.items()):
+        if name not in baseline or not baseline[name]["total_ms"]:
+            continue
+
+        ratio = result["total_ms"] / baseline[name]["total_ms"]
+        stream.write("{0:<10} {1:8.1f} ms -> {2:8.1f} ms  x{3:.2f}{4}\n".format(
+            name, baseline[name]["total_ms"], result["total_ms"], ratio, "  SLOWER" if ratio > REGRESSION else ""))
+
+        new_modules = sorted(set(result["modules"]) - set(baseline[name]["modules"]))
+        if new_modules:
+            stream.write("  newly imported: {0}\n".format(", ".join(new_modules)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cost of the entry points")
+    parser.add_argument("--output", help="JSON file receiving the results")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--module", help=argparse.SUPPRESS)  # single measure, run in a child process
+    args = parser.parse_args()
+
+    if args.module:
+        print(json.dumps(measure_imports(args.module)))
+        return
+
+    results = dict((name, run_target(module_name)) for name, module_name in TARGETS)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    for name, _ in TARGETS:
+        report(name, results[name], sys.stdout)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            compare_runs(results, json.load(baseline_file), sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Benchmark suite of the scan hot path on synthetic frames, headless.
+Every case (frame size, channel count, changed fraction) runs in its own process
+so that its peak memory is not inflated by the previous ones.
+Results are written as JSON and can be compared with a previous run.
+Run from the repository root:
+>python benchmarks/suite.py --output results.json
+>python benchmarks/suite.py --output new.json --baseline results.json
+"""
+
+import os
+import sys
+import json
+import timeit
+import logging
+import platform
+import argparse
+import subprocess
+import multiprocessing
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PIL import Image
+from autoscanner.tools.diffengine import DiffEngine
+from autoscanner.tools.capture import ArraySource
+
+try:
+    import resource
+except ImportError:
+    resource = None  # not available on Windows, peak memory is then not reported
+
+try:
+    from PySide import QtGui
+    from autoscanner.tools.scantools import ScanTools
+    from autoscanner.tools.imageprocessor import ImageProcessor
+except ImportError:
+    QtGui = None  # QImage conversion and full cycles need PySide
+
+SIZES = [
+    ("320x240", 320, 240),
+    ("1080p", 1920, 1080),
+    ("4K", 3840, 2160),
+    ("3x1080p", 5760, 1080),  # three monitors side by side
+]
+CHANNELS = [3, 4]
+CHANGE_RATIOS = [0.0, 0.01, 0.5]
+REPEAT = 5
+CYCLES = 10
+CYCLE_TIME = 0.000001  # every cycle overruns its slot, so the scheduler never waits
+REGRESSION = 1.10  # slower than the baseline by more than 10%
+
+
+def synthetic_frames(width, height, channels, change_ratio):
+    random = numpy.random.RandomState(0)
+    baseline = random.randint(0, 256, (height, width, channels)).astype(numpy.uint8)
+    if channels == 4:
+        baseline[:, :, 3] = 255
+
+    # the changed fraction is a band of rows at the top, with inverted colors
+    cyclic = baseline.copy()
+    rows = int(round(height * change_ratio))
+    cyclic[:rows, :, :3] = 255 - cyclic[:rows, :, :3]
+    return baseline, cyclic
+
+
+def qimage(arr):
+    # 32 bits per pixel image in the byte order of the screen formats
+    height, width, channels = arr.shape
+    xrgb = numpy.empty((height, width, 4), dtype=numpy.uint8)
+    xrgb[:, :, ScanTools.RGB_CHANNELS] = arr[:, :, :3]
+    xrgb[:, :, ScanTools.RGBA_CHANNELS[3]] = arr[:, :, 3] if channels == 4 else 255
+
+    img_format = QtGui.QImage.Format_ARGB32 if channels == 4 else QtGui.QImage.Format_RGB32
+    return QtGui.QImage(xrgb.tostring(), width, height, img_format).copy()  # detach from the numpy buffer
+
+
+def timed(func, repeat=REPEAT):
+    func()  # warm up
+    times = timeit.repeat(func, number=1, repeat=repeat)
+    return {"min_ms": min(times) * 1000, "mean_ms": sum(times) / len(times) * 1000}
+
+
+def cycle(baseline, cyclic):
+    # capture, fingerprint and compare stages of the image processor, without waiting between cycles
+    processor = ImageProcessor()
+    processor.config(
+        100.0,
+        CYCLE_TIME,
+        ArraySource([baseline] + [cyclic] * CYCLES),
+        queue_policy="block"
+    )
+
+    def run():
+        processor.exiting = False
+        processor.process()
+
+    times = timeit.repeat(run, number=1, repeat=REPEAT)
+    return {"min_ms": min(times) / CYCLES * 1000, "mean_ms": sum(times) / len(times) / CYCLES * 1000}
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on Mac OS X
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def run_case(case):
+    baseline, cyclic = synthetic_frames(case["width"], case["height"], case["channels"], case["change_ratio"])
+    pil_mode = "RGBA" if case["channels"] == 4 else "RGB"
+    pil_image = Image.frombuffer(pil_mode, (case["width"], case["height"]), cyclic.tostring(), "raw", pil_mode, 0, 1)
+
+    stages = {
+        "convert_pil": timed(lambda: DiffEngine.as_array(pil_image)),
+        "compare": timed(lambda: DiffEngine.score(baseline, cyclic)),  # kernel of ScanTools.compare_images
+    }
+
+    if QtGui is not None:
+        img = qimage(cyclic)
+        stages["convert_qimage"] = timed(lambda: ScanTools.convert_image(img))
+        stages["cycle"] = cycle(baseline, cyclic)
+
+    megapixels = case["width"] * case["height"] / 1e6
+    for stage in stages.values():
+        stage["mpixels_per_s"] = megapixels / (stage["min_ms"] / 1000) if stage["min_ms"] > 0 else None
+
+    result = dict(case)
+    result["stages"] = stages
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+def cases():
+    for size_name, width, height in SIZES:
+        for channels in CHANNELS:
+            for change_ratio in CHANGE_RATIOS:
+                yield {
+                    "name": "{0} {1}ch {2:g}%".format(size_name, channels, change_ratio * 100),
+                    "width": width,
+                    "height": height,
+                    "channels": channels,
+                    "change_ratio": change_ratio
+                }
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+        "qt": QtGui is not None
+    }
+
+
+def compare_runs(results, baseline, stream):
+    previous = dict((result["name"], result) for result in baseline["results"])
+
+    for result in results["results"]:
+        if result["name"] not in previous:
+            continue
+
+        for stage_name, stage in sorted(result["stages"].items()):
+            old_stage = previous[result["name"]]["stages"].get(stage_name)
+            if old_stage is None or not old_stage["min_ms"]:
+                continue
+
+            ratio = stage["min_ms"] / old_stage["min_ms"]
+            stream.write("{0:<20} {1:<15} {2:9.3f} ms -> {3:9.3f} ms  x{4:.2f}{5}\n".format(
+                result["name"], stage_name, old_stage["min_ms"], stage["min_ms"], ratio,
+                "  SLOWER" if ratio > REGRESSION else ""
+            ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of the scan hot path")
+    parser.add_argument("--output", help="JSON file receiving the results, default is standard output")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--case", help=argparse.SUPPRESS)  # single case, run in a child process
+    args = parser.parse_args()
+
+    if args.case:
+        logging.basicConfig(level=logging.ERROR)  # missed deadlines are expected here
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+
+    results = {"environment": environment(), "results": []}
+    for case in cases():
+        sys.stderr.write("{0}...\n".format(case["name"]))
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)])
+        results["results"].append(json.loads(output))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            # keep standard output parseable when the results are written there
+            compare_runs(results, json.load(baseline_file), sys.stdout if args.output else sys.stderr)
+
+if __name__ == "__main__":
+    main()
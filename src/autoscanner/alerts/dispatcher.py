@@ -0,0 +1,195 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import time
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from PySide import QtCore
+
+log = logging.getLogger(__name__)
+
+
+class AlertDispatcher(QtCore.QObject):
+    """
+    Fans every alert out to the sinks, each sink is called from its own worker thread
+    so that a slow sink, or one beeping until silenced, never delays the others.
+    The alerts are delivered to a sink one after the other, in order.
+    Alerts following a delivered one within the coalescing window are merged and
+    delivered once, when the window ends.
+    """
+
+    STOP_TIMEOUT = 60.0  # seconds given to the pending deliveries when quitting
+
+    delivered = QtCore.Signal(str, bool)  # sink name, delivered
+
+    def __init__(self, sinks=None, coalesce_window=0.0, parent=None):
+        """
+        :param sinks: list of AlertSink, can be replaced between two alerts
+        :param coalesce_window: seconds during which the following alerts are merged, 0 to deliver them all
+        """
+        super(AlertDispatcher, self).__init__(parent)
+
+        self._sinks = list(sinks or [])
+        self.coalesce_window = coalesce_window
+
+        self.lock = threading.Lock()
+        self.pools = {}  # single worker pool of each sink, created on its first delivery
+        self.retired_pools = []  # (sink, pool) of the removed sinks, whose deliveries may not be done yet
+        self.window_end = None
+        self.pending = None
+        self.timer = None
+
+    @property
+    def sinks(self):
+        return self._sinks
+
+    @sinks.setter
+    def sinks(self, sinks):
+        self._sinks = list(sinks)
+
+        with self.lock:
+            for sink in list(self.pools):
+                if sink not in self._sinks:
+                    # the deliveries in progress to a removed sink complete in its retired pool
+                    pool = self.pools.pop(sink)
+                    pool.close()
+                    self.retired_pools.append((sink, pool))
+
+    def dispatch(self, alert):
+        """
+        Delivers an alert to all the sinks, or merges it with the pending one, never blocks
+        :param alert: Alert
+        :return: None
+        """
+        now = time.time()
+        with self.lock:
+            if self.window_end is not None and now < self.window_end:
+                self.pending = alert if self.pending is None else self.pending.merged(alert)
+                if self.timer is None:
+                    self.timer = threading.Timer(self.window_end - now, self._flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+
+            if self.coalesce_window > 0:
+                self.window_end = now + self.coalesce_window
+
+        self._deliver(alert)
+
+    def _flush(self, stopping=False):
+        with self.lock:
+            alert, self.pending = self.pending, None
+            self.timer = None
+            if alert is not None and self.coalesce_window > 0:
+                # the merged alert opens a new window
+                self.window_end = time.time() + self.coalesce_window
+
+        if alert is not None:
+            sinks = [sink for sink in self.sinks if sink.deliver_on_stop] if stopping else self.sinks
+            self._deliver(alert, sinks)
+
+    def _deliver(self, alert, sinks=None):
+        sinks = list(self.sinks if sinks is None else sinks)
+        if not sinks:
+            return
+
+        with self.lock:
+            # the timer thread delivers too
+            for sink in sinks:
+                if sink not in self.pools:
+                    self.pools[sink] = ThreadPool(1)
+                self.pools[sink].apply_async(self._send, (sink, alert))
+
+    def _send(self, sink, alert):
+        try:
+            result = bool(sink.send(alert))
+        except Exception:
+            log.exception("alert sink %s failed", sink.name)
+            result = False
+
+        self.delivered.emit(sink.name, result)
+
+    @staticmethod
+    def _close(sink, pool):
+        # a sink is only closed once nothing is being delivered to it any more
+        pool.join()
+        sink.close()
+
+    def stop(self, timeout=None):
+        """
+        Delivers the pending alert to the sinks that still deliver when stopping,
+        interrupts the other ones and waits for the deliveries in progress.
+        The sinks are closed once their deliveries are done, even after the timeout.
+        :param timeout: seconds to wait for the deliveries, None to wait until done
+        :return: None
+        """
+        with self.lock:
+            timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()
+
+        for sink in self.sinks:
+            if not sink.deliver_on_stop:
+                sink.interrupt()
+        self._flush(stopping=True)
+
+        with self.lock:
+            for pool in self.pools.values():
+                pool.close()
+            pools, self.pools, self.retired_pools = self.retired_pools + self.pools.items(), {}, []
+
+        # ThreadPool.join has no timeout, waiting from helper threads bounds it
+        closers = []
+        for sink, pool in pools:
+            closer = threading.Thread(target=AlertDispatcher._close, args=(sink, pool))
+            closer.daemon = True
+            closer.start()
+            closers.append((sink, closer))
+
+        deadline = None if timeout is None else time.time() + timeout
+        for sink, closer in closers:
+            closer.join(None if deadline is None else max(0.0, deadline - time.time()))
+            if closer.is_alive():
+                log.warning("alert sink %s is still delivering, it is closed once done", sink.name)
+
+        delivering = [sink for sink, _ in pools]
+        for sink in self.sinks:
+            if sink not in delivering:
+                sink.close()
+
+        with self.lock:
+            self.window_end = None
+
+
+def main():
+    import sys
+    from autoscanner.alerts.sinks import Alert, AlertSink
+
+    class SlowSink(AlertSink):
+        name = "slow"
+
+        def send(self, alert):
+            time.sleep(1.0)
+            sys.stdout.write("slow: {0} x{1}\n".format(alert.message, alert.count))
+            return True
+
+    class FastSink(AlertSink):
+        name = "fast"
+
+        def send(self, alert):
+            sys.stdout.write("fast: {0} x{1}\n".format(alert.message, alert.count))
+            return True
+
+    dispatcher = AlertDispatcher([SlowSink(), FastSink()], coalesce_window=0.5)
+    for i in range(5):
+        dispatcher.dispatch(Alert("Test", "alert {0}".format(i), ["main"]))
+        time.sleep(0.2)
+    dispatcher.stop()
+
+if __name__ == "__main__":
+    main()
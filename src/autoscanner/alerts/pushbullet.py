@@ -4,67 +4,198 @@ Created on 29 nov. 2015
 @author: Valtyr Farshield
 """
 
-import requests
 import json
+import time
+import logging
+import threading
+import Queue
 
 from PySide import QtCore
 
+log = logging.getLogger(__name__)
+
+
+class PushBulletClient(object):
+    """
+    Pushbullet API client keeping its connection open between notifications,
+    with timeouts and retries of the temporary failures
+    """
+    URL = "https://api.pushbullet.com/v2/pushes"
+    TIMEOUT = (5.0, 10.0)  # seconds for connecting, seconds between two received bytes
+    RETRIES = 4            # attempts after the first one
+    BACKOFF = 0.5          # seconds before the first retry, doubled for every other one
+    MAX_BACKOFF = 30.0     # seconds
+
+    def __init__(self, url=URL, timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF):
+        """
+        :param url: pushes endpoint, can point to a local stand-in
+        :param timeout: (connect timeout, read timeout) in seconds
+        :param retries: number of retries of a failed notification
+        :param backoff: delay before the first retry in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = None
+
+    def _delay(self, attempt, resp=None):
+        # exponential backoff, unless the server tells how long to wait
+        delay = self.backoff * 2 ** attempt
+        if resp is not None and resp.headers.get("Retry-After", "").isdigit():
+            delay = float(resp.headers["Retry-After"])
+        return min(delay, PushBulletClient.MAX_BACKOFF)
+
+    def push_note(self, access_token, title, body):
+        """
+        Sends a note, blocks until it is sent or given up
+        :param access_token: API Key
+        :param title: Title of message
+        :param body: Body of message
+        :return: True if the message was successfully sent
+        """
+        import requests  # only loaded when the first notification is sent
+
+        if self.session is None:
+            # pooled connection, the TCP and TLS handshakes are only paid once
+            self.session = requests.Session()
+
+        data_send = json.dumps({"type": "note", "title": title, "body": body})
+        headers = {"Authorization": "Bearer " + access_token, "Content-Type": "application/json"}
+
+        for attempt in range(self.retries + 1):
+            resp = None
+            try:
+                resp = self.session.post(self.url, data=data_send, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                log.warning("notification attempt %d failed: %s", attempt + 1, e)
+            else:
+                if resp.status_code == 200:
+                    return True
+
+                if resp.status_code != 429 and resp.status_code < 500:
+                    # rejected (bad key, bad request), retrying would not help
+                    log.error("notification rejected with status %d", resp.status_code)
+                    return False
+
+                log.warning("notification attempt %d failed with status %d", attempt + 1, resp.status_code)
+
+            if attempt < self.retries:
+                time.sleep(self._delay(attempt, resp))
+
+        return False
+
+    def close(self):
+        """
+        Closes the pooled connection
+        :return: None
+        """
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+
 class PushBullet(QtCore.QObject):
     """
-    Push Notification System
+    Push Notification System, sends the queued notifications one after the other
+    from its own thread, so that the callers never wait
     """
 
+    STOP_TIMEOUT = 60.0  # seconds given to the queued notifications when quitting
+
     finished = QtCore.Signal(bool)
 
-    def __init__(self, parent=None):
+    def __init__(self, url=None, parent=None):
+        """
+        :param url: pushes endpoint, defaults to the Pushbullet API
+        """
         super(PushBullet, self).__init__(parent)
 
-        self.access_token = None
-        self.title = None
-        self.body = None
+        self.url = url or PushBulletClient.URL
+        self.queue = None
+        self.thread = None
 
-    def set_message(self, access_token, title, body):
+    def send(self, access_token, title, body):
         """
-        Constructs the notification to be sent
+        Queues a notification, finished is emitted once it is sent or given up
         :param access_token: API Key
         :param title: Title of message
         :param body: Body of message
         :return: None
         """
-        self.access_token = access_token
-        self.title = title
-        self.body = body
-
-    def _send_notification(self):
+        if self.thread is None:
+            # a thread left running by a timed out stop keeps its own queue and connection
+            self.queue = Queue.Queue()
+            self.thread = threading.Thread(
+                target=self._run, args=(self.queue, PushBulletClient(self.url)), name="pushbullet"
+            )
+            self.thread.daemon = True
+            self.thread.start()
+
+        self.queue.put((access_token, title, body))
+
+    def _run(self, queue, client):
+        try:
+            while True:
+                message = queue.get()
+                if message is None:
+                    break
+
+                access_token, title, body = message
+                if access_token and title is not None and body is not None:
+                    self.finished.emit(client.push_note(access_token, title, body))
+                else:
+                    self.finished.emit(False)
+        finally:
+            client.close()
+
+    def stop(self, timeout=None):
         """
-        Send notification via PushBullet
-        :return: True if the message was successfully sent
+        Sends the queued notifications then ends the sending thread
+        :param timeout: seconds to wait for the thread, None to wait until done
+        :return: None
         """
-
-        if self.access_token != None and self.title != None and self.body != None:
-            data_send = {"type": "note", "title": self.title, "body": self.body}
-
-            resp = requests.post(
-                'https://api.pushbullet.com/v2/pushes',
-                data=json.dumps(data_send),
-                headers={'Authorization': 'Bearer ' + self.access_token, 'Content-Type': 'application/json'}
-            )
-
-            if resp.status_code == 200:
-                return True
-
-        return False
-
-    def process(self):
-        response = self._send_notification()
-        self.finished.emit(response)
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+            self.queue = None
 
 
 def main():
-    ACCESS_TOKEN = "your-api-key-here"
-    push_bullet = PushBullet()
-    push_bullet.set_message(ACCESS_TOKEN, "Test", "Test")
-    push_bullet.process()
+    import sys
+    import BaseHTTPServer
+
+    if len(sys.argv) > 1:
+        # real notification: python pushbullet.py <api-key>
+        url = PushBulletClient.URL
+        access_token = sys.argv[1]
+    else:
+        # local stand-in for the endpoint, failing twice before accepting
+        class StandIn(BaseHTTPServer.BaseHTTPRequestHandler):
+            statuses = [503, 429, 200]
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.getheader("Content-Length")))
+                self.send_response(StandIn.statuses.pop(0) if len(StandIn.statuses) > 1 else 200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write("{}")
+
+        server = BaseHTTPServer.HTTPServer(("127.0.0.1", 0), StandIn)
+        stand_in = threading.Thread(target=server.serve_forever)
+        stand_in.daemon = True
+        stand_in.start()
+
+        url = "http://127.0.0.1:{0}/v2/pushes".format(server.server_port)
+        access_token = "stand-in"
+
+    logging.basicConfig(level=logging.INFO)
+    push_bullet = PushBullet(url)
+    push_bullet.finished.connect(lambda response: sys.stdout.write("sent: {0}\n".format(response)))
+    push_bullet.send(access_token, "Test", "Test")
+    push_bullet.send(access_token, "Test", "Second test")
+    push_bullet.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,289 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import subprocess
+
+from autoscanner.alerts.pushbullet import PushBulletClient
+from autoscanner.alerts.soundalert import SoundAlert
+
+log = logging.getLogger(__name__)
+
+
+class Alert(object):
+    """
+    Threshold event delivered to the alert sinks
+    """
+    def __init__(self, title, message, regions=None, timestamp=None, details=None):
+        """
+        :param title: short description
+        :param message: full description
+        :param regions: names of the regions whose threshold was exceeded
+        :param timestamp: time of the event in seconds, defaults to now
+        :param details: dict of additional JSON-compatible information
+        """
+        self.title = title
+        self.message = message
+        self.regions = list(regions or [])
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.last_timestamp = self.timestamp
+        self.count = 1
+        self.details = details or {}
+
+    def merged(self, other):
+        """
+        Single alert standing for this one and a later one
+        :param other: later Alert
+        :return: new Alert
+        """
+        alert = Alert(other.title, other.message, self.regions, self.timestamp,
+                      Alert.merged_details(self.details, other.details))
+        alert.regions.extend(region for region in other.regions if region not in alert.regions)
+        alert.last_timestamp = other.last_timestamp
+        alert.count = self.count + other.count
+        return alert
+
+    @staticmethod
+    def merged_details(details, other):
+        """
+        Details of two alerts, the values of a key found in both are combined:
+        dicts are merged, lists concatenated and other values listed
+        :param details: details of the earlier alert
+        :param other: details of the later alert
+        :return: new dict
+        """
+        merged = dict(details)
+        for key, value in other.items():
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(merged[key], dict) and isinstance(value, dict):
+                merged[key] = Alert.merged_details(merged[key], value)
+            elif isinstance(merged[key], list) and isinstance(value, list):
+                merged[key] = merged[key] + value
+            elif merged[key] != value:
+                previous = merged[key] if isinstance(merged[key], list) else [merged[key]]
+                merged[key] = previous + [value]
+
+        return merged
+
+    def as_dict(self):
+        return {
+            "title": self.title,
+            "message": self.message,
+            "regions": self.regions,
+            "timestamp": self.timestamp,
+            "last_timestamp": self.last_timestamp,
+            "count": self.count,
+            "details": self.details
+        }
+
+
+class AlertSink(object):
+    """
+    Destination of the alerts, called from a worker thread of the dispatcher
+    """
+    name = "sink"
+    deliver_on_stop = True  # the pending alert is still delivered when the dispatcher stops
+
+    def send(self, alert):
+        """
+        Delivers an alert, may block
+        :param alert: Alert
+        :return: True if the alert was delivered
+        """
+        raise NotImplementedError
+
+    def interrupt(self):
+        """
+        Cuts the deliveries in progress short, called from another thread when the dispatcher
+        stops if the sink does not deliver on stop
+        :return: None
+        """
+        pass
+
+    def close(self):
+        """
+        Releases the resources of the sink
+        :return: None
+        """
+        pass
+
+
+class PushSink(AlertSink):
+    """
+    Pushbullet notification
+    """
+    name = "push"
+
+    def __init__(self, access_token, title=None, body=None, url=None):
+        """
+        :param access_token: API Key
+        :param title: title of the notification, defaults to the title of the alert
+        :param body: body of the notification, defaults to the message of the alert
+        :param url: pushes endpoint, defaults to the Pushbullet API
+        """
+        self.access_token = access_token
+        self.title = title
+        self.body = body
+        self.client = PushBulletClient(url or PushBulletClient.URL)
+
+    def send(self, alert):
+        body = self.body if self.body is not None else alert.message
+        if alert.count > 1:
+            body = "{0}\n({1} alerts)".format(body, alert.count)
+
+        return self.client.push_note(self.access_token, self.title or alert.title, body)
+
+    def close(self):
+        self.client.close()
+
+
+class CommandSink(AlertSink):
+    """
+    Local command, the alert is passed through AUTOSCANNER_* environment variables
+    """
+    name = "command"
+
+    def __init__(self, command):
+        """
+        :param command: shell command line
+        """
+        self.command = command
+
+    def send(self, alert):
+        env = dict(os.environ)
+        env["AUTOSCANNER_TITLE"] = alert.title.encode("utf-8")
+        env["AUTOSCANNER_MESSAGE"] = alert.message.encode("utf-8")
+        env["AUTOSCANNER_REGIONS"] = ",".join(alert.regions).encode("utf-8")
+        env["AUTOSCANNER_COUNT"] = str(alert.count)
+        env["AUTOSCANNER_ALERT"] = json.dumps(alert.as_dict())
+
+        return_code = subprocess.call(self.command, shell=True, env=env)
+        if return_code != 0:
+            log.error("alert command exited with status %d", return_code)
+
+        return return_code == 0
+
+
+class WebhookSink(AlertSink):
+    """
+    HTTP POST of the alert as JSON
+    """
+    name = "webhook"
+
+    TIMEOUT = (5.0, 10.0)  # seconds for connecting, seconds between two received bytes
+
+    def __init__(self, url, timeout=TIMEOUT):
+        """
+        :param url: endpoint receiving the alerts
+        :param timeout: (connect timeout, read timeout) in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+        self.session = None
+
+    def send(self, alert):
+        import requests  # only loaded when the first alert is sent
+
+        if self.session is None:
+            self.session = requests.Session()
+
+        try:
+            resp = self.session.post(
+                self.url,
+                data=json.dumps(alert.as_dict()),
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            log.error("webhook failed: %s", e)
+            return False
+
+        if resp.status_code >= 300:
+            log.error("webhook failed with status %d", resp.status_code)
+
+        return resp.status_code < 300
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+
+class FileLogSink(AlertSink):
+    """
+    One JSON line per alert, appended to a file
+    """
+    name = "log"
+
+    def __init__(self, path):
+        """
+        :param path: log file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+    def send(self, alert):
+        with self.lock:
+            with open(self.path, "a") as log_file:
+                log_file.write(json.dumps(alert.as_dict()) + "\n")
+
+        return True
+
+
+class AudioSink(AlertSink):
+    """
+    Beeps, a few times or until silenced
+    """
+    name = "audio"
+    deliver_on_stop = False  # nobody is left to hear the beeps
+
+    def __init__(self, repeat=3, interval=SoundAlert.TIME_OFF / 1000.0):
+        """
+        :param repeat: number of beeps, None to beep until silenced
+        :param interval: seconds between two beeps
+        """
+        self.repeat = repeat
+        self.interval = interval
+        self.condition = threading.Condition()
+        self.silenced_at = None
+
+    def _silenced(self, alert):
+        # a silence only applies to the alerts it came after, a later alert beeps again
+        return self.silenced_at is not None and self.silenced_at >= alert.last_timestamp
+
+    def send(self, alert):
+        beeps = 0
+        while self.repeat is None or beeps < self.repeat:
+            with self.condition:
+                if self._silenced(alert):
+                    break
+
+            SoundAlert.beep()
+            beeps += 1
+
+            with self.condition:
+                if not self._silenced(alert):
+                    self.condition.wait(self.interval)
+
+        return True
+
+    def silence(self):
+        """
+        Stops beeping for the alerts raised until now, including the ones not delivered yet,
+        can be called from any thread
+        :return: None
+        """
+        with self.condition:
+            self.silenced_at = time.time()
+            self.condition.notify_all()
+
+    def interrupt(self):
+        self.silence()
@@ -6,8 +6,7 @@ Created on 29 nov. 2015
 
 import sys
 import time
-import winsound
-from PySide import QtGui, QtCore
+from PySide import QtCore
 
 
 class SoundAlert(QtCore.QObject):
@@ -26,6 +25,19 @@ class SoundAlert(QtCore.QObject):
 
         self.exiting = False
 
+    @staticmethod
+    def beep():
+        try:
+            import winsound
+        except ImportError:
+            # not on Windows, the terminal bell is the only sound available without a GUI
+            sys.stdout.write("\a")
+            sys.stdout.flush()
+            time.sleep(SoundAlert.TIME_ON / 1000.0)
+            return
+
+        winsound.Beep(SoundAlert.FREQ, SoundAlert.TIME_ON)
+
     def process(self):
         seconds_to_sleep = SoundAlert.TIME_OFF / 1000
 
@@ -37,12 +49,13 @@ class SoundAlert(QtCore.QObject):
                 counter -= 1
 
             if not self.exiting:
-                winsound.Beep(SoundAlert.FREQ, SoundAlert.TIME_ON)
+                SoundAlert.beep()
 
         self.finished.emit()
 
 
 def main():
+    from PySide import QtGui
 
     class Form(QtGui.QDialog):
         def __init__(self, parent=None):
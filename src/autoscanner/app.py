@@ -6,21 +6,39 @@ Created on 22 nov. 2015
 
 import sys
 import time
+import logging
 from PySide import QtGui, QtCore
 
 from autoscanner import __organization__, __appname__, __version__
 from autoscanner.views.gui_main import Ui_MainWindow
-from autoscanner.views.gui_transparent import TransparentWindow
 from autoscanner.tools.scantools import ScanTools
 from autoscanner.tools.imageprocessor import ImageProcessor
-from autoscanner.alerts.soundalert import SoundAlert
+from autoscanner.tools.region import Region
+from autoscanner.tools.backends import ThreadBackend, ProcessPoolBackend
+from autoscanner.tools.capture import Win32ScreenSource, X11ShmSource
+from autoscanner.tools.framequeue import FrameQueue
+from autoscanner.tools.scheduler import AdaptiveRate
+from autoscanner.tools.background import RollingBaseline
+from autoscanner.tools.mask import IgnoreMask
+from autoscanner.tools.tracing import CycleTracer
+from autoscanner.tools.hysteresis import HysteresisGate
+from autoscanner.tools.framehistory import FrameHistory
+from autoscanner.tools.recording import FrameRecorder
+from autoscanner.tools.preview import PreviewScaler
 from autoscanner.alerts.pushbullet import PushBullet
+from autoscanner.alerts.dispatcher import AlertDispatcher
+from autoscanner.alerts.sinks import Alert, PushSink, CommandSink, WebhookSink, FileLogSink, AudioSink
+
+log = logging.getLogger(__name__)
 
 
 class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
     """
     Main Window GUI
     """
+
+    CLOSE_TIMEOUT = 3.0  # seconds shared by the notifications, alerts and history dumps when closing
+
     def __init__(self, parent=None):
         super(MainWindow, self).__init__(parent)
         self.setupUi(self)
@@ -32,10 +50,19 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         self.scene_cycle = QtGui.QGraphicsScene()
         self.graphicsView_init.setScene(self.scene_init)
         self.graphicsView_cyclic.setScene(self.scene_cycle)
+        self.pix_item_init = QtGui.QGraphicsPixmapItem()
+        self.pix_item_cycle = QtGui.QGraphicsPixmapItem()
+        self.scene_init.addItem(self.pix_item_init)
+        self.scene_cycle.addItem(self.pix_item_cycle)
+        self.preview_scale = 1.0
+        self.changes = {}
+        self.change_items = []
 
         # Status bar
         self.statusText = QtGui.QLabel("Ready")
         self.statusBar().addWidget(self.statusText, 1)
+        self.missed_deadlines = 0
+        self.cycle_period = None
 
         # Restore GUI settings
         self.read_settings()
@@ -44,29 +71,40 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         self.worker_thread = QtCore.QThread()
         self.image_processor = ImageProcessor()
         self.image_processor.moveToThread(self.worker_thread)
-        self.image_processor.request_image.connect(self.image_request)
+        self.image_processor.baseline_captured.connect(self.baseline_captured)
+        self.image_processor.error.connect(self.process_error)
+        self.image_processor.deadline_missed.connect(self.deadline_missed)
+        self.image_processor.period_changed.connect(self.period_changed)
         self.image_processor.comparison_done.connect(self.comparison_done)
         self.image_processor.finished.connect(self.process_done)
+        self.image_processor.region_changed.connect(self.region_changed)
+        self.image_processor.changes_located.connect(self.changes_located)
         self.worker_thread.started.connect(self.image_processor.process)
         
-        # Sound alarm system
-        self.alarm_thread = QtCore.QThread()
-        self.sound_alert = SoundAlert()
-        self.sound_alert.moveToThread(self.alarm_thread)
-        self.sound_alert.finished.connect(self.alarm_thread.quit)
-        self.alarm_thread.started.connect(self.sound_alert.process)
-
-        # Push notifications
-        self.notif_thread = QtCore.QThread()
-        self.push_bullet = PushBullet()
-        self.push_bullet.moveToThread(self.notif_thread)
+        # Preview, scaled down in its own thread straight from the capture thread
+        self.preview_thread = QtCore.QThread()
+        self.preview_scaler = PreviewScaler(self.preview_fps)
+        self.preview_scaler.moveToThread(self.preview_thread)
+        self.preview_scaler.scaled.connect(self.preview_scaled)
+        self.image_processor.frame_captured.connect(self.preview_scaler.submit, QtCore.Qt.DirectConnection)
+        self.preview_thread.start()
+
+        # Alarms, every sink is called from its own worker thread
+        self.audio_sink = AudioSink(repeat=None)  # shared by all the alerts, one silence stops them all
+        self.alert_sinks_key = None
+        self.alert_dispatcher = AlertDispatcher(coalesce_window=self.alert_coalesce)
+        self.alert_dispatcher.delivered.connect(self.alert_delivered)
+
+        # Test notifications, queued and sent from their own thread
+        self.push_bullet = PushBullet(self.pushbullet_url or None)
         self.push_bullet.finished.connect(self.notif_done)
-        self.notif_thread.started.connect(self.push_bullet.process)
 
         # Signals
         self.pushButton_select.clicked.connect(self._btn_select_clicked)
+        self.pushButton_ignore.clicked.connect(self._btn_ignore_clicked)
         self.pushButton_start.clicked.connect(self._btn_start_clicked)
         self.pushButton_send_test_message.clicked.connect(self._btn_send_test_message)
+        self.tabWidget.currentChanged.connect(self._update_preview)
 
     # -------------------------------------------------------------------------
     # Helper functions
@@ -82,26 +120,158 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         self.spinBox_width.setMaximum(screen_geom.width())
         self.spinBox_height.setMaximum(screen_geom.height())
     
-    def _take_screenshot(self):
-        return QtGui.QPixmap.grabWindow(
-            QtGui.QApplication.desktop().winId(),
-            self.screen_area.x(),
-            self.screen_area.y(),
-            self.screen_area.width(),
-            self.screen_area.height()
-            )
-    
-    def _draw_init_image(self, screenshot):
-        pix_item = QtGui.QGraphicsPixmapItem(screenshot)
-        self.scene_init.clear()
-        self.scene_init.setSceneRect(screenshot.rect())
-        self.scene_init.addItem(pix_item)
+    def _create_source(self):
+        area = (self.screen_area.x(), self.screen_area.y(), self.screen_area.width(), self.screen_area.height())
+
+        # screenshots are taken in the worker thread whenever the platform allows it
+        if self.capture in ("auto", "win32") and sys.platform == "win32" and Win32ScreenSource.available():
+            return Win32ScreenSource(*area)
+
+        if self.capture in ("auto", "x11shm") and sys.platform.startswith("linux") and X11ShmSource.available():
+            return X11ShmSource(*area)
+
+        from autoscanner.tools.qtcapture import QtScreenSource
+
+        return QtScreenSource(*area)
+
+    def _show_running_status(self):
+        details = []
+
+        if self.image_processor.hysteresis is not None and self.image_processor.exceeded_regions:
+            details.append("alert in: {0}".format(", ".join(self.image_processor.exceeded_regions)))
+
+        frame_cache = self.image_processor.frame_cache
+        if frame_cache is not None:
+            details.append("unchanged frames skipped: {0} of {1}".format(
+                frame_cache.hits,
+                frame_cache.hits + frame_cache.misses
+            ))
+
+        if self.adaptive:
+            details.append("period: {0:.3f} s".format(self.cycle_period))
+
+        if self.missed_deadlines:
+            details.append("missed deadlines: {0}".format(self.missed_deadlines))
+
+        tracer = self.image_processor.tracer
+        if tracer is not None:
+            stages = []
+            for stage in CycleTracer.STAGES:
+                stats = tracer.percentiles(stage)
+                if stats is not None:
+                    stages.append("{0} {1:.1f}/{2:.1f}/{3:.1f}".format(stage, *[value * 1000 for value in stats]))
+            if stages:
+                details.append("p50/p95/max ms: {0}".format(", ".join(stages)))
+
+        if self.image_processor.dropped_frames:
+            details.append("dropped frames: {0}, queued: {1}".format(
+                self.image_processor.dropped_frames,
+                self.image_processor.queue_depth
+            ))
+
+        self.statusText.setText("Running... ({0})".format(", ".join(details)) if details else "Running...")
+
+    def _create_adaptive_rate(self):
+        if not self.adaptive:
+            return None
+
+        return AdaptiveRate(self.adaptive_min_period, self.adaptive_max_period, self.cycle_time)
+
+    def _create_rolling_baseline(self):
+        if not self.rolling_baseline:
+            return None
+
+        return RollingBaseline(self.baseline_rate, self.baseline_freeze)
+
+    def _create_ignore_mask(self, area_x, area_y, area_width, area_height):
+        if not self.ignore_rects and not self.mask_image:
+            return None
+
+        # rectangles and mask image are in screen coordinates, the mask in captured image coordinates
+        ignore_mask = IgnoreMask(area_width, area_height)
+        for x, y, width, height in self.ignore_rects:
+            ignore_mask.add_rect(x - area_x, y - area_y, width, height)
+
+        if self.mask_image:
+            # the mask image covers the whole desktop, like a full screenshot
+            screen_geom = ScanTools.get_full_screen_geometry()
+            ignore_mask.add_image(self.mask_image, screen_geom.x() - area_x, screen_geom.y() - area_y)
+
+        return ignore_mask
+
+    def _create_tracer(self):
+        if not self.trace and not self.trace_file:
+            return None
+
+        return CycleTracer(path=self.trace_file or None, trace_format=self.trace_format)
+
+    def _create_hysteresis(self):
+        if not self.continuous:
+            return None
+
+        return HysteresisGate(self.clear_ratio, self.dwell)
+
+    def _create_history(self):
+        if not self.history_dir:
+            return None
+
+        return FrameHistory(
+            self.history_dir,
+            self.history_frames,
+            self.history_seconds,
+            int(self.history_mb * 1024 * 1024)
+        )
+
+    def _create_backend(self):
+        if self.backend == "process":
+            return ProcessPoolBackend(self.workers or None)
+
+        return ThreadBackend(self.early_exit, self.pyramid_levels, self.pyramid_floor, self.localize_tile)
+
+    def _draw_init_image(self, img):
+        # drawn once per session, scaled like the cyclic preview
+        viewport = self.graphicsView_init.viewport().size()
+        if img.width() > viewport.width() or img.height() > viewport.height():
+            img = img.scaled(viewport, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+
+        self.pix_item_init.setPixmap(QtGui.QPixmap.fromImage(img))
+        self.scene_init.setSceneRect(self.pix_item_init.boundingRect())
     
-    def _draw_cycle_image(self, screenshot):
-        pix_item = QtGui.QGraphicsPixmapItem(screenshot)
-        self.scene_cycle.clear()
-        self.scene_cycle.setSceneRect(screenshot.rect())
-        self.scene_cycle.addItem(pix_item)
+    def _draw_cycle_image(self, img):
+        self.pix_item_cycle.setPixmap(QtGui.QPixmap.fromImage(img))
+        self.scene_cycle.setSceneRect(self.pix_item_cycle.boundingRect())
+
+    def _draw_changes(self):
+        # boxes in image coordinates, drawn over the scaled down preview
+        boxes = [box for region_boxes in self.changes.values() for box in region_boxes]
+
+        while len(self.change_items) < len(boxes):
+            item = QtGui.QGraphicsRectItem(self.pix_item_cycle)
+            item.setPen(QtGui.QPen(QtGui.QColor(255, 0, 0), 2))
+            self.change_items.append(item)
+
+        for i, item in enumerate(self.change_items):
+            if i < len(boxes):
+                x, y, width, height = [value * self.preview_scale for value in boxes[i]]
+                item.setRect(x, y, width, height)
+                item.show()
+            else:
+                item.hide()
+
+    def _clear_images(self):
+        self.pix_item_init.setPixmap(QtGui.QPixmap())
+        self.pix_item_cycle.setPixmap(QtGui.QPixmap())
+        self.changes = {}
+        self._draw_changes()
+
+    def _update_preview(self):
+        # no scaling at all while nobody can see the preview
+        self.preview_scaler.enabled = (
+            self.isVisible() and not self.isMinimized() and self.tabWidget.currentWidget() is self.tab_1
+        )
+
+        viewport = self.graphicsView_cyclic.viewport().size()
+        self.preview_scaler.set_target_size(viewport.width(), viewport.height())
 
     # -------------------------------------------------------------------------
     # Alarm Handling
@@ -114,46 +284,146 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         message_title = self.lineEdit_pb_title.text()
         message_body = self.textEdit_pb_message.toPlainText()
 
-        self.push_bullet.set_message(
+        self.push_bullet.send(
             api_key,
             message_title,
             message_body
         )
 
-        self.notif_thread.start()
-
-    def _handle_alarms(self):
-        audio_enabled = self.checkBox_audio.isChecked()
-        notification_enabled = self.checkBox_pushbullet.isChecked()
+    def _alert_sinks_key(self):
+        # the settings the sinks are built from
+        return (
+            self.checkBox_pushbullet.isChecked(),
+            self.lineEdit_pb_key.text(),
+            self.lineEdit_pb_title.text(),
+            self.textEdit_pb_message.toPlainText(),
+            self.checkBox_audio.isChecked()
+        )
 
-        # sound the alarm :)
-        if audio_enabled:
-            self.sound_alert.exiting = False
-            self.alarm_thread.start()
+    def _create_alert_sinks(self):
+        sinks = []
+
+        if self.checkBox_pushbullet.isChecked():
+            sinks.append(PushSink(
+                self.lineEdit_pb_key.text(),
+                self.lineEdit_pb_title.text(),
+                self.textEdit_pb_message.toPlainText(),
+                self.pushbullet_url or None
+            ))
+
+        if self.checkBox_audio.isChecked():
+            # beeps until the message box is dismissed
+            sinks.append(self.audio_sink)
+
+        if self.alert_command:
+            sinks.append(CommandSink(self.alert_command))
+        if self.alert_webhook:
+            sinks.append(WebhookSink(self.alert_webhook))
+        if self.alert_log:
+            sinks.append(FileLogSink(self.alert_log))
+
+        return sinks
+
+    def _dispatch_alarm(self):
+        exceeded_regions = [name for name in self.image_processor.exceeded_regions if name]
+        if exceeded_regions:
+            message = "Threshold exceeded in: {0}.".format(", ".join(exceeded_regions))
+        else:
+            message = "Threshold exceeded."
+
+        # sound the alarm and notify :)
+        sinks_key = self._alert_sinks_key()
+        if sinks_key != self.alert_sinks_key:
+            # the same sinks serve every alert until their settings change
+            self.alert_sinks_key = sinks_key
+            self.alert_dispatcher.sinks = self._create_alert_sinks()
+        if self.checkBox_pushbullet.isChecked():
+            self.statusText.setStyleSheet("")  # reset stylesheet
+            self.statusText.setText("Attempting to send notification...")
+        details = {}
+        if self.image_processor.history_dump:
+            details["history"] = self.image_processor.history_dump
+        if self.image_processor.changes:
+            # changed areas in screen coordinates
+            details["changes"] = dict(
+                (name, [(x + self.screen_area.x(), y + self.screen_area.y(), width, height)
+                        for x, y, width, height in boxes])
+                for name, boxes in self.image_processor.changes.items() if boxes
+            )
+        self.alert_dispatcher.dispatch(Alert(__appname__, message, exceeded_regions, details=details))
+        return message
 
-        # send push notification
-        if notification_enabled:
-            self._send_notification()
+    def _handle_alarms(self):
+        message = self._dispatch_alarm()
 
-        QtGui.QMessageBox.information(self, __appname__, "Threhsold exceeded.")
+        QtGui.QMessageBox.information(self, __appname__, message)
 
-        if audio_enabled:
-            self.sound_alert.exiting = True
+        self.audio_sink.silence()
 
     # -------------------------------------------------------------------------
     # Inter-thread communication
 
-    @QtCore.Slot()
-    def image_request(self):
-        screenshot = self._take_screenshot()
-        self._draw_cycle_image(screenshot)
-        self.image_processor.set_cyclic_image(screenshot.toImage())
-        
-        self.image_processor.waitCondition.wakeOne()
+    @QtCore.Slot(object)
+    def baseline_captured(self, frame):
+        self._draw_init_image(ScanTools.frame_image(frame))
+
+    @QtCore.Slot(object, float)
+    def preview_scaled(self, img, scale):
+        self.preview_scale = scale
+
+        tracer = self.image_processor.tracer
+        drawn = CycleTracer.now() if tracer is not None else None
+        self._draw_cycle_image(img)
+        self._draw_changes()
+        if tracer is not None:
+            tracer.span("draw", drawn)
+
+    @QtCore.Slot(object)
+    def changes_located(self, changes):
+        self.changes = changes
+        self._draw_changes()
+
+    @QtCore.Slot(str, bool)
+    def region_changed(self, name, entered):
+        # continuous mode, the scanning goes on and no modal box interrupts it
+        if entered:
+            self._dispatch_alarm()
+            self.statusText.setStyleSheet("QLabel {color: red;}")
+        elif not self.image_processor.exceeded_regions:
+            # beeping until every region is back to normal
+            self.audio_sink.silence()
+            self.statusText.setStyleSheet("")  # reset stylesheet
+
+        self._show_running_status()
+
+    @QtCore.Slot(str)
+    def process_error(self, message):
+        QtGui.QMessageBox.warning(self, __appname__, "Scanning stopped: {0}".format(message))
     
+    @QtCore.Slot(object)
+    def comparison_done(self, results):
+        texts = []
+        thresholds = dict((region.name, region.threshold) for region in self.image_processor.regions or [])
+        for name, (result, exact) in results.items():
+            if exact:
+                text = "{0:.2f}".format(result)
+            else:
+                # a bound deciding the threshold, from above or from below
+                text = (">{0:.2f}" if result > thresholds.get(name, 0.0) else "<{0:.2f}").format(result)
+            texts.append(text if len(results) == 1 else "{0}: {1}".format(name, text))
+
+        self.lineEdit_result.setText("; ".join(texts))
+        self._show_running_status()
+
     @QtCore.Slot(float)
-    def comparison_done(self, result):
-        self.lineEdit_result.setText("{0:.2f}".format(result))
+    def period_changed(self, period):
+        self.cycle_period = period
+        self._show_running_status()
+
+    @QtCore.Slot(int)
+    def deadline_missed(self, missed_deadlines):
+        self.missed_deadlines = missed_deadlines
+        self._show_running_status()
     
     @QtCore.Slot(bool)
     def process_done(self, thr_exceeded):
@@ -161,21 +431,29 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         
         while self.worker_thread.isRunning():
             time.sleep(0.01)
-            self.image_processor.waitCondition.wakeOne()  # wake thread in case it's blocked at requesting an image
                 
         self.pushButton_start.setText("Start")
         self.pushButton_start.setEnabled(True)
 
+        # continuous mode stopped during an alert
+        self.audio_sink.silence()
+
         if thr_exceeded:
             self._handle_alarms()
 
         self.statusText.setStyleSheet("")  # reset stylesheet
         self.statusText.setText("Ready")
 
+    @QtCore.Slot(str, bool)
+    def alert_delivered(self, sink_name, response):
+        if sink_name == PushSink.name:
+            self.notif_done(response)
+        elif not response:
+            self.statusText.setStyleSheet("QLabel {color: red;}")
+            self.statusText.setText("Failed to deliver the alert ({0})".format(sink_name))
+
     @QtCore.Slot(bool)
     def notif_done(self, response):
-        self.notif_thread.quit()
-
         if response:
             self.statusText.setStyleSheet("QLabel {color: green;}")
             self.statusText.setText("Notification successfully sent")
@@ -183,9 +461,6 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             self.statusText.setStyleSheet("QLabel {color: red;}")
             self.statusText.setText("Failed to send notification")
 
-        while self.notif_thread.isRunning():
-            time.sleep(0.01)
-
         # re-enable the button - doesn't matter if the notification wasn't a test
         # synchronization problems between the test and the real alarm are minor
         self.pushButton_send_test_message.setEnabled(True)
@@ -200,6 +475,8 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
 
     @QtCore.Slot()
     def _btn_select_clicked(self):
+        from autoscanner.views.gui_transparent import TransparentWindow
+
         trans_win = TransparentWindow()
         
         if trans_win.exec_():
@@ -209,29 +486,65 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             self.spinBox_width.setValue(rubber_geom.width())
             self.spinBox_height.setValue(rubber_geom.height())
     
+    @QtCore.Slot()
+    def _btn_ignore_clicked(self):
+        from autoscanner.views.gui_transparent import TransparentWindow
+
+        trans_win = TransparentWindow(rects=[QtCore.QRect(*rect) for rect in self.ignore_rects])
+
+        if trans_win.exec_():
+            self.ignore_rects = [(rect.x(), rect.y(), rect.width(), rect.height()) for rect in trans_win.rects]
+
     @QtCore.Slot()
     def _btn_start_clicked(self):
         if not self.worker_thread.isRunning():
             # Thread is not running and we wish to start it
             self.image_processor.exiting = False
+            self.missed_deadlines = 0
             self.pushButton_start.setEnabled(False)
 
             self.statusText.setStyleSheet("")  # reset stylesheet
             self.statusText.setText("Running...")
 
             self.threshold = self.doubleSpinBox_thr.value()
-            self.cycle_time = self.spinBox_cycle.value()
-            self.screen_area = QtCore.QRect(
+            self.cycle_time = self.doubleSpinBox_cycle.value()
+            self.cycle_period = self.cycle_time
+
+            # the main region comes from the widgets, additional ones from the settings file
+            regions = [Region(
+                "main",
                 self.spinBox_x.value(),
                 self.spinBox_y.value(),
                 self.spinBox_width.value(),
-                self.spinBox_height.value())
-            
-            screenshot = self._take_screenshot()
-            self._draw_init_image(screenshot)
-            self.scene_cycle.clear()
+                self.spinBox_height.value(),
+                self.threshold
+            )] + self.extra_regions
+
+            # a single screenshot covers all the regions
+            area_x, area_y, area_width, area_height = Region.bounding_box(regions)
+            self.screen_area = QtCore.QRect(area_x, area_y, area_width, area_height)
+
+            self._clear_images()
+            self.preview_scaler.reset()
             
-            self.image_processor.config(self.threshold, self.cycle_time, screenshot.toImage())
+            self.image_processor.config(
+                self.threshold,
+                self.cycle_time,
+                self._create_source(),
+                regions=[region.translated(-area_x, -area_y) for region in regions],
+                backend=self._create_backend(),
+                fast_path=self.fast_path,
+                perceptual_distance=self.perceptual_distance if self.perceptual_hash else None,
+                queue_size=self.queue_size,
+                queue_policy=self.queue_policy,
+                adaptive_rate=self._create_adaptive_rate(),
+                rolling_baseline=self._create_rolling_baseline(),
+                ignore_mask=self._create_ignore_mask(area_x, area_y, area_width, area_height),
+                tracer=self._create_tracer(),
+                hysteresis=self._create_hysteresis(),
+                history=self._create_history(),
+                recorder=FrameRecorder(self.record_file) if self.record_file else None
+            )
             self.worker_thread.start()
             
             while not self.worker_thread.isRunning():
@@ -241,7 +554,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             self.pushButton_start.setEnabled(True)
         else:
             # Thread is running and we wish to stop it
-            self.image_processor.exiting = True
+            self.image_processor.stop()
             self.pushButton_start.setEnabled(False)
 
     # -------------------------------------------------------------------------
@@ -273,8 +586,8 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         self.doubleSpinBox_thr.setValue(
             float(self.settings.value("threshold", 0))
         )
-        self.spinBox_cycle.setValue(
-            int(self.settings.value("cycle", 3))
+        self.doubleSpinBox_cycle.setValue(
+            float(self.settings.value("cycle", 3))
         )
 
         # Tab: Options
@@ -294,6 +607,76 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             self.settings.value("pb_message", "Threshold exceeded.")
         )
 
+        # Advanced options (no widgets, edited in the settings file)
+        self.capture = self.settings.value("capture", "auto")
+        self.backend = self.settings.value("backend", "thread")
+        self.workers = int(self.settings.value("workers", 0))
+        self.early_exit = True if self.settings.value("early_exit", "false") == "true" else False
+        self.pyramid_levels = int(self.settings.value("pyramid_levels", 0))
+        self.pyramid_floor = float(self.settings.value("pyramid_floor", 1.0))
+        self.localize_tile = int(self.settings.value("localize_tile", 0))
+        self.fast_path = True if self.settings.value("fast_path", "true") == "true" else False
+        self.perceptual_hash = True if self.settings.value("perceptual_hash", "false") == "true" else False
+        self.perceptual_distance = int(self.settings.value("perceptual_distance", 0))
+        self.queue_size = int(self.settings.value("queue_size", 1))
+        self.queue_policy = self.settings.value("queue_policy", FrameQueue.DROP_OLDEST)
+        self.adaptive = True if self.settings.value("adaptive", "false") == "true" else False
+        self.adaptive_min_period = float(self.settings.value("adaptive_min_period", 0.25))
+        self.adaptive_max_period = float(self.settings.value("adaptive_max_period", 30.0))
+        self.rolling_baseline = True if self.settings.value("rolling_baseline", "false") == "true" else False
+        self.baseline_rate = float(self.settings.value("baseline_rate", 0.05))
+        self.baseline_freeze = float(self.settings.value("baseline_freeze", 0.5))
+        self.mask_image = self.settings.value("mask_image", "")
+        self.trace = True if self.settings.value("trace", "false") == "true" else False
+        self.trace_file = self.settings.value("trace_file", "")
+        self.trace_format = self.settings.value("trace_format", CycleTracer.JSON_LINES)
+        if self.trace_format not in CycleTracer.FORMATS:
+            # edited by hand in the settings file, the tracer would refuse it when starting
+            log.warning("unknown trace_format %r, %s is used instead", self.trace_format, CycleTracer.JSON_LINES)
+            self.trace_format = CycleTracer.JSON_LINES
+        self.preview_fps = float(self.settings.value("preview_fps", 10.0))
+        self.pushbullet_url = self.settings.value("pushbullet_url", "")
+        self.alert_command = self.settings.value("alert_command", "")
+        self.alert_webhook = self.settings.value("alert_webhook", "")
+        self.alert_log = self.settings.value("alert_log", "")
+        self.alert_coalesce = float(self.settings.value("alert_coalesce", 60.0))
+        self.continuous = True if self.settings.value("continuous", "false") == "true" else False
+        self.clear_ratio = float(self.settings.value("clear_ratio", 0.8))
+        self.dwell = float(self.settings.value("dwell", 0.0))
+        self.history_dir = self.settings.value("history_dir", "")
+        self.history_frames = int(self.settings.value("history_frames", 0))
+        self.history_seconds = float(self.settings.value("history_seconds", 30.0))
+        self.history_mb = float(self.settings.value("history_mb", 64.0))
+        self.record_file = self.settings.value("record_file", "")
+
+        # Additional regions, captured together with the main one
+        self.extra_regions = []
+        size = self.settings.beginReadArray("regions")
+        for i in range(size):
+            self.settings.setArrayIndex(i)
+            self.extra_regions.append(Region(
+                self.settings.value("name", "region{0}".format(i + 1)),
+                int(self.settings.value("x", 0)),
+                int(self.settings.value("y", 0)),
+                int(self.settings.value("width", 0)),
+                int(self.settings.value("height", 0)),
+                float(self.settings.value("threshold", 0))
+            ))
+        self.settings.endArray()
+
+        # Ignored rectangles, in screen coordinates
+        self.ignore_rects = []
+        size = self.settings.beginReadArray("ignore_rects")
+        for i in range(size):
+            self.settings.setArrayIndex(i)
+            self.ignore_rects.append((
+                int(self.settings.value("x", 0)),
+                int(self.settings.value("y", 0)),
+                int(self.settings.value("width", 0)),
+                int(self.settings.value("height", 0))
+            ))
+        self.settings.endArray()
+
         self.settings.endGroup()
 
     def write_settings(self):
@@ -329,7 +712,7 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
         )
         self.settings.setValue(
             "cycle",
-            self.spinBox_cycle.value()
+            self.doubleSpinBox_cycle.value()
         )
 
         # Tab: Options
@@ -354,15 +737,216 @@ class MainWindow(QtGui.QMainWindow, Ui_MainWindow):
             self.textEdit_pb_message.toPlainText()
         )
 
+        # Advanced options
+        self.settings.setValue(
+            "capture",
+            self.capture
+        )
+        self.settings.setValue(
+            "backend",
+            self.backend
+        )
+        self.settings.setValue(
+            "workers",
+            self.workers
+        )
+        self.settings.setValue(
+            "early_exit",
+            self.early_exit
+        )
+        self.settings.setValue(
+            "pyramid_levels",
+            self.pyramid_levels
+        )
+        self.settings.setValue(
+            "pyramid_floor",
+            self.pyramid_floor
+        )
+        self.settings.setValue(
+            "localize_tile",
+            self.localize_tile
+        )
+        self.settings.setValue(
+            "fast_path",
+            self.fast_path
+        )
+        self.settings.setValue(
+            "perceptual_hash",
+            self.perceptual_hash
+        )
+        self.settings.setValue(
+            "perceptual_distance",
+            self.perceptual_distance
+        )
+        self.settings.setValue(
+            "queue_size",
+            self.queue_size
+        )
+        self.settings.setValue(
+            "queue_policy",
+            self.queue_policy
+        )
+        self.settings.setValue(
+            "adaptive",
+            self.adaptive
+        )
+        self.settings.setValue(
+            "adaptive_min_period",
+            self.adaptive_min_period
+        )
+        self.settings.setValue(
+            "adaptive_max_period",
+            self.adaptive_max_period
+        )
+        self.settings.setValue(
+            "rolling_baseline",
+            self.rolling_baseline
+        )
+        self.settings.setValue(
+            "baseline_rate",
+            self.baseline_rate
+        )
+        self.settings.setValue(
+            "baseline_freeze",
+            self.baseline_freeze
+        )
+        self.settings.setValue(
+            "mask_image",
+            self.mask_image
+        )
+        self.settings.setValue(
+            "trace",
+            self.trace
+        )
+        self.settings.setValue(
+            "trace_file",
+            self.trace_file
+        )
+        self.settings.setValue(
+            "trace_format",
+            self.trace_format
+        )
+        self.settings.setValue(
+            "preview_fps",
+            self.preview_fps
+        )
+        self.settings.setValue(
+            "pushbullet_url",
+            self.pushbullet_url
+        )
+        self.settings.setValue(
+            "alert_command",
+            self.alert_command
+        )
+        self.settings.setValue(
+            "alert_webhook",
+            self.alert_webhook
+        )
+        self.settings.setValue(
+            "alert_log",
+            self.alert_log
+        )
+        self.settings.setValue(
+            "alert_coalesce",
+            self.alert_coalesce
+        )
+        self.settings.setValue(
+            "continuous",
+            self.continuous
+        )
+        self.settings.setValue(
+            "clear_ratio",
+            self.clear_ratio
+        )
+        self.settings.setValue(
+            "dwell",
+            self.dwell
+        )
+        self.settings.setValue(
+            "history_dir",
+            self.history_dir
+        )
+        self.settings.setValue(
+            "history_frames",
+            self.history_frames
+        )
+        self.settings.setValue(
+            "history_seconds",
+            self.history_seconds
+        )
+        self.settings.setValue(
+            "history_mb",
+            self.history_mb
+        )
+        self.settings.setValue(
+            "record_file",
+            self.record_file
+        )
+
+        # Additional regions
+        self.settings.beginWriteArray("regions")
+        for i, region in enumerate(self.extra_regions):
+            self.settings.setArrayIndex(i)
+            self.settings.setValue("name", region.name)
+            self.settings.setValue("x", region.x)
+            self.settings.setValue("y", region.y)
+            self.settings.setValue("width", region.width)
+            self.settings.setValue("height", region.height)
+            self.settings.setValue("threshold", region.threshold)
+        self.settings.endArray()
+
+        # Ignored rectangles
+        self.settings.beginWriteArray("ignore_rects")
+        for i, (x, y, width, height) in enumerate(self.ignore_rects):
+            self.settings.setArrayIndex(i)
+            self.settings.setValue("x", x)
+            self.settings.setValue("y", y)
+            self.settings.setValue("width", width)
+            self.settings.setValue("height", height)
+        self.settings.endArray()
+
         self.settings.endGroup()
 
+    # event: QShowEvent
+    def showEvent(self, event):
+        super(MainWindow, self).showEvent(event)
+        self._update_preview()
+
+    # event: QHideEvent
+    def hideEvent(self, event):
+        super(MainWindow, self).hideEvent(event)
+        self._update_preview()
+
+    # event: QResizeEvent
+    def resizeEvent(self, event):
+        super(MainWindow, self).resizeEvent(event)
+        self._update_preview()
+
+    # event: QEvent
+    def changeEvent(self, event):
+        super(MainWindow, self).changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            self._update_preview()
+
     # event: QCloseEvent
     def closeEvent(self, event):
         self.write_settings()
+        self.preview_thread.quit()
+        self.preview_thread.wait()
+
+        # one short wait for everything still being sent or written, the window must not hang
+        deadline = time.time() + MainWindow.CLOSE_TIMEOUT
+        self.push_bullet.stop(MainWindow.CLOSE_TIMEOUT)
+        self.alert_dispatcher.stop(max(0.0, deadline - time.time()))
+        history = self.image_processor.history
+        if history is not None:
+            history.wait(max(0.0, deadline - time.time()))
         event.accept()
 
 
 def run():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     appl = QtGui.QApplication(sys.argv)
     form = MainWindow()
     form.show()
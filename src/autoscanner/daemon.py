@@ -0,0 +1,390 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import sys
+import glob
+import signal
+import logging
+import ConfigParser
+from PySide import QtCore
+
+from autoscanner import __appname__, __version__
+from autoscanner.tools.imageprocessor import ImageProcessor
+from autoscanner.tools.region import Region
+from autoscanner.tools.backends import ThreadBackend, ProcessPoolBackend
+from autoscanner.tools.capture import Win32ScreenSource, X11ShmSource, FileSequenceSource
+from autoscanner.tools.framequeue import FrameQueue
+from autoscanner.tools.scheduler import AdaptiveRate
+from autoscanner.tools.background import RollingBaseline
+from autoscanner.tools.mask import IgnoreMask
+from autoscanner.tools.tracing import CycleTracer
+from autoscanner.tools.hysteresis import HysteresisGate
+from autoscanner.tools.framehistory import FrameHistory
+from autoscanner.tools.recording import FrameRecorder, RecordingSource
+from autoscanner.alerts.dispatcher import AlertDispatcher
+from autoscanner.alerts.sinks import Alert, PushSink, CommandSink, WebhookSink, FileLogSink, AudioSink
+
+log = logging.getLogger(__name__)
+
+
+class ScanConfig(object):
+    """
+    Options of a headless scanner, read from an INI file.
+    The scanning options of the [scan] section have the names of the settings of the main window,
+    but the monitored area, the recording, the ignored areas and the notifications are named differently:
+    resources/headless.ini lists each of them next to the setting it stands for.
+    Every [region NAME] section adds a region, [pushbullet] and [alerts] configure the notifications.
+    """
+    def __init__(self, path):
+        self.parser = ConfigParser.SafeConfigParser()
+        if not self.parser.read(path):
+            raise IOError("Cannot read the configuration file {0}".format(path))
+
+    def get(self, name, default=None, convert=str, section="scan"):
+        """
+        Value of an option
+        :param name: option name
+        :param default: value of a missing option
+        :param convert: type of the value, bool accepts true/false, yes/no, on/off and 1/0
+        :param section: section name
+        :return: converted value
+        """
+        if not self.parser.has_option(section, name):
+            return default
+
+        if convert is bool:
+            return self.parser.getboolean(section, name)
+
+        return convert(self.parser.get(section, name))
+
+    def regions(self):
+        """
+        :return: list of Region, in screen coordinates, the main one first
+        """
+        regions = [Region(
+            "main",
+            self.get("x", 0, int),
+            self.get("y", 0, int),
+            self.parser.getint("scan", "width"),
+            self.parser.getint("scan", "height"),
+            self.get("threshold", 1.0, float)
+        )]
+
+        for section in self.parser.sections():
+            if section.startswith("region "):
+                regions.append(Region(
+                    section[len("region "):].strip(),
+                    self.get("x", 0, int, section),
+                    self.get("y", 0, int, section),
+                    self.parser.getint(section, "width"),
+                    self.parser.getint(section, "height"),
+                    self.get("threshold", regions[0].threshold, float, section)
+                ))
+
+        return regions
+
+    def ignore_rects(self):
+        """
+        :return: list of (x, y, width, height), in screen coordinates
+        """
+        rects = self.get("rects", "", section="ignore")
+        return [tuple(int(value) for value in rect.split(",")) for rect in rects.split(";") if rect.strip()]
+
+
+class ScanDaemon(QtCore.QObject):
+    """
+    Runs the capture/compare/alert loop without any widget
+    """
+    def __init__(self, config, parent=None):
+        super(ScanDaemon, self).__init__(parent)
+
+        self.config = config
+        self.stopping = False
+        self.exit_code = 0
+
+        self.regions = config.regions()
+        self.area = Region.bounding_box(self.regions)
+        self.history = None  # kept across the sessions, its dumps are waited for when quitting
+
+        # Image processing thread
+        self.worker_thread = QtCore.QThread()
+        self.image_processor = ImageProcessor()
+        self.image_processor.moveToThread(self.worker_thread)
+        self.image_processor.error.connect(self.process_error)
+        self.image_processor.finished.connect(self.process_done)
+        self.image_processor.region_changed.connect(self.region_changed)
+        self.worker_thread.started.connect(self.image_processor.process)
+
+        # Alerts, every sink is called from its own worker thread
+        self.alert_dispatcher = AlertDispatcher(
+            self._create_alert_sinks(),
+            config.get("coalesce", 60.0, float, "alerts")
+        )
+        self.alert_dispatcher.delivered.connect(self.notif_done)
+
+    def _create_source(self):
+        capture = self.config.get("capture", "auto")
+
+        if capture in ("files", "replay") and not self.config.get(capture):
+            raise ValueError("capture = {0} needs the {0} option".format(capture))
+
+        if capture == "files":
+            # recorded screenshots, mostly useful for trying a configuration
+            paths = sorted(glob.glob(self.config.get("files")))
+            if not paths:
+                raise ValueError("No file matches files = {0}".format(self.config.get("files")))
+            return FileSequenceSource(paths)
+
+        if capture == "replay":
+            # recorded session, at the recorded cadence times replay_speed, or as fast as possible with 0
+            return RecordingSource(self.config.get("replay"), self.config.get("replay_speed", 0.0, float))
+
+        if capture in ("auto", "win32") and sys.platform == "win32" and Win32ScreenSource.available():
+            return Win32ScreenSource(*self.area)
+
+        if capture in ("auto", "x11shm") and sys.platform.startswith("linux") and X11ShmSource.available():
+            return X11ShmSource(*self.area)
+
+        raise ValueError("No capture source available without a GUI for capture = {0}".format(capture))
+
+    def _create_backend(self):
+        if self.config.get("backend", "thread") == "process":
+            return ProcessPoolBackend(self.config.get("workers", 0, int) or None)
+
+        return ThreadBackend(
+            self.config.get("early_exit", False, bool),
+            self.config.get("pyramid_levels", 0, int),
+            self.config.get("pyramid_floor", 1.0, float),
+            self.config.get("localize_tile", 0, int)
+        )
+
+    def _create_alert_sinks(self):
+        config = self.config
+        sinks = []
+
+        if config.get("api_key", section="pushbullet"):
+            sinks.append(PushSink(
+                config.get("api_key", section="pushbullet"),
+                config.get("title", __appname__, section="pushbullet"),
+                url=config.get("url", section="pushbullet")
+            ))
+
+        if config.get("command", section="alerts"):
+            sinks.append(CommandSink(config.get("command", section="alerts")))
+        if config.get("webhook", section="alerts"):
+            sinks.append(WebhookSink(config.get("webhook", section="alerts")))
+        if config.get("log_file", section="alerts"):
+            sinks.append(FileLogSink(config.get("log_file", section="alerts")))
+        if config.get("audio", False, bool, "alerts"):
+            sinks.append(AudioSink(config.get("beeps", 3, int, "alerts")))
+
+        return sinks
+
+    def _create_ignore_mask(self):
+        area_x, area_y, area_width, area_height = self.area
+        ignore_rects = self.config.ignore_rects()
+        mask_image = self.config.get("mask_image", section="ignore")
+
+        if not ignore_rects and not mask_image:
+            return None
+
+        ignore_mask = IgnoreMask(area_width, area_height)
+        for x, y, width, height in ignore_rects:
+            ignore_mask.add_rect(x - area_x, y - area_y, width, height)
+
+        if mask_image:
+            ignore_mask.add_image(
+                mask_image,
+                self.config.get("mask_image_x", 0, int, "ignore") - area_x,
+                self.config.get("mask_image_y", 0, int, "ignore") - area_y
+            )
+
+        return ignore_mask
+
+    def _configure(self):
+        config = self.config
+        area_x, area_y = self.area[:2]
+        cycle_time = config.get("cycle", 3.0, float)
+
+        adaptive_rate = None
+        if config.get("adaptive", False, bool):
+            adaptive_rate = AdaptiveRate(
+                config.get("adaptive_min_period", 0.25, float),
+                config.get("adaptive_max_period", 30.0, float),
+                cycle_time
+            )
+
+        rolling_baseline = None
+        if config.get("rolling_baseline", False, bool):
+            rolling_baseline = RollingBaseline(
+                config.get("baseline_rate", 0.05, float),
+                config.get("baseline_freeze", 0.5, float)
+            )
+
+        tracer = None
+        if config.get("trace_file"):
+            tracer = CycleTracer(
+                path=config.get("trace_file"),
+                trace_format=config.get("trace_format", CycleTracer.JSON_LINES)
+            )
+
+        hysteresis = None
+        if config.get("continuous", False, bool):
+            hysteresis = HysteresisGate(config.get("clear_ratio", 0.8, float), config.get("dwell", 0.0, float))
+
+        if self.history is None and config.get("history_dir"):
+            self.history = FrameHistory(
+                config.get("history_dir"),
+                config.get("history_frames", 0, int),
+                config.get("history_seconds", 30.0, float),
+                int(config.get("history_mb", 64.0, float) * 1024 * 1024)
+            )
+
+        self.image_processor.config(
+            self.regions[0].threshold,
+            cycle_time,
+            self._create_source(),
+            regions=[region.translated(-area_x, -area_y) for region in self.regions],
+            backend=self._create_backend(),
+            fast_path=config.get("fast_path", True, bool),
+            perceptual_distance=(
+                config.get("perceptual_distance", 0, int) if config.get("perceptual_hash", False, bool) else None
+            ),
+            queue_size=config.get("queue_size", 1, int),
+            queue_policy=config.get("queue_policy", FrameQueue.DROP_OLDEST),
+            adaptive_rate=adaptive_rate,
+            rolling_baseline=rolling_baseline,
+            ignore_mask=self._create_ignore_mask(),
+            tracer=tracer,
+            hysteresis=hysteresis,
+            history=self.history,
+            recorder=FrameRecorder(config.get("record")) if config.get("record") else None
+        )
+
+    def start(self):
+        """
+        Captures a new baseline and starts scanning
+        :return: None
+        """
+        try:
+            self._configure()
+        except (IOError, ValueError) as e:
+            log.error("cannot start scanning: %s", e)
+            self.exit_code = 1
+            QtCore.QCoreApplication.exit(self.exit_code)
+            return
+
+        log.info("scanning %d region(s) in %s", len(self.regions), self.area)
+        self.image_processor.exiting = False
+        self.worker_thread.start()
+
+    def stop(self):
+        """
+        Stops scanning and quits once the worker thread is done
+        :return: None
+        """
+        if self.stopping:
+            return
+
+        log.info("stopping")
+        self.stopping = True
+        self.image_processor.stop()
+
+        if not self.worker_thread.isRunning():
+            self._quit()
+
+    def _quit(self):
+        # the frame history dumps and the pending alerts are allowed to complete
+        if self.history is not None and not self.history.wait(FrameHistory.STOP_TIMEOUT):
+            log.error("the frame history is still being written, the last dump is incomplete")
+        self.alert_dispatcher.stop(AlertDispatcher.STOP_TIMEOUT)
+        QtCore.QCoreApplication.exit(self.exit_code)
+
+    def _alert_details(self):
+        details = {}
+        if self.image_processor.history_dump:
+            details["history"] = self.image_processor.history_dump
+        if self.image_processor.changes:
+            # changed areas in screen coordinates
+            details["changes"] = dict(
+                (name, [(x + self.area[0], y + self.area[1], width, height) for x, y, width, height in boxes])
+                for name, boxes in self.image_processor.changes.items() if boxes
+            )
+        return details
+
+    def _send_notification(self):
+        exceeded_regions = [name for name in self.image_processor.exceeded_regions if name]
+        self.alert_dispatcher.dispatch(Alert(
+            self.config.get("title", __appname__, section="pushbullet"),
+            self.config.get("message", "Threshold exceeded in: {0}.", section="pushbullet").format(
+                ", ".join(exceeded_regions)),
+            exceeded_regions,
+            details=self._alert_details()
+        ))
+
+    @QtCore.Slot(str, bool)
+    def region_changed(self, name, entered):
+        # continuous mode, the worker thread keeps scanning
+        if entered:
+            log.warning("threshold exceeded in: %s", name)
+            self._send_notification()
+        else:
+            log.info("back to normal: %s", name)
+
+    @QtCore.Slot(str)
+    def process_error(self, message):
+        log.error("scanning stopped: %s", message)
+        self.exit_code = 1
+
+    @QtCore.Slot(bool)
+    def process_done(self, thr_exceeded):
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+
+        if thr_exceeded:
+            log.warning("threshold exceeded in: %s", ", ".join(self.image_processor.exceeded_regions))
+            self._send_notification()
+
+            # capture a new baseline and keep watching, recorded frames are only played once
+            rearm = self.config.get("rearm", True, bool) and self.config.get("capture", "auto") not in ("files", "replay")
+            if not self.stopping and rearm:
+                self.start()
+                return
+
+        self._quit()
+
+    @QtCore.Slot(str, bool)
+    def notif_done(self, sink_name, response):
+        if response:
+            log.info("alert delivered (%s)", sink_name)
+        else:
+            log.error("failed to deliver the alert (%s)", sink_name)
+
+
+def run(config_path):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    log.info("%s %s, headless, configuration %s", __appname__, __version__, config_path)
+
+    appl = QtCore.QCoreApplication(sys.argv)
+
+    try:
+        daemon = ScanDaemon(ScanConfig(config_path))
+    except (IOError, ValueError, ConfigParser.Error) as e:
+        log.error("%s", e)
+        return 1
+
+    # Python signal handlers only run when the interpreter gets control back from the event loop
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: daemon.stop())
+    wakeup_timer = QtCore.QTimer()
+    wakeup_timer.timeout.connect(lambda: None)
+    wakeup_timer.start(250)
+
+    QtCore.QTimer.singleShot(0, daemon.start)
+    appl.exec_()
+
+    log.info("stopped")
+    return daemon.exit_code
@@ -0,0 +1,255 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import multiprocessing
+import numpy
+
+from collections import OrderedDict
+from multiprocessing.sharedctypes import RawArray
+from autoscanner.tools.diffengine import DiffEngine
+
+
+class ThreadBackend(object):
+    """
+    Compares the regions in the calling thread
+    """
+    def __init__(self, early_exit=False, pyramid_levels=0, pyramid_floor=0.0, localize_tile=0):
+        """
+        :param early_exit: stop comparing a region once its threshold is exceeded
+        :param pyramid_levels: coarse-to-fine comparison with 2**levels blocks, 0 to disable; the scores
+        may then be bounds that decide the thresholds rather than exact values
+        :param pyramid_floor: coarse block score above which a block is refined
+        :param localize_tile: side of the tiles locating the changes, 0 to disable;
+        every pixel is then read, early_exit and pyramid_levels are not used
+        """
+        self.early_exit = early_exit
+        self.pyramid_levels = pyramid_levels
+        self.pyramid_floor = pyramid_floor
+        self.localize_tile = localize_tile
+        self.changes = None
+
+        self.arr_init = None
+        self.regions = []
+        self.keep = None
+        self.masks = None
+        self.pyramids_init = None
+
+    def start(self, arr_init, regions, keep=None):
+        """
+        Starts a session
+        :param arr_init: baseline pixel array
+        :param regions: list of Region, in image coordinates
+        :param keep: mask buffer of the whole image (see IgnoreMask.keep_buffer), None compares every pixel
+        :return: None
+        """
+        self.arr_init = arr_init
+        self.regions = regions
+        self.keep = keep
+
+        # no change before the first comparison
+        self.changes = OrderedDict((region.name, []) for region in regions) if self.localize_tile > 0 else None
+
+        if keep is not None:
+            self.masks = dict((region.name, DiffEngine.mask(region.view(keep))) for region in regions)
+        else:
+            self.masks = dict((region.name, None) for region in regions)
+
+        # precompute the coarse version of each region once per session
+        self.pyramids_init = self._build_pyramids() if self.pyramid_levels > 0 else None
+
+    def _build_pyramids(self):
+        return dict(
+            (region.name, DiffEngine.build_pyramid(
+                region.view(self.arr_init), self.pyramid_levels, self.masks[region.name]
+            ))
+            for region in self.regions
+        )
+
+    def update_baseline(self, arr_init):
+        """
+        Replaces the baseline during a session, the masks are kept and only the coarse versions
+        of the regions are computed again
+        :param arr_init: baseline pixel array of the same shape, usually the current one updated in place
+        :return: None
+        """
+        self.arr_init = arr_init
+
+        if self.pyramids_init is not None:
+            self.pyramids_init = self._build_pyramids()
+
+    def _compare_region(self, region, arr_cyclic):
+        if self.localize_tile > 0:
+            # the tile scores come with the score, the tiles above the threshold make the boxes
+            score, tile_scores = DiffEngine.score_map(
+                region.view(self.arr_init), region.view(arr_cyclic), self.localize_tile, self.masks[region.name]
+            )
+            self.changes[region.name] = [
+                (x + region.x, y + region.y, width, height) for x, y, width, height in DiffEngine.change_boxes(
+                    tile_scores, self.localize_tile, region.threshold, region.width, region.height
+                )
+            ]
+            return score, True
+
+        if self.pyramids_init is not None:
+            # coarse comparison first, full resolution only where the coarse level differs
+            pyramid = self.pyramids_init[region.name]
+            return DiffEngine.score_pyramid(pyramid, region.view(arr_cyclic), self.pyramid_floor, region.threshold)
+
+        mask = self.masks[region.name]
+
+        if self.early_exit:
+            # stop comparing as soon as the threshold is exceeded, result is then a lower bound
+            return DiffEngine.score_tiled(
+                region.view(self.arr_init), region.view(arr_cyclic), region.threshold, mask=mask
+            )
+
+        return DiffEngine.score(region.view(self.arr_init), region.view(arr_cyclic), mask), True
+
+    def compare(self, arr_cyclic):
+        """
+        Compares every region of a frame with the baseline
+        :param arr_cyclic: pixel array of the same shape as the baseline
+        :return: OrderedDict of region name -> (score, exact), the boxes of the changed areas
+        go to changes when localizing
+        """
+        if self.localize_tile > 0:
+            self.changes = OrderedDict()  # new dict, the previous one may be cached or in use elsewhere
+
+        # every region is a view into the same captured image
+        return OrderedDict((region.name, self._compare_region(region, arr_cyclic)) for region in self.regions)
+
+    def stop(self):
+        """
+        Ends the session
+        :return: None
+        """
+        self.arr_init = None
+        self.keep = None
+        self.masks = None
+        self.pyramids_init = None
+
+
+# Pool workers state, set once per process by _init_worker
+_shared_init = None
+_shared_cyclic = None
+_shared_keep = None
+
+
+def _init_worker(raw_init, raw_cyclic, raw_keep, shape):
+    global _shared_init, _shared_cyclic, _shared_keep
+    _shared_init = numpy.frombuffer(raw_init, dtype=numpy.uint8).reshape(shape)
+    _shared_cyclic = numpy.frombuffer(raw_cyclic, dtype=numpy.uint8).reshape(shape)
+    if raw_keep is not None:
+        _shared_keep = numpy.frombuffer(raw_keep, dtype=numpy.uint8).reshape(shape[:2] + (1,))
+
+
+def _diff_job(job):
+    x, y, width, row_start, row_end = job
+    return DiffEngine.abs_diff_sum(
+        _shared_init[y + row_start:y + row_end, x:x + width],
+        _shared_cyclic[y + row_start:y + row_end, x:x + width],
+        _shared_keep[y + row_start:y + row_end, x:x + width] if _shared_keep is not None else None
+    )
+
+
+class ProcessPoolBackend(object):
+    """
+    Shards the regions into bands of rows compared by a pool of processes.
+    Baseline and frame live in shared memory, only band coordinates and sums
+    travel between the processes. Scores are always exact.
+    """
+    JOBS_PER_WORKER = 4
+
+    def __init__(self, workers=None):
+        """
+        :param workers: number of processes, defaults to the number of CPUs
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+
+        self.regions = []
+        self.ncomponents = []
+        self.jobs = []
+        self.shared_init = None
+        self.shared_cyclic = None
+        self.pool = None
+        self.changes = None  # changes are not located by the pool
+
+    def start(self, arr_init, regions, keep=None):
+        """
+        Starts a session: copies the baseline and the mask into shared memory and starts the pool
+        :param arr_init: baseline pixel array
+        :param regions: list of Region, in image coordinates
+        :param keep: mask buffer of the whole image (see IgnoreMask.keep_buffer), None compares every pixel
+        :return: None
+        """
+        arr_init = DiffEngine.with_channels(DiffEngine.as_array(arr_init))
+        shape = arr_init.shape
+
+        raw_init = RawArray("B", arr_init.size)
+        raw_cyclic = RawArray("B", arr_init.size)
+        self.shared_init = numpy.frombuffer(raw_init, dtype=numpy.uint8).reshape(shape)
+        self.shared_init[...] = arr_init
+        self.shared_cyclic = numpy.frombuffer(raw_cyclic, dtype=numpy.uint8).reshape(shape)
+
+        if keep is not None:
+            raw_keep = RawArray("B", keep.size)
+            numpy.frombuffer(raw_keep, dtype=numpy.uint8).reshape(keep.shape)[...] = keep
+            self.ncomponents = [DiffEngine.mask(region.view(keep))[1] for region in regions]
+        else:
+            raw_keep = None
+            self.ncomponents = [region.width * region.height * 3 for region in regions]
+
+        self.regions = regions
+        self.jobs = []
+
+        # bands of equal height, a few per worker so that the load stays balanced
+        total_rows = sum(region.height for region in regions)
+        band_rows = max(1, total_rows // (self.workers * ProcessPoolBackend.JOBS_PER_WORKER))
+        for index, region in enumerate(regions):
+            for row in range(0, region.height, band_rows):
+                self.jobs.append((index, (region.x, region.y, region.width, row, min(row + band_rows, region.height))))
+
+        self.pool = multiprocessing.Pool(self.workers, _init_worker, (raw_init, raw_cyclic, raw_keep, shape))
+
+    def update_baseline(self, arr_init):
+        """
+        Replaces the baseline during a session, the workers see it through shared memory
+        :param arr_init: baseline pixel array of the same shape
+        :return: None
+        """
+        self.shared_init[...] = DiffEngine.with_channels(DiffEngine.as_array(arr_init))
+
+    def compare(self, arr_cyclic):
+        """
+        Compares every region of a frame with the baseline
+        :param arr_cyclic: pixel array of the same shape as the baseline
+        :return: OrderedDict of region name -> (score, exact)
+        """
+        self.shared_cyclic[...] = DiffEngine.with_channels(DiffEngine.as_array(arr_cyclic))
+
+        sums = self.pool.map(_diff_job, [job for _, job in self.jobs])
+
+        difs = [0] * len(self.regions)
+        for (index, _), dif in zip(self.jobs, sums):
+            difs[index] += dif
+
+        return OrderedDict(
+            (region.name, (DiffEngine.to_percent(dif, ncomponents), True))
+            for region, ncomponents, dif in zip(self.regions, self.ncomponents, difs)
+        )
+
+    def stop(self):
+        """
+        Ends the session and its processes
+        :return: None
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+        self.shared_init = None
+        self.shared_cyclic = None
@@ -0,0 +1,70 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import numpy
+
+
+class RollingBaseline(object):
+    """
+    Baseline following slow changes of the monitored area (lighting, gradual updates)
+    as an exponential moving average of the frames. Memory is allocated once per session
+    and updated in place.
+    """
+    def __init__(self, rate, freeze_ratio=0.5):
+        """
+        :param rate: weight of each new frame, between 0 (never adapt) and 1 (previous frame)
+        :param freeze_ratio: no adaptation while a score exceeds this fraction of its threshold
+        """
+        self.rate = rate
+        self.freeze_ratio = freeze_ratio
+
+        self.accumulator = None
+        self.scratch = None
+        self.baseline = None
+
+    def start(self, arr_init):
+        """
+        Starts a session
+        :param arr_init: pixel array of the first baseline
+        :return: uint8 array holding the baseline, updated in place by update
+        """
+        self.accumulator = numpy.array(arr_init, dtype=numpy.float32)
+        self.scratch = numpy.empty_like(self.accumulator)
+        self.baseline = numpy.array(arr_init, dtype=numpy.uint8)
+        return self.baseline
+
+    def frozen(self, ratio):
+        """
+        Tells whether a change is in progress
+        :param ratio: highest score to threshold ratio of the last comparison
+        :return: bool
+        """
+        return ratio > self.freeze_ratio
+
+    def update(self, arr):
+        """
+        Blends a frame into the baseline
+        :param arr: pixel array of the same shape as the baseline
+        :return: True if the uint8 baseline changed
+        """
+        # accumulator += rate * (arr - accumulator)
+        numpy.subtract(arr, self.accumulator, out=self.scratch)
+        self.scratch *= self.rate
+        self.accumulator += self.scratch
+
+        numpy.rint(self.accumulator, out=self.scratch)
+        if numpy.array_equal(self.scratch, self.baseline):
+            return False
+
+        numpy.copyto(self.baseline, self.scratch, casting="unsafe")
+        return True
+
+    def stop(self):
+        """
+        Ends the session
+        :return: None
+        """
+        self.accumulator = self.scratch = self.baseline = None
@@ -0,0 +1,389 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import numpy
+
+# 32 bits per pixel screen formats are stored as 0xXXRRGGBB words
+if sys.byteorder == "little":
+    RGB_CHANNELS = slice(2, None, -1)
+else:
+    RGB_CHANNELS = slice(1, 4)
+
+
+class Frame(object):
+    """
+    Captured image
+    """
+    def __init__(self, raw, pixels, timestamp=None):
+        """
+        :param raw: contiguous uint8 array holding the captured bytes, used for fingerprints
+        :param pixels: uint8 array of shape (height, width, channels) in RGB(A) order, usually a view of raw
+        :param timestamp: capture time in seconds, defaults to now
+        """
+        self.raw = raw
+        self.pixels = pixels
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    @staticmethod
+    def from_xrgb(raw, timestamp=None):
+        """
+        Frame from 32 bits per pixel memory where the fourth byte is unused
+        :param raw: uint8 array of shape (height, width, 4)
+        :param timestamp: capture time in seconds
+        :return: Frame
+        """
+        return Frame(raw, raw[:, :, RGB_CHANNELS], timestamp)
+
+    @staticmethod
+    def from_pixels(pixels, timestamp=None):
+        """
+        Frame from an array already in RGB(A) order
+        :param pixels: uint8 array of shape (height, width, channels)
+        :param timestamp: capture time in seconds
+        :return: Frame
+        """
+        pixels = numpy.ascontiguousarray(pixels, dtype=numpy.uint8)
+        return Frame(pixels, pixels, timestamp)
+
+
+class CaptureSource(object):
+    """
+    Source of frames, pulled by the image processor from its own thread
+    """
+    paced = False  # True when grab waits for the next frame itself, the cycle period is then unused
+
+    @staticmethod
+    def available():
+        """
+        Tells whether the source can be used on this system
+        :return: bool
+        """
+        return True
+
+    def start(self):
+        """
+        Acquires the resources needed for capturing, called from the thread that grabs
+        :return: None
+        """
+        pass
+
+    def grab(self):
+        """
+        Captures a frame
+        :return: Frame, or None when the source has no more frames
+        """
+        raise NotImplementedError
+
+    def interrupt(self):
+        """
+        Ends a grab waiting for its frame, can be called from any thread
+        :return: None
+        """
+        pass
+
+    def stop(self):
+        """
+        Releases the resources acquired by start
+        :return: None
+        """
+        pass
+
+
+class ArraySource(CaptureSource):
+    """
+    Synthetic source returning frames from arrays, mostly for tests
+    """
+    def __init__(self, frames):
+        """
+        :param frames: iterable of uint8 arrays of shape (height, width, channels) in RGB(A) order
+        """
+        self.frames = frames
+        self.iterator = None
+
+    def start(self):
+        self.iterator = iter(self.frames)
+
+    def grab(self):
+        pixels = next(self.iterator, None)
+        return None if pixels is None else Frame.from_pixels(pixels)
+
+    def stop(self):
+        self.iterator = None
+
+
+class FileSequenceSource(ArraySource):
+    """
+    Source returning the images of a list of files, in order
+    """
+    def __init__(self, paths, mode="RGB"):
+        """
+        :param paths: list of image file names
+        :param mode: PIL mode the images are converted to
+        """
+        super(FileSequenceSource, self).__init__(None)
+        self.paths = paths
+        self.mode = mode
+
+    @staticmethod
+    def _load(paths, mode):
+        from PIL import Image
+
+        for path in paths:
+            yield numpy.asarray(Image.open(path).convert(mode))
+
+    def start(self):
+        self.iterator = self._load(self.paths, self.mode)
+
+
+class Win32ScreenSource(CaptureSource):
+    """
+    Screen grabber using GDI, usable from any thread
+    """
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+        self.hwnd = None
+        self.hdc = None
+        self.src_dc = None
+        self.mem_dc = None
+        self.bitmap = None
+
+    @staticmethod
+    def available():
+        try:
+            import win32gui
+            import win32ui
+        except ImportError:
+            return False
+
+        return True
+
+    def start(self):
+        import win32gui
+        import win32ui
+
+        self.hwnd = win32gui.GetDesktopWindow()
+        self.hdc = win32gui.GetWindowDC(self.hwnd)
+        self.src_dc = win32ui.CreateDCFromHandle(self.hdc)
+        self.mem_dc = self.src_dc.CreateCompatibleDC()
+        self.bitmap = win32ui.CreateBitmap()
+        self.bitmap.CreateCompatibleBitmap(self.src_dc, self.width, self.height)
+        self.mem_dc.SelectObject(self.bitmap)
+
+    def grab(self):
+        import win32con
+
+        self.mem_dc.BitBlt((0, 0), (self.width, self.height), self.src_dc, (self.x, self.y), win32con.SRCCOPY)
+        bits = self.bitmap.GetBitmapBits(True)
+
+        raw = numpy.frombuffer(bits, dtype=numpy.uint8).reshape(self.height, self.width, 4)
+        return Frame.from_xrgb(raw)
+
+    def stop(self):
+        import win32gui
+
+        if self.mem_dc is not None:
+            self.mem_dc.DeleteDC()
+            self.src_dc.DeleteDC()
+            win32gui.ReleaseDC(self.hwnd, self.hdc)
+            win32gui.DeleteObject(self.bitmap.GetHandle())
+
+        self.hwnd = self.hdc = self.src_dc = self.mem_dc = self.bitmap = None
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XImage(ctypes.Structure):
+    # leading fields only, the structure is always allocated by Xlib
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class X11ShmSource(CaptureSource):
+    """
+    Screen grabber using the MIT-SHM extension of X11, usable from any thread.
+    The X server writes the pixels straight into a shared memory segment.
+    Works with any X server, including Xvfb.
+    """
+    Z_PIXMAP = 2
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+    ALL_PLANES = ctypes.c_ulong(-1)
+
+    def __init__(self, x, y, width, height, display_name=None):
+        """
+        :param display_name: X display, defaults to $DISPLAY
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.display_name = display_name
+
+        self.x11 = None
+        self.xext = None
+        self.libc = None
+        self.display = None
+        self.root = None
+        self.ximage = None
+        self.shm_info = None
+        self.shm = None
+
+    @staticmethod
+    def available():
+        if not os.environ.get("DISPLAY"):
+            return False
+
+        return bool(ctypes.util.find_library("X11") and ctypes.util.find_library("Xext"))
+
+    def _load_libraries(self):
+        self.x11 = ctypes.CDLL(ctypes.util.find_library("X11"))
+        self.xext = ctypes.CDLL(ctypes.util.find_library("Xext"))
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.x11.XRootWindow.restype = ctypes.c_ulong
+        self.x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDefaultVisual.restype = ctypes.c_void_p
+        self.x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+        self.xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        self.xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        self.xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+            ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint
+        ]
+        self.xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        self.xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        self.xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+        ]
+
+        self.libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        self.libc.shmat.restype = ctypes.c_void_p
+        self.libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self.libc.shmdt.argtypes = [ctypes.c_void_p]
+        self.libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def start(self):
+        self._load_libraries()
+
+        self.display = self.x11.XOpenDisplay(self.display_name)
+        if not self.display:
+            raise RuntimeError("Cannot open X display {0}".format(self.display_name or ""))
+
+        if not self.xext.XShmQueryExtension(self.display):
+            self.stop()
+            raise RuntimeError("X server does not support the MIT-SHM extension")
+
+        screen = self.x11.XDefaultScreen(self.display)
+        self.root = self.x11.XRootWindow(self.display, screen)
+
+        self.shm_info = _XShmSegmentInfo()
+        self.ximage = self.xext.XShmCreateImage(
+            self.display,
+            self.x11.XDefaultVisual(self.display, screen),
+            self.x11.XDefaultDepth(self.display, screen),
+            X11ShmSource.Z_PIXMAP,
+            None,
+            ctypes.byref(self.shm_info),
+            self.width,
+            self.height
+        )
+        if not self.ximage:
+            self.stop()
+            raise RuntimeError("Cannot create a shared memory image")
+
+        if self.ximage.contents.bits_per_pixel != 32:
+            self.stop()
+            raise RuntimeError("Only 32 bits per pixel X displays are supported")
+
+        size = self.ximage.contents.bytes_per_line * self.height
+        self.shm_info.shmid = self.libc.shmget(X11ShmSource.IPC_PRIVATE, size, X11ShmSource.IPC_CREAT | 0o600)
+        if self.shm_info.shmid < 0:
+            self.stop()
+            raise OSError(ctypes.get_errno(), "shmget failed")
+
+        self.shm_info.shmaddr = self.libc.shmat(self.shm_info.shmid, None, 0)
+        self.shm_info.readOnly = 0
+        self.ximage.contents.data = self.shm_info.shmaddr
+        self.xext.XShmAttach(self.display, ctypes.byref(self.shm_info))
+        self.x11.XSync(self.display, 0)
+
+        # the segment is destroyed as soon as both the X server and this process detach from it
+        self.libc.shmctl(self.shm_info.shmid, X11ShmSource.IPC_RMID, None)
+
+        buf = (ctypes.c_ubyte * size).from_address(self.shm_info.shmaddr)
+        stride = self.ximage.contents.bytes_per_line
+        self.shm = numpy.frombuffer(buf, dtype=numpy.uint8).reshape(self.height, stride)
+        self.shm = self.shm[:, :self.width * 4].reshape(self.height, self.width, 4)
+
+    def grab(self):
+        self.xext.XShmGetImage(self.display, self.root, self.ximage, self.x, self.y, X11ShmSource.ALL_PLANES)
+
+        # the segment is overwritten by the next grab
+        return Frame.from_xrgb(self.shm.copy())
+
+    def stop(self):
+        if self.ximage:
+            if self.shm_info.shmaddr:
+                self.xext.XShmDetach(self.display, ctypes.byref(self.shm_info))
+                self.x11.XSync(self.display, 0)
+                self.libc.shmdt(self.shm_info.shmaddr)
+
+            # the shared memory is not owned by the image
+            self.ximage.contents.data = None
+            self.x11.XDestroyImage(self.ximage)
+
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+
+        self.display = None
+        self.ximage = None
+        self.shm_info = None
+        self.shm = None
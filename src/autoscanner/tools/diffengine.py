@@ -0,0 +1,488 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import zlib
+import numpy
+
+
+class DiffEngine:
+    """
+    Vectorized image comparison working on whole pixel arrays at once
+    """
+    TILE_ROWS = 32  # rows per tile when comparing tile by tile
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def as_array(img):
+        """
+        Exposes an image as an array of pixels without copying when possible
+        :param img: PIL image or numpy array
+        :return: uint8 array of shape (height, width) or (height, width, channels)
+        """
+        return numpy.asarray(img, dtype=numpy.uint8)
+
+    @staticmethod
+    def as_pair(img1, img2):
+        """
+        Exposes two images as pixel arrays and checks that they can be compared
+        :param img1: PIL image or numpy array
+        :param img2: PIL image or numpy array
+        :return: tuple of two uint8 arrays of the same shape
+        """
+        arr1 = DiffEngine.as_array(img1)
+        arr2 = DiffEngine.as_array(img2)
+
+        if arr1.shape != arr2.shape:
+            raise ValueError("Images differ in size or mode: {0} vs {1}".format(arr1.shape, arr2.shape))
+
+        return arr1, arr2
+
+    @staticmethod
+    def ncomponents(arr):
+        """
+        Number of components used for normalizing the score.
+        Gray-scale images are normalized as if they had three channels,
+        exactly like the reference implementation does.
+        :param arr: pixel array
+        :return: width * height * 3
+        """
+        return arr.shape[0] * arr.shape[1] * 3
+
+    @staticmethod
+    def mask(keep):
+        """
+        Precomputes a mask buffer once per session
+        :param keep: uint8 array of shape (height, width, 1), 1 for compared pixels and 0 for ignored ones
+        :return: (keep, ncomponents) - ncomponents only counts the compared pixels
+        """
+        # a fully ignored area always scores 0
+        return keep, max(1, int(numpy.count_nonzero(keep)) * 3)
+
+    @staticmethod
+    def abs_diff_sum(arr1, arr2, keep=None):
+        """
+        Sum of absolute differences between two uint8 arrays of the same shape
+        :param arr1: first pixel array
+        :param arr2: second pixel array
+        :param keep: 0/1 uint8 array with a single channel, ignored pixels do not count
+        :return: integer sum over every pixel and every channel
+        """
+        # |a - b| == max(a, b) - min(a, b), which never leaves the uint8 range
+        dif = numpy.maximum(arr1, arr2)
+        dif -= numpy.minimum(arr1, arr2)
+
+        if keep is not None:
+            # broadcast over the channels, gray-scale arrays have no channel axis
+            dif *= keep if keep.ndim == dif.ndim else keep[..., 0]
+
+        return int(dif.sum(dtype=numpy.uint64))
+
+    @staticmethod
+    def to_percent(dif, ncomponents):
+        """
+        Converts a sum of absolute differences into the percent-difference score
+        :param dif: sum of absolute differences
+        :param ncomponents: normalization factor
+        :return: score between 0 and 100
+        """
+        return (dif / 255.0 * 100) / ncomponents
+
+    @staticmethod
+    def score(img1, img2, mask=None):
+        """
+        Percent difference between two images of the same size and mode
+        :param img1: PIL image or numpy array
+        :param img2: PIL image or numpy array
+        :param mask: mask buffer returned by mask, None compares every pixel
+        :return: score between 0 and 100
+        """
+        arr1, arr2 = DiffEngine.as_pair(img1, img2)
+
+        if mask is None:
+            return DiffEngine.to_percent(DiffEngine.abs_diff_sum(arr1, arr2), DiffEngine.ncomponents(arr1))
+
+        keep, ncomponents = mask
+        return DiffEngine.to_percent(DiffEngine.abs_diff_sum(arr1, arr2, keep), ncomponents)
+
+    @staticmethod
+    def score_tiled(img1, img2, threshold=None, tile_rows=None, mask=None):
+        """
+        Percent difference computed tile by tile (bands of rows).
+        The running score never decreases, so as soon as it exceeds the threshold
+        the remaining tiles cannot change the outcome and are skipped.
+        :param img1: PIL image or numpy array
+        :param img2: PIL image or numpy array
+        :param threshold: stop once the score exceeds it, None computes the exact score
+        :param tile_rows: number of rows per tile, defaults to TILE_ROWS
+        :param mask: mask buffer returned by mask, None compares every pixel
+        :return: (score, exact) - when exact is False, score is a lower bound above the threshold
+        """
+        arr1, arr2 = DiffEngine.as_pair(img1, img2)
+
+        if tile_rows is None:
+            tile_rows = DiffEngine.TILE_ROWS
+
+        if mask is None:
+            keep, ncomponents = None, DiffEngine.ncomponents(arr1)
+        else:
+            keep, ncomponents = mask
+
+        height = arr1.shape[0]
+        dif = 0
+
+        for row in xrange(0, height, tile_rows):
+            dif += DiffEngine.abs_diff_sum(
+                arr1[row:row + tile_rows],
+                arr2[row:row + tile_rows],
+                keep[row:row + tile_rows] if keep is not None else None
+            )
+
+            if threshold is not None and DiffEngine.to_percent(dif, ncomponents) > threshold:
+                return DiffEngine.to_percent(dif, ncomponents), row + tile_rows >= height
+
+        return DiffEngine.to_percent(dif, ncomponents), True
+
+    @staticmethod
+    def tile_sums(arr, tile):
+        """
+        Sums of square tiles, the tiles on the bottom and right edges may be smaller
+        :param arr: array of shape (height, width)
+        :param tile: side of a tile in pixels
+        :return: uint64 array of shape (tile rows, tile columns)
+        """
+        rows = numpy.arange(0, arr.shape[0], tile)
+        cols = numpy.arange(0, arr.shape[1], tile)
+        return numpy.add.reduceat(numpy.add.reduceat(arr, rows, axis=0, dtype=numpy.uint64), cols, axis=1)
+
+    @staticmethod
+    def score_map(img1, img2, tile=None, mask=None):
+        """
+        Percent difference together with the percent difference of every tile,
+        both coming from the same pass over the pixels
+        :param img1: PIL image or numpy array
+        :param img2: PIL image or numpy array
+        :param tile: side of a tile in pixels, defaults to TILE_ROWS
+        :param mask: mask buffer returned by mask, None compares every pixel
+        :return: (score, float array of the tile scores between 0 and 100)
+        """
+        arr1, arr2 = DiffEngine.as_pair(img1, img2)
+        arr1, arr2 = DiffEngine.with_channels(arr1), DiffEngine.with_channels(arr2)
+
+        if tile is None:
+            tile = DiffEngine.TILE_ROWS
+
+        dif = numpy.maximum(arr1, arr2)
+        dif -= numpy.minimum(arr1, arr2)
+
+        if mask is None:
+            keep, ncomponents = None, DiffEngine.ncomponents(arr1)
+            tile_components = DiffEngine.tile_sums(numpy.ones(arr1.shape[:2], dtype=numpy.uint8), tile) * 3
+        else:
+            keep, ncomponents = mask
+            dif *= keep
+            tile_components = DiffEngine.tile_sums(keep[..., 0], tile) * 3
+
+        sums = DiffEngine.tile_sums(dif.sum(axis=2, dtype=numpy.uint32), tile)
+
+        # a fully ignored tile always scores 0
+        return (
+            DiffEngine.to_percent(int(sums.sum()), ncomponents),
+            DiffEngine.to_percent(sums, numpy.maximum(tile_components, 1))
+        )
+
+    @staticmethod
+    def change_boxes(tile_scores, tile, floor, width, height):
+        """
+        Bounding boxes of the groups of touching tiles (diagonals included) scoring above the floor
+        :param tile_scores: tile scores returned by score_map
+        :param tile: side of a tile in pixels
+        :param floor: tile score (percent) above which a tile has changed
+        :param width: width of the compared image, the boxes are clipped to it
+        :param height: height of the compared image
+        :return: list of (x, y, width, height), in pixels
+        """
+        changed = tile_scores > floor
+        seen = numpy.zeros_like(changed)
+        tile_rows, tile_cols = changed.shape
+        boxes = []
+
+        for row, col in zip(*numpy.nonzero(changed)):
+            if seen[row, col]:
+                continue
+
+            # flood fill of the group, only its extent is kept
+            seen[row, col] = True
+            stack = [(row, col)]
+            top, bottom, left, right = row, row, col, col
+            while stack:
+                y, x = stack.pop()
+                top, bottom, left, right = min(top, y), max(bottom, y), min(left, x), max(right, x)
+
+                for ny in xrange(max(0, y - 1), min(tile_rows, y + 2)):
+                    for nx in xrange(max(0, x - 1), min(tile_cols, x + 2)):
+                        if changed[ny, nx] and not seen[ny, nx]:
+                            seen[ny, nx] = True
+                            stack.append((ny, nx))
+
+            x, y = int(left * tile), int(top * tile)
+            boxes.append((x, y, min(width, int(right + 1) * tile) - x, min(height, int(bottom + 1) * tile) - y))
+
+        return boxes
+
+    @staticmethod
+    def with_channels(arr):
+        """
+        Adds a channel axis to gray-scale arrays
+        :param arr: pixel array
+        :return: view of shape (height, width, channels)
+        """
+        return arr.reshape(arr.shape[0], arr.shape[1], -1)
+
+    @staticmethod
+    def blocks(arr, factor):
+        """
+        Splits the pixels into square blocks, rows and columns beyond the last full block are left out
+        :param arr: pixel array of shape (height, width, channels)
+        :param factor: side of a block in pixels
+        :return: view of shape (block rows, factor, block columns, factor, channels)
+        """
+        rows = arr.shape[0] // factor
+        cols = arr.shape[1] // factor
+        return arr[:rows * factor, :cols * factor].reshape(rows, factor, cols, factor, arr.shape[2])
+
+    @staticmethod
+    def block_reduce(arr, factor, ufunc, dtype=None):
+        """
+        Reduces square blocks of pixels, rows and columns beyond the last full block are left out.
+        The rows of each band of blocks are reduced first, over whole rows of memory, then the columns
+        one at a time, which numpy does several times faster than reducing both block axes at once.
+        :param arr: pixel array of shape (height, width, channels)
+        :param factor: side of a block in pixels
+        :param ufunc: numpy reduction, such as numpy.add or numpy.minimum
+        :param dtype: accumulator type of numpy.add, None keeps the type of the pixels
+        :return: array of shape (block rows, block columns, channels)
+        """
+        height, width, channels = arr.shape
+        rows = height // factor
+        cols = width // factor
+
+        band_dtype = dtype
+        if dtype is not None and factor * 255 <= numpy.iinfo(numpy.uint16).max:
+            # the sum of a column of a block fits in half the bytes
+            band_dtype = numpy.uint16
+
+        bands = ufunc.reduce(arr[:rows * factor].reshape(rows, factor, width, channels), axis=1, dtype=band_dtype)
+        bands = bands[:, :cols * factor].reshape(rows, cols, factor, channels)
+
+        reduced = bands[:, :, 0].astype(dtype or bands.dtype)
+        for col in xrange(1, factor):
+            ufunc(reduced, bands[:, :, col], out=reduced)
+        return reduced
+
+    @staticmethod
+    def reduce(arr, factor):
+        """
+        Downsamples an image by averaging square blocks of pixels
+        :param arr: pixel array of shape (height, width, channels)
+        :param factor: side of a block in pixels
+        :return: float32 array of shape (block rows, block columns, channels)
+        """
+        sums = DiffEngine.block_reduce(arr, factor, numpy.add, numpy.uint32)
+        return sums.astype(numpy.float32) / (factor * factor)
+
+    @staticmethod
+    def block_range(arr, factor):
+        """
+        Smallest and largest value of every channel in each square block
+        :param arr: pixel array of shape (height, width, channels)
+        :param factor: side of a block in pixels
+        :return: (minima, maxima), int16 arrays of shape (block rows, block columns, channels)
+        """
+        return (
+            DiffEngine.block_reduce(arr, factor, numpy.minimum).astype(numpy.int16),
+            DiffEngine.block_reduce(arr, factor, numpy.maximum).astype(numpy.int16)
+        )
+
+    @staticmethod
+    def build_pyramid(img, levels, mask=None):
+        """
+        Precomputes the coarse version of a baseline image
+        :param img: PIL image or numpy array
+        :param levels: number of halvings between the full and the coarse resolution
+        :param mask: mask buffer returned by mask, None compares every pixel
+        :return: (full resolution array, coarse array, block side, mask, blocks holding ignored pixels,
+        (block minima, block maxima))
+        """
+        arr = DiffEngine.with_channels(DiffEngine.as_array(img))
+        factor = 2 ** levels
+
+        # the coarse estimate of a partly ignored block is meaningless, such blocks are always refined
+        masked_blocks = None
+        if mask is not None:
+            masked_blocks = DiffEngine.block_reduce(mask[0], factor, numpy.minimum)[..., 0] == 0
+
+        return arr, DiffEngine.reduce(arr, factor), factor, mask, masked_blocks, DiffEngine.block_range(arr, factor)
+
+    @staticmethod
+    def score_pyramid(pyramid, img, floor, threshold=None):
+        """
+        Coarse-to-fine percent difference against a precomputed baseline pyramid.
+        Identical blocks are found first by a cheap exact pass and do not differ at all.
+        Changed blocks whose coarse score is above the floor are compared at full resolution,
+        the other ones keep their coarse estimate, which never exceeds their real difference:
+        changes that average out within a block, such as a checkerboard, are not seen at all.
+        With a threshold, the value ranges of those blocks also bound their difference from above
+        (no component can differ by more than the distance between the two ranges), and the blocks
+        with the widest bounds are refined until the bounds decide the threshold.
+        Leftover rows and columns that do not fill a block are always compared at full resolution.
+        :param pyramid: baseline pyramid returned by build_pyramid
+        :param img: PIL image or numpy array
+        :param floor: coarse block score (percent) above which a block is refined
+        :param threshold: score the result is compared with, None only refines the blocks above the floor
+        :return: (score, exact) - when exact is False, score is a lower bound, above the threshold when
+        one is given, or an upper bound not above the threshold
+        """
+        base, base_coarse, factor, mask, masked_blocks, (base_min, base_max) = pyramid
+        base, arr = DiffEngine.as_pair(base, DiffEngine.with_channels(DiffEngine.as_array(img)))
+
+        if mask is None:
+            keep, ncomponents = None, DiffEngine.ncomponents(base)
+        else:
+            keep, ncomponents = mask
+
+        # leftovers on the bottom and right edges
+        rows = base_coarse.shape[0] * factor
+        cols = base_coarse.shape[1] * factor
+        if keep is None:
+            dif = DiffEngine.abs_diff_sum(base[rows:], arr[rows:])
+            dif += DiffEngine.abs_diff_sum(base[:rows, cols:], arr[:rows, cols:])
+        else:
+            dif = DiffEngine.abs_diff_sum(base[rows:], arr[rows:], keep[rows:])
+            dif += DiffEngine.abs_diff_sum(base[:rows, cols:], arr[:rows, cols:], keep[:rows, cols:])
+
+        # blocks holding ignored pixels, always at full resolution
+        changed = DiffEngine.block_reduce(numpy.not_equal(base, arr), factor, numpy.logical_or).any(axis=2)
+        if masked_blocks is not None:
+            block_rows, block_cols = numpy.nonzero(changed & masked_blocks)
+            dif += DiffEngine.abs_diff_sum(
+                DiffEngine.blocks(base, factor)[block_rows, :, block_cols],
+                DiffEngine.blocks(arr, factor)[block_rows, :, block_cols],
+                DiffEngine.blocks(keep, factor)[block_rows, :, block_cols]
+            )
+            changed &= ~masked_blocks
+
+        block_rows, block_cols = numpy.nonzero(changed)
+        if not len(block_rows):
+            return DiffEngine.to_percent(dif, ncomponents), True
+
+        # the changed blocks only, of shape (blocks, factor, factor, channels)
+        base_blocks = DiffEngine.blocks(base, factor)[block_rows, :, block_cols]
+        arr_blocks = DiffEngine.blocks(arr, factor)[block_rows, :, block_cols]
+
+        def reduce_blocks(blocks, ufunc, dtype=None):
+            # stacked into a column one block wide, where block_reduce finds long rows of memory
+            return DiffEngine.block_reduce(blocks.reshape(-1, factor, blocks.shape[3]), factor, ufunc, dtype)[:, 0]
+
+        # coarse level, expressed as a sum of absolute differences per block
+        area = factor * factor
+        arr_coarse = reduce_blocks(arr_blocks, numpy.add, numpy.uint32).astype(numpy.float32) / area
+        coarse_dif = numpy.abs(base_coarse[block_rows, block_cols] - arr_coarse).sum(axis=1) * area
+        lower = dif + int(coarse_dif.sum())
+        if threshold is not None and DiffEngine.to_percent(lower, ncomponents) > threshold:
+            return DiffEngine.to_percent(lower, ncomponents), False
+
+        # fine level, only for the blocks that showed a difference
+        fine = DiffEngine.to_percent(coarse_dif, area * 3) > floor
+        dif += DiffEngine.abs_diff_sum(base_blocks[fine], arr_blocks[fine])
+
+        pending = numpy.nonzero(~fine)[0]
+        lower_blocks = coarse_dif[pending]
+        lower = dif + int(lower_blocks.sum())
+        if not len(pending) or threshold is None or DiffEngine.to_percent(lower, ncomponents) > threshold:
+            return DiffEngine.to_percent(lower, ncomponents), not len(pending)
+
+        # upper bounds of the blocks left at the coarse level
+        block_rows, block_cols = block_rows[pending], block_cols[pending]
+        upper_blocks = numpy.maximum(
+            base_max[block_rows, block_cols] - reduce_blocks(arr_blocks[pending], numpy.minimum),
+            reduce_blocks(arr_blocks[pending], numpy.maximum) - base_min[block_rows, block_cols]
+        ).sum(axis=1, dtype=numpy.int64) * area
+
+        upper = dif + int(upper_blocks.sum())
+        if DiffEngine.to_percent(upper, ncomponents) <= threshold:
+            return DiffEngine.to_percent(upper, ncomponents), False
+
+        # widest bounds first, as many blocks as needed for the bound to fall under the threshold
+        # if their differences turn out to be their lower bounds
+        order = numpy.argsort(lower_blocks - upper_blocks, kind="mergesort")
+        hoped = upper - numpy.cumsum(upper_blocks[order] - lower_blocks[order])
+        count = int(numpy.argmax(DiffEngine.to_percent(hoped, ncomponents) <= threshold)) + 1
+        if DiffEngine.to_percent(hoped[-1], ncomponents) > threshold:
+            count = len(order)
+
+        chosen, rest = pending[order[:count]], order[count:]
+        dif += DiffEngine.abs_diff_sum(base_blocks[chosen], arr_blocks[chosen])
+        lower = dif + int(lower_blocks[rest].sum())
+        upper = dif + int(upper_blocks[rest].sum())
+
+        if not len(rest):
+            return DiffEngine.to_percent(dif, ncomponents), True
+        if DiffEngine.to_percent(lower, ncomponents) > threshold:
+            return DiffEngine.to_percent(lower, ncomponents), False
+        if DiffEngine.to_percent(upper, ncomponents) <= threshold:
+            return DiffEngine.to_percent(upper, ncomponents), False
+
+        # the bounds still straddle the threshold, the remaining blocks settle it
+        dif += DiffEngine.abs_diff_sum(base_blocks[pending[rest]], arr_blocks[pending[rest]])
+        return DiffEngine.to_percent(dif, ncomponents), True
+
+    @staticmethod
+    def checksum(arr):
+        """
+        Exact fingerprint of the raw bytes of an array, cheaper to compute than a comparison
+        :param arr: numpy array
+        :return: hashable fingerprint, equal for arrays holding the same bytes
+        """
+        buf = numpy.ascontiguousarray(arr)
+        return zlib.crc32(buf) & 0xffffffff, zlib.adler32(buf) & 0xffffffff, buf.shape
+
+    @staticmethod
+    def average_hash(img, size=8):
+        """
+        Perceptual fingerprint: one bit per cell of a size x size grid,
+        set when the cell is brighter than the average of the image.
+        Only a subsample of the pixels is read.
+        :param img: PIL image or numpy array
+        :param size: side of the grid
+        :return: integer of size * size bits
+        """
+        arr = DiffEngine.with_channels(DiffEngine.as_array(img))
+
+        # read at most 4 x 4 pixels per cell
+        step_y = max(1, arr.shape[0] // (size * 4))
+        step_x = max(1, arr.shape[1] // (size * 4))
+        sample = arr[::step_y, ::step_x].sum(axis=2, dtype=numpy.uint32)
+
+        # average brightness of each cell
+        ys = numpy.arange(sample.shape[0]) * size // sample.shape[0]
+        xs = numpy.arange(sample.shape[1]) * size // sample.shape[1]
+        cells = numpy.zeros((size, size))
+        counts = numpy.zeros((size, size))
+        numpy.add.at(cells, (ys[:, None], xs[None, :]), sample)
+        numpy.add.at(counts, (ys[:, None], xs[None, :]), 1)
+        cells /= numpy.maximum(counts, 1)
+
+        bits = (cells > cells.mean()).ravel()
+        return sum(1 << int(i) for i in numpy.nonzero(bits)[0])
+
+    @staticmethod
+    def hamming(hash1, hash2):
+        """
+        Number of differing bits between two perceptual fingerprints
+        """
+        return bin(hash1 ^ hash2).count("1")
@@ -0,0 +1,107 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+from autoscanner.tools.diffengine import DiffEngine
+
+
+class FrameCache:
+    """
+    Remembers the fingerprints of the baseline and of the previous compared frame,
+    so that frames with the same content reuse an already known result.
+    A perceptually similar frame is not identical: it only reuses the results known to stay
+    under every threshold, and those results are then estimates rather than exact ones.
+    """
+    def __init__(self, perceptual=False, max_distance=0):
+        """
+        :param perceptual: also match frames through their perceptual fingerprint
+        :param max_distance: number of perceptual fingerprint bits allowed to differ
+        """
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+
+        self.init_fp = None
+        self.init_result = None
+        self.prev_fp = None
+        self.prev_result = None
+        self.prev_quiet = False
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, raw, arr):
+        """
+        Fingerprint of a frame
+        :param raw: raw bytes of the frame, used for the exact fingerprint
+        :param arr: pixel array of the frame, used for the perceptual fingerprint
+        :return: (exact fingerprint, perceptual fingerprint or None)
+        """
+        return DiffEngine.checksum(raw), DiffEngine.average_hash(arr) if self.perceptual else None
+
+    def reset(self, init_fp, init_result):
+        """
+        Starts a new session
+        :param init_fp: fingerprint of the baseline
+        :param init_result: result of comparing the baseline with itself
+        :return: None
+        """
+        self.init_fp = init_fp
+        self.init_result = init_result
+        self.prev_fp = None
+        self.prev_result = None
+        self.prev_quiet = False
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """
+        Forgets the known results after the baseline changed, hit and miss counts are kept
+        :return: None
+        """
+        self.init_fp = None
+        self.init_result = None
+        self.prev_fp = None
+        self.prev_result = None
+        self.prev_quiet = False
+
+    def _similar(self, fp1, fp2):
+        return self.perceptual and DiffEngine.hamming(fp1[1], fp2[1]) <= self.max_distance
+
+    def lookup(self, fp):
+        """
+        Looks up the result of a frame
+        :param fp: fingerprint of the frame
+        :return: (known result, exact) - exact is False when the frame is only perceptually similar
+        to a frame scoring under every threshold - or None when the frame has to be compared
+        """
+        known = []
+        if self.init_fp is not None:
+            known.append((self.init_fp, self.init_result, True))  # the baseline scores 0
+        if self.prev_fp is not None:
+            known.append((self.prev_fp, self.prev_result, self.prev_quiet))
+
+        for known_fp, result, _ in known:
+            if fp[0] == known_fp[0]:
+                self.hits += 1
+                return result, True
+
+        for known_fp, result, quiet in known:
+            if quiet and self._similar(fp, known_fp):
+                self.hits += 1
+                return result, False
+
+        self.misses += 1
+        return None
+
+    def store(self, fp, result, quiet=False):
+        """
+        Remembers the result of the last compared frame
+        :param fp: fingerprint of the frame
+        :param result: result of the comparison
+        :param quiet: the frame scored under every threshold, only then do similar frames reuse the result
+        :return: None
+        """
+        self.prev_fp = fp
+        self.prev_result = result
+        self.prev_quiet = quiet
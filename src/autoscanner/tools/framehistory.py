@@ -0,0 +1,158 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import os
+import time
+import zlib
+import timeit
+import logging
+import threading
+from collections import deque
+
+import numpy
+
+log = logging.getLogger(__name__)
+
+
+class FrameHistory(object):
+    """
+    Ring buffer of the recent frames, kept as zlib-compressed differences with the baseline:
+    the unchanged pixels are zeros and compress to almost nothing.
+    The oldest frames are dropped beyond the frame count, the age or the memory cap.
+    """
+    LEVEL = 1  # zlib level, the fastest one, every frame is compressed inside the scan loop
+    STOP_TIMEOUT = 30.0  # seconds given to the dumps being written when quitting
+
+    def __init__(self, directory, max_frames=0, max_seconds=0.0, max_bytes=64 * 1024 * 1024):
+        """
+        :param directory: directory receiving the dumps
+        :param max_frames: number of frames kept, 0 for no limit
+        :param max_seconds: age of the oldest frame kept relative to the newest one, 0 for no limit
+        :param max_bytes: memory cap of the compressed frames and the baseline
+        """
+        self.directory = directory
+        self.max_frames = max_frames
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+
+        self.lock = threading.Lock()
+        self.frames = deque()  # (timestamp, compressed difference)
+        self.size = 0
+        self.baseline = None
+        self.scratch = None
+        self.writers = []
+
+    def start(self, frame_init):
+        """
+        Empties the buffer, the differences are taken with a new baseline
+        :param frame_init: baseline Frame
+        :return: None
+        """
+        with self.lock:
+            self.frames.clear()
+            self.baseline = numpy.array(frame_init.pixels)
+            self.scratch = numpy.empty_like(self.baseline)
+            self.size = self.baseline.nbytes
+
+    def append(self, frame):
+        """
+        Compresses a frame into the buffer, called from a single thread
+        :param frame: Frame of the baseline size
+        :return: None
+        """
+        # the uint8 subtraction wraps around, adding the baseline back restores the exact frame
+        numpy.subtract(frame.pixels, self.baseline, out=self.scratch)
+        compressed = zlib.compress(buffer(self.scratch), FrameHistory.LEVEL)
+
+        with self.lock:
+            self.frames.append((frame.timestamp, compressed))
+            self.size += len(compressed)
+
+            while self.frames and (
+                self.size > self.max_bytes or
+                0 < self.max_frames < len(self.frames) or
+                0 < self.max_seconds < frame.timestamp - self.frames[0][0]
+            ):
+                self.size -= len(self.frames.popleft()[1])
+
+    def __len__(self):
+        return len(self.frames)
+
+    def dump(self, until=None):
+        """
+        Writes the buffered frames as PNG images to a new directory, from a background thread
+        :param until: timestamp of the last frame written, None for all of them
+        :return: path of the directory being written, None if it cannot be created
+        """
+        with self.lock:
+            # the compressed frames are immutable, copying the references is enough
+            frames = [item for item in self.frames if until is None or item[0] <= until]
+            baseline = self.baseline
+
+        name = os.path.join(self.directory, time.strftime("alert-%Y%m%d-%H%M%S", time.localtime(until)))
+        path, suffix = name, 1
+        while os.path.exists(path):
+            # several alerts within the same second
+            suffix += 1
+            path = "{0}-{1}".format(name, suffix)
+
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            log.error("cannot write the frame history: %s", e)
+            return None
+
+        writer = threading.Thread(target=FrameHistory._write, args=(path, baseline, frames), name="history")
+        writer.daemon = True
+        writer.start()
+        with self.lock:
+            self.writers = [thread for thread in self.writers if thread.is_alive()] + [writer]
+
+        return path
+
+    def wait(self, timeout=None):
+        """
+        Waits for the dumps being written, the writers are daemon threads that do not hold up
+        the exit of the process
+        :param timeout: seconds to wait for all of them, None to wait until done
+        :return: True if every dump is complete
+        """
+        with self.lock:
+            writers = list(self.writers)
+
+        deadline = None if timeout is None else timeit.default_timer() + timeout
+        for writer in writers:
+            writer.join(None if deadline is None else max(0.0, deadline - timeit.default_timer()))
+
+        with self.lock:
+            self.writers = [thread for thread in self.writers if thread.is_alive()]
+            return not self.writers
+
+    @staticmethod
+    def decode(baseline, compressed):
+        """
+        Frame pixels from their compressed difference
+        :param baseline: pixels of the baseline
+        :param compressed: compressed difference
+        :return: uint8 array of the baseline shape
+        """
+        difference = numpy.frombuffer(zlib.decompress(compressed), dtype=numpy.uint8).reshape(baseline.shape)
+        return baseline + difference
+
+    @staticmethod
+    def _write(path, baseline, frames):
+        from PIL import Image
+
+        try:
+            Image.fromarray(baseline).save(os.path.join(path, "baseline.png"))
+            for i, (timestamp, compressed) in enumerate(frames):
+                name = "frame-{0:04d}-{1:.3f}.png".format(i, timestamp)
+                Image.fromarray(FrameHistory.decode(baseline, compressed)).save(os.path.join(path, name))
+        except (IOError, OSError) as e:
+            log.error("cannot write the frame history to %s: %s", path, e)
+            return
+
+        log.info("%d frame(s) before the alert written to %s", len(frames), path)
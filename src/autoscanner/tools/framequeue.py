@@ -0,0 +1,107 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import threading
+from collections import deque
+
+
+class FrameQueue(object):
+    """
+    Bounded queue connecting two pipeline stages, with an explicit policy
+    for what happens when the consumer does not keep up
+    """
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued item to make room
+    DROP_NEWEST = "drop_newest"  # discard the item being put
+    BLOCK = "block"              # wait until the consumer makes room
+
+    POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+    def __init__(self, maxsize, policy=DROP_OLDEST):
+        """
+        :param maxsize: maximum number of queued items, at least 1
+        :param policy: one of POLICIES
+        """
+        if policy not in FrameQueue.POLICIES:
+            raise ValueError("Unknown queue policy: {0}".format(policy))
+
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+
+        self.items = deque()
+        self.pinned = 0  # queued items that can never be dropped
+        self.condition = threading.Condition()
+        self.closed = False
+
+        self.max_depth = 0
+        self.dropped = 0
+
+    @property
+    def depth(self):
+        return len(self.items)
+
+    def put(self, item, policy=None, pinned=False):
+        """
+        Queues an item
+        :param item: any object but None
+        :param policy: overrides the policy of the queue for this item
+        :param pinned: the item is never dropped, the next puts wait for it to be taken
+        rather than dropping it, whatever their policy
+        :return: False if the item was dropped or the queue is closed
+        """
+        policy = policy or self.policy
+
+        with self.condition:
+            if policy == FrameQueue.BLOCK or pinned:
+                while not self.closed and len(self.items) >= self.maxsize:
+                    self.condition.wait()
+            else:
+                while not self.closed and self.pinned and len(self.items) >= self.maxsize:
+                    self.condition.wait()
+
+            if self.closed:
+                return False
+
+            if len(self.items) >= self.maxsize:
+                self.dropped += 1
+
+                if policy == FrameQueue.DROP_NEWEST:
+                    return False
+
+                self.items.popleft()
+
+            self.items.append((item, pinned))
+            self.pinned += pinned
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify_all()
+
+        return True
+
+    def get(self):
+        """
+        Takes the oldest item, waiting for one if needed
+        :return: item, or None once the queue is closed and empty
+        """
+        with self.condition:
+            while not self.closed and not self.items:
+                self.condition.wait()
+
+            if not self.items:
+                return None
+
+            item, pinned = self.items.popleft()
+            self.pinned -= pinned
+            self.condition.notify_all()
+
+        return item
+
+    def close(self):
+        """
+        Ends the stream: producers are released, consumers still get the queued items
+        :return: None
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
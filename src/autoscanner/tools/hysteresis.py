@@ -0,0 +1,76 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+
+class HysteresisGate(object):
+    """
+    Alert state of every region for continuous monitoring.
+    A region enters the alert state when its score rises above its threshold and only
+    leaves it once the score falls below the lower clear threshold. A transition is only
+    committed after its condition has held for the dwell time, so that a score hovering
+    around a threshold does not make the state flap.
+    """
+    ENTER = "enter"
+    EXIT = "exit"
+
+    def __init__(self, clear_ratio=0.8, dwell=0.0):
+        """
+        :param clear_ratio: clear threshold as a fraction of the raise threshold of each region
+        :param dwell: seconds a transition condition must hold before the state changes
+        """
+        self.clear_ratio = clear_ratio
+        self.dwell = dwell
+        self.thresholds = {}
+        self.active = {}
+        self.since = {}
+
+    def start(self, regions):
+        """
+        Every region starts outside the alert state
+        :param regions: list of Region
+        :return: None
+        """
+        self.thresholds = dict(
+            (region.name, (region.threshold, region.threshold * self.clear_ratio)) for region in regions
+        )
+        self.active = dict((region.name, False) for region in regions)
+        self.since = {}
+
+    @property
+    def active_regions(self):
+        """
+        :return: names of the regions in the alert state
+        """
+        return [name for name, active in self.active.items() if active]
+
+    def update(self, results, timestamp):
+        """
+        Feeds the scores of a comparison
+        :param results: dict of region name: (score, exact)
+        :param timestamp: capture time of the compared frame, in seconds
+        :return: list of (ENTER or EXIT, region name) for the committed transitions
+        """
+        events = []
+        for name, (raise_threshold, clear_threshold) in self.thresholds.items():
+            score = results[name][0]
+
+            if self.active[name]:
+                leaving = score < clear_threshold
+            else:
+                leaving = score > raise_threshold
+
+            if not leaving:
+                # back on the side of the current state, the pending transition is cancelled
+                self.since.pop(name, None)
+                continue
+
+            since = self.since.setdefault(name, timestamp)
+            if timestamp - since >= self.dwell:
+                self.active[name] = not self.active[name]
+                del self.since[name]
+                events.append((HysteresisGate.ENTER if self.active[name] else HysteresisGate.EXIT, name))
+
+        return events
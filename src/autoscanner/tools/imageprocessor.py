@@ -4,21 +4,35 @@ Created on 27 nov. 2015
 @author: Valtyr Farshield
 """
 
-import time
+import logging
+import threading
+import traceback
+from collections import OrderedDict
 
 from PySide import QtCore
-from autoscanner.tools.scantools import ScanTools
+from autoscanner.tools.framecache import FrameCache
+from autoscanner.tools.region import Region
+from autoscanner.tools.backends import ThreadBackend
+from autoscanner.tools.scheduler import CycleScheduler
+from autoscanner.tools.framequeue import FrameQueue
+from autoscanner.tools.tracing import CycleTracer
+from autoscanner.tools.hysteresis import HysteresisGate
+
+log = logging.getLogger(__name__)
 
 
 class ImageProcessor(QtCore.QObject):
     """
     Handles the comparison between images
     """
-    waitCondition = QtCore.QWaitCondition()
-    mutex = QtCore.QMutex()
-
-    request_image = QtCore.Signal()
-    comparison_done = QtCore.Signal(float)
+    baseline_captured = QtCore.Signal(object)
+    frame_captured = QtCore.Signal(object)
+    comparison_done = QtCore.Signal(object)
+    deadline_missed = QtCore.Signal(int)
+    period_changed = QtCore.Signal(float)
+    region_changed = QtCore.Signal(str, bool)  # region name, entered the alert state
+    changes_located = QtCore.Signal(object)
+    error = QtCore.Signal(str)
     finished = QtCore.Signal(bool)
 
     def __init__(self, parent=None):
@@ -28,52 +42,363 @@ class ImageProcessor(QtCore.QObject):
         self.exiting = False
         self.threshold = None
         self.cycle_time = None
-        self.img_init = None
-        self.img_cyclic = None
+        self.source = None
+        self.regions = []
+        self.exceeded_regions = []
+        self.backend = None
+        self.frame_cache = None
+        self.scheduler = None
+        self.adaptive_rate = None
+        self.rolling_baseline = None
+        self.ignore_mask = None
+        self.tracer = None
+        self.hysteresis = None
+        self.history = None
+        self.history_dump = None
+        self.changes = None
+        self.recorder = None
+        self.queue_size = 1
+        self.queue_policy = FrameQueue.DROP_OLDEST
+        self.captured = None
+        self.converted = None
+        self.stage_error = None
 
-    def config(self, threshold, cycle_time, img_init):
+    def config(self, threshold, cycle_time, source, regions=None, backend=None, fast_path=False,
+               perceptual_distance=None, queue_size=1, queue_policy=FrameQueue.DROP_OLDEST, adaptive_rate=None,
+               rolling_baseline=None, ignore_mask=None, tracer=None, hysteresis=None, history=None,
+               recorder=None):
+        """
+        Prepares a session
+        :param threshold: threshold of the whole image, used when no regions are given
+        :param cycle_time: seconds between two comparisons, fractions of a second are allowed
+        :param source: CaptureSource providing the baseline and the cyclic frames
+        :param regions: list of Region, in image coordinates, all compared from the same image
+        :param backend: comparison backend, defaults to comparing in the worker thread
+        :param fast_path: reuse the result of frames identical to the baseline or to the previous one
+        :param perceptual_distance: also reuse results of perceptually similar frames, None to disable
+        :param queue_size: number of frames waiting between two pipeline stages
+        :param queue_policy: what to do with frames when a stage does not keep up, see FrameQueue;
+        always FrameQueue.BLOCK for a paced source such as a replay
+        :param adaptive_rate: AdaptiveRate adjusting the cycle period to the scores, None for a fixed period
+        :param rolling_baseline: RollingBaseline blending the frames into the baseline, None for a fixed baseline
+        :param ignore_mask: IgnoreMask of the captured image, None compares every pixel
+        :param tracer: CycleTracer timing the stages of every cycle, None to disable the measures
+        :param hysteresis: HysteresisGate for scanning continuously and emitting region_changed,
+        None stops the session the first time a threshold is exceeded
+        :param history: FrameHistory of the recent frames, dumped when a threshold is exceeded, None to disable
+        :param recorder: FrameRecorder appending every frame to a recording, None to disable
+        :return: None
+        """
         self.threshold = threshold
         self.cycle_time = cycle_time
-        self.img_init = img_init
+        self.source = source
+        self.regions = regions
+        self.backend = backend or ThreadBackend()
+        self.scheduler = CycleScheduler(adaptive_rate.period if adaptive_rate is not None else cycle_time)
+        self.adaptive_rate = adaptive_rate
+        self.rolling_baseline = rolling_baseline
+        self.ignore_mask = ignore_mask
+        self.tracer = tracer
+        self.hysteresis = hysteresis
+        self.history = history
+        self.recorder = recorder
+        self.queue_size = queue_size
+        self.queue_policy = queue_policy
+
+        # fingerprints of unchanged frames short-circuit the comparison
+        if fast_path:
+            self.frame_cache = FrameCache(perceptual_distance is not None, perceptual_distance or 0)
+        else:
+            self.frame_cache = None
 
         self.configured = True
 
-    def set_cyclic_image(self, img_cyclic):
-        self.img_cyclic = img_cyclic
+    def stop(self):
+        """
+        Stops the session as soon as possible, can be called from any thread
+        :return: None
+        """
+        self.exiting = True
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.source is not None:
+            self.source.interrupt()
 
-    def process(self):
-        thr_exceeded = False
-        if self.configured:
-            # convert initial image
-            pil_img_init = ScanTools.convert_image(self.img_init)
+        for queue in (self.captured, self.converted):
+            if queue is not None:
+                queue.close()
 
-            while not self.exiting:
-                countdown = self.cycle_time
+    def _start_session(self, frame_init, init_fp):
+        if not self.regions:
+            self.regions = [Region("", 0, 0, frame_init.width, frame_init.height, self.threshold)]
 
-                while not self.exiting and countdown > 0:
-                    time.sleep(1)
-                    countdown -= 1
+        # the mask buffer is computed once per session and applied inside the comparison
+        keep = None
+        if self.ignore_mask is not None and not self.ignore_mask.empty:
+            keep = self.ignore_mask.keep_buffer()
+            if keep.shape[:2] != frame_init.pixels.shape[:2]:
+                raise ValueError("Ignore mask size {0} does not match the captured size {1}".format(
+                    keep.shape[1::-1], frame_init.pixels.shape[1::-1]))
 
-                if self.exiting:
-                    break
+        if self.rolling_baseline is not None:
+            self.backend.start(self.rolling_baseline.start(frame_init.pixels), self.regions, keep)
+        else:
+            self.backend.start(frame_init.pixels, self.regions, keep)
+
+        if self.frame_cache is not None:
+            # the boxes of the changed areas are cached together with the scores
+            init_results = OrderedDict((region.name, (0.0, True)) for region in self.regions)
+            self.frame_cache.reset(init_fp, (init_results, self.backend.changes))
+
+        if self.hysteresis is not None:
+            self.hysteresis.start(self.regions)
+
+    def _compare_frame(self, frame):
+        results = self.backend.compare(frame.pixels)
+        return results, self.backend.changes
+
+    def _compare(self, frame, fp):
+        if self.frame_cache is None:
+            results, self.changes = self._compare_frame(frame)
+            return results
+
+        cached = self.frame_cache.lookup(fp)
+
+        if cached is None:
+            results, self.changes = self._compare_frame(frame)
+            quiet = all(results[region.name][0] <= region.threshold for region in self.regions)
+            self.frame_cache.store(fp, (results, self.changes), quiet)
+            return results
+
+        (results, self.changes), exact = cached
+        if not exact:
+            # a similar frame is known to stay under the thresholds, not to score the same
+            results = OrderedDict((name, (score, False)) for name, (score, _) in results.items())
+
+        return results
+
+    def _score_ratio(self, results):
+        # highest score relative to the threshold of its region
+        return max(
+            results[region.name][0] / region.threshold if region.threshold > 0 else 1.0
+            for region in self.regions
+        )
+
+    def _update_baseline(self, frame, ratio):
+        if self.rolling_baseline.frozen(ratio):
+            # a change is in progress, do not let it fade into the baseline
+            return
+
+        if self.rolling_baseline.update(frame.pixels):
+            self.backend.update_baseline(self.rolling_baseline.baseline)
+            if self.frame_cache is not None:
+                self.frame_cache.invalidate()
+
+    def _adapt_period(self, ratio):
+        period = self.adaptive_rate.update(ratio)
+        if period != self.scheduler.period:
+            log.info("cycle period changed to %.3f s (score at %.0f%% of threshold)", period, ratio * 100)
+            self.scheduler.set_period(period)
+            self.period_changed.emit(period)
+
+    def _dump_history(self, frame):
+        # the frames leading to the alert, written without holding up the comparisons
+        if self.history is not None:
+            self.history_dump = self.history.dump(frame.timestamp)
+
+    def _grab(self):
+        # the grab start time travels with the frame, for measuring the whole cycle
+        started = CycleTracer.now() if self.tracer is not None else None
+        frame = self.source.grab()
+        if self.tracer is not None:
+            self.tracer.span("capture", started)
+
+        if frame is not None and self.recorder is not None:
+            # recorded as soon as grabbed, the queues may drop it later
+            self.recorder.append(frame)
+
+        return frame, started
+
+    def _capture_stage(self):
+        # grabs the baseline, then one frame per cycle
+        try:
+            self.source.start()
+            try:
+                frame, started = self._grab()
+                if frame is None:
+                    return
+
+                self.baseline_captured.emit(frame)
+                self.captured.put((frame, started), pinned=True)  # the baseline is never dropped
 
-                # request cyclic image
-                self.request_image.emit()
-                self.mutex.lock()
-                self.waitCondition.wait(self.mutex, time=3600)
-                self.mutex.unlock()
+                self.scheduler.start()
+                while not self.exiting:
+                    if not self.source.paced:
+                        missed = self.scheduler.wait()
 
-                if self.exiting:
+                        if missed is None or self.exiting:
+                            break
+
+                        log.debug("cycle period %.3f s, effective %.3f s",
+                                  self.scheduler.period, self.scheduler.interval)
+
+                        if missed:
+                            # the previous cycle overran its slot
+                            log.warning("%d cycle deadline(s) missed", missed)
+                            self.deadline_missed.emit(self.scheduler.missed_deadlines)
+
+                    frame, started = self._grab()
+                    if frame is None:
+                        break
+
+                    self.frame_captured.emit(frame)
+                    self.captured.put((frame, started))
+            finally:
+                self.source.stop()
+        except Exception as e:
+            traceback.print_exc()
+            self.stage_error = e
+        finally:
+            self.captured.close()
+
+    def _convert_stage(self):
+        # fingerprints the next frame while the previous one is being compared
+        baseline = True
+        try:
+            while True:
+                item = self.captured.get()
+                if item is None:
                     break
 
-                # convert cyclic image and compare images
-                pil_img_cyclic = ScanTools.convert_image(self.img_cyclic)
-                result = ScanTools.compare_images(pil_img_init, pil_img_cyclic)
+                frame, started = item
+                converted = CycleTracer.now() if self.tracer is not None else None
+                fp = None
+                if self.frame_cache is not None:
+                    fp = self.frame_cache.fingerprint(frame.raw, frame.pixels)
+
+                if self.history is not None:
+                    # compressed here rather than in the comparison stage, which decides on the alerts
+                    if baseline:
+                        self.history.start(frame)
+                    else:
+                        self.history.append(frame)
+
+                if self.tracer is not None:
+                    self.tracer.span("convert", converted)
 
-                self.comparison_done.emit(result)
+                self.converted.put((frame, fp, started), pinned=baseline)  # the baseline is never dropped
+                baseline = False
+        except Exception as e:
+            traceback.print_exc()
+            self.stage_error = e
+            self.captured.close()
+        finally:
+            self.converted.close()
 
-                if result > self.threshold:
-                    thr_exceeded = True
+    def _compare_stage(self):
+        item = self.converted.get()
+        if item is None:
+            return False
+
+        frame, fp, _ = item
+        self._start_session(frame, fp)
+
+        try:
+            while not self.exiting:
+                item = self.converted.get()
+                if item is None:
                     break
 
+                frame, fp, started = item
+                if self.tracer is None:
+                    results = self._compare(frame, fp)
+                else:
+                    compared = CycleTracer.now()
+                    results = self._compare(frame, fp)
+                    ended = CycleTracer.now()
+                    self.tracer.span("compare", compared, ended)
+                    self.tracer.span("cycle", started, ended)
+
+                self.comparison_done.emit(results)
+                if self.changes is not None:
+                    self.changes_located.emit(self.changes)
+
+                ratio = self._score_ratio(results)
+
+                if self.adaptive_rate is not None:
+                    self._adapt_period(ratio)
+
+                if self.rolling_baseline is not None:
+                    self._update_baseline(frame, ratio)
+
+                if self.hysteresis is not None:
+                    # continuous mode, the session goes on whatever the scores
+                    for event, name in self.hysteresis.update(results, frame.timestamp):
+                        log.info("region %r: %s alert", name, event)
+                        self.exceeded_regions = self.hysteresis.active_regions
+                        if event == HysteresisGate.ENTER:
+                            self._dump_history(frame)
+                        self.region_changed.emit(name, event == HysteresisGate.ENTER)
+                    continue
+
+                self.exceeded_regions = [
+                    region.name for region in self.regions if results[region.name][0] > region.threshold
+                ]
+                if self.exceeded_regions:
+                    self._dump_history(frame)
+                    return True
+        finally:
+            self.backend.stop()
+            if self.rolling_baseline is not None:
+                self.rolling_baseline.stop()
+
+        return False
+
+    @property
+    def dropped_frames(self):
+        return sum(queue.dropped for queue in (self.captured, self.converted) if queue is not None)
+
+    @property
+    def queue_depth(self):
+        return sum(queue.depth for queue in (self.captured, self.converted) if queue is not None)
+
+    def process(self):
+        thr_exceeded = False
+        self.exceeded_regions = []
+        self.history_dump = None
+        self.changes = None
+        if self.configured:
+            # capture -> convert -> compare, each stage works on a different frame
+            self.stage_error = None
+            if self.tracer is not None:
+                self.tracer.open()
+            # a paced source waits for its next frame by itself, waiting for the comparison instead
+            # of dropping frames loses nothing and a replay compares every recorded frame
+            queue_policy = FrameQueue.BLOCK if self.source.paced else self.queue_policy
+            self.captured = FrameQueue(self.queue_size, queue_policy)
+            self.converted = FrameQueue(self.queue_size, queue_policy)
+            stages = [
+                threading.Thread(target=self._capture_stage, name="capture"),
+                threading.Thread(target=self._convert_stage, name="convert")
+            ]
+            for stage in stages:
+                stage.start()
+
+            try:
+                thr_exceeded = self._compare_stage()
+            except Exception as e:
+                traceback.print_exc()
+                self.stage_error = e
+            finally:
+                self.stop()
+                for stage in stages:
+                    stage.join()
+                if self.tracer is not None:
+                    self.tracer.close()
+                if self.recorder is not None:
+                    self.recorder.close()
+
+            if self.stage_error is not None:
+                self.error.emit(str(self.stage_error))
+
         self.finished.emit(thr_exceeded)
@@ -0,0 +1,62 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import numpy
+
+
+class IgnoreMask(object):
+    """
+    Parts of the captured image left out of the comparison (clocks, cursors, animations)
+    """
+    def __init__(self, width, height):
+        """
+        :param width: width of the captured image
+        :param height: height of the captured image
+        """
+        self.ignored = numpy.zeros((height, width, 1), dtype=numpy.bool_)
+
+    @property
+    def empty(self):
+        return not self.ignored.any()
+
+    def _area(self, x, y, width, height):
+        # part of the mask covered by a rectangle, clipped to the captured image
+        return self.ignored[max(0, y):max(0, y + height), max(0, x):max(0, x + width), 0]
+
+    def add_rect(self, x, y, width, height):
+        """
+        Ignores a rectangle
+        :param x: left, in image coordinates
+        :param y: top, in image coordinates
+        :param width: width
+        :param height: height
+        :return: None
+        """
+        self._area(x, y, width, height)[...] = True
+
+    def add_image(self, path, x=0, y=0):
+        """
+        Ignores the light pixels of an image, dark pixels stay compared
+        :param path: image file, for example a screenshot painted over
+        :param x: position of the image left edge, in image coordinates
+        :param y: position of the image top edge, in image coordinates
+        :return: None
+        """
+        from PIL import Image
+
+        painted = numpy.asarray(Image.open(path).convert("L")) >= 128
+
+        # the image may extend beyond the captured area on any side
+        area = self._area(x, y, painted.shape[1], painted.shape[0])
+        painted = painted[max(0, -y):, max(0, -x):][:area.shape[0], :area.shape[1]]
+        area[:painted.shape[0], :painted.shape[1]] |= painted
+
+    def keep_buffer(self):
+        """
+        Mask in the form used by the comparison
+        :return: uint8 array of shape (height, width, 1), 1 for compared pixels and 0 for ignored ones
+        """
+        return numpy.logical_not(self.ignored).view(numpy.uint8)
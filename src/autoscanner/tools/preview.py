@@ -0,0 +1,114 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import math
+import timeit
+import threading
+
+from PySide import QtCore
+from autoscanner.tools.scantools import ScanTools
+
+
+class PreviewScaler(QtCore.QObject):
+    """
+    Scales the captured frames down to the size of the preview, in its own thread.
+    Only the latest frame is kept when the scaling does not keep up, and frames
+    coming faster than the preview frame-rate cap wait without any work: the newest
+    of them is drawn when the interval ends, so the last frame of a session is never lost.
+    """
+    scaled = QtCore.Signal(object, float)  # QImage, scale factor
+    frame_pending = QtCore.Signal()
+    frame_deferred = QtCore.Signal(int)  # milliseconds until the preview may be updated
+
+    def __init__(self, max_fps=10.0, parent=None):
+        """
+        :param max_fps: maximum number of preview updates per second, 0 for no limit
+        """
+        super(PreviewScaler, self).__init__(parent)
+
+        self.max_fps = max_fps
+        self.enabled = True
+        self.target_width = 0
+        self.target_height = 0
+
+        self.lock = threading.Lock()
+        self.pending = None
+        self.scheduled = False
+        self.last_scaled = None
+
+        # moved to the thread of the scaler together with it
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._scale)
+
+        # queued to the thread of the scaler, whatever the thread submitting the frames
+        self.frame_pending.connect(self._scale, QtCore.Qt.QueuedConnection)
+        self.frame_deferred.connect(self.timer.start, QtCore.Qt.QueuedConnection)
+
+    def set_target_size(self, width, height):
+        """
+        Size the frames are scaled down to, aspect ratio is kept
+        :param width: width of the preview
+        :param height: height of the preview
+        :return: None
+        """
+        self.target_width = width
+        self.target_height = height
+
+    def reset(self):
+        """
+        Forgets the pending frame and the frame-rate history, before a new session
+        :return: None
+        """
+        with self.lock:
+            self.pending = None
+            self.last_scaled = None
+
+    @QtCore.Slot(object)
+    def submit(self, frame):
+        """
+        Queues a frame for the preview, can be called from any thread
+        :param frame: Frame
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        now = timeit.default_timer()
+        with self.lock:
+            self.pending = frame
+            if self.scheduled:
+                return  # the scheduled update draws this frame instead
+
+            self.scheduled = True
+            wait = 0.0
+            if self.max_fps > 0 and self.last_scaled is not None:
+                wait = self.last_scaled + 1.0 / self.max_fps - now
+
+        if wait > 0:
+            self.frame_deferred.emit(int(math.ceil(wait * 1000)))
+        else:
+            self.frame_pending.emit()
+
+    @QtCore.Slot()
+    def _scale(self):
+        with self.lock:
+            frame, self.pending = self.pending, None
+            self.scheduled = False
+            if frame is not None:
+                self.last_scaled = timeit.default_timer()
+
+        if frame is None:
+            return
+
+        img = ScanTools.frame_image(frame)
+        width, height = self.target_width, self.target_height
+
+        if 0 < width < img.width() or 0 < height < img.height():
+            preview = img.scaled(width, height, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+            self.scaled.emit(preview, preview.width() / float(img.width()))
+        else:
+            self.scaled.emit(img, 1.0)
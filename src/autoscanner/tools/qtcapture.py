@@ -0,0 +1,49 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+from PySide import QtGui, QtCore
+from autoscanner.tools.scantools import ScanTools
+from autoscanner.tools.capture import CaptureSource
+
+
+class QtScreenSource(QtCore.QObject, CaptureSource):
+    """
+    Screen grabber using QPixmap, which only works in the GUI thread.
+    Grabs requested from another thread are executed by the GUI thread while the requester waits.
+    Must be created in the GUI thread.
+    """
+    grab_requested = QtCore.Signal()
+
+    def __init__(self, x, y, width, height, parent=None):
+        super(QtScreenSource, self).__init__(parent)
+
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.frame = None
+
+        self.grab_requested.connect(self._grab, QtCore.Qt.BlockingQueuedConnection)
+
+    @QtCore.Slot()
+    def _grab(self):
+        pixmap = QtGui.QPixmap.grabWindow(
+            QtGui.QApplication.desktop().winId(),
+            self.x,
+            self.y,
+            self.width,
+            self.height
+        )
+        self.frame = ScanTools.image_frame(pixmap.toImage())
+
+    def grab(self):
+        if QtCore.QThread.currentThread() == self.thread():
+            self._grab()
+        else:
+            self.grab_requested.emit()
+
+        frame, self.frame = self.frame, None
+        return frame
@@ -0,0 +1,172 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import os
+import struct
+import timeit
+import threading
+
+import numpy
+
+from autoscanner.tools.capture import CaptureSource, Frame
+
+# file header: magic, version, height, width, channels
+HEADER = struct.Struct("<8s4I")
+MAGIC = "ASCNREC\x00"
+VERSION = 1
+
+
+def record_dtype(height, width, channels):
+    """
+    Layout of a recorded frame, every record has the same size so the file can be mapped as an array
+    :return: numpy structured dtype
+    """
+    return numpy.dtype([("timestamp", "<f8"), ("pixels", numpy.uint8, (height, width, channels))])
+
+
+class FrameRecorder(object):
+    """
+    Appends the frames of a session to a recording, the timestamp followed by the raw RGB(A) pixels
+    """
+    def __init__(self, path):
+        """
+        :param path: recording file, frames of the same size are appended to an existing one
+        """
+        self.path = path
+        self.file = None
+        self.shape = None
+
+    def append(self, frame):
+        """
+        Writes a frame, the first one decides the size of the recorded frames
+        :param frame: Frame
+        :return: None
+        """
+        if self.file is None:
+            self._open(frame.pixels.shape)
+        elif frame.pixels.shape != self.shape:
+            raise ValueError("Frame size {0} does not match the recorded size {1}".format(
+                frame.pixels.shape[1::-1], self.shape[1::-1]))
+
+        self.file.write(struct.pack("<d", frame.timestamp))
+        self.file.write(numpy.ascontiguousarray(frame.pixels).data)
+
+    def _open(self, shape):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size:
+            recorded_shape = RecordingSource.read_header(self.path)
+            if recorded_shape != shape:
+                raise ValueError("{0} holds frames of size {1}, cannot append frames of size {2}".format(
+                    self.path, recorded_shape[1::-1], shape[1::-1]))
+
+            # a record cut short by a crash is dropped
+            itemsize = record_dtype(*shape).itemsize
+            self.file = open(self.path, "r+b")
+            self.file.truncate(HEADER.size + (os.path.getsize(self.path) - HEADER.size) // itemsize * itemsize)
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(self.path, "wb")
+            self.file.write(HEADER.pack(MAGIC, VERSION, *shape))
+
+        self.shape = shape
+
+    def close(self):
+        """
+        Flushes and closes the recording, the next frame starts appending again
+        :return: None
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class RecordingSource(CaptureSource):
+    """
+    Replays a recording through the memory-mapped file: the frames are views into the
+    mapping, nothing is copied before the comparison reads the pixels
+    """
+    paced = True
+
+    def __init__(self, path, speed=0.0):
+        """
+        :param path: recording file
+        :param speed: 1.0 replays at the recorded cadence, 2.0 twice as fast, 0 as fast as possible
+        """
+        self.path = path
+        self.speed = speed
+        self.records = None
+        self.index = 0
+        self.started = None
+        self.stopped = threading.Event()
+
+    @staticmethod
+    def read_header(path):
+        """
+        Size of the recorded frames
+        :param path: recording file
+        :return: (height, width, channels)
+        """
+        with open(path, "rb") as recording:
+            header = recording.read(HEADER.size)
+
+        if len(header) < HEADER.size:
+            raise ValueError("{0} is not a recording".format(path))
+
+        magic, version, height, width, channels = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("{0} is not a recording".format(path))
+        if version != VERSION:
+            raise ValueError("{0} has the unsupported version {1}".format(path, version))
+
+        return height, width, channels
+
+    @staticmethod
+    def map(path):
+        """
+        Maps all the complete frames of a recording
+        :param path: recording file
+        :return: read-only structured array with the fields timestamp and pixels
+        """
+        dtype = record_dtype(*RecordingSource.read_header(path))
+        count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        if count == 0:
+            return numpy.zeros(0, dtype=dtype)
+
+        return numpy.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+
+    def __len__(self):
+        return len(self.records) if self.records is not None else len(RecordingSource.map(self.path))
+
+    def start(self):
+        self.records = RecordingSource.map(self.path)
+        self.index = 0
+        self.started = None
+        self.stopped.clear()
+
+    def grab(self):
+        if self.records is None or self.index >= len(self.records):
+            return None
+
+        record = self.records[self.index]
+        timestamp = float(record["timestamp"])
+        self.index += 1
+
+        if self.speed > 0:
+            # the same delay after the first frame as when recording, scaled by the speed
+            now = timeit.default_timer()
+            if self.started is None:
+                self.started = now, timestamp
+            delay = (timestamp - self.started[1]) / self.speed - (now - self.started[0])
+            if delay > 0 and self.stopped.wait(delay):
+                return None
+
+        pixels = record["pixels"]
+        return Frame(pixels, pixels, timestamp)
+
+    def interrupt(self):
+        self.stopped.set()
+
+    def stop(self):
+        self.records = None
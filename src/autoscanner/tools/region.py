@@ -0,0 +1,52 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+
+class Region(object):
+    """
+    Named rectangular area monitored with its own threshold
+    """
+    def __init__(self, name, x, y, width, height, threshold):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.threshold = threshold
+
+    def __repr__(self):
+        return "Region({0!r}, {1}, {2}, {3}, {4}, {5})".format(
+            self.name, self.x, self.y, self.width, self.height, self.threshold)
+
+    def translated(self, dx, dy):
+        """
+        Same region with its origin moved
+        :param dx: horizontal offset
+        :param dy: vertical offset
+        :return: new Region
+        """
+        return Region(self.name, self.x + dx, self.y + dy, self.width, self.height, self.threshold)
+
+    def view(self, arr):
+        """
+        Pixels of the region inside a larger image, without copying
+        :param arr: pixel array whose origin is the origin of the region coordinates
+        :return: view into arr
+        """
+        return arr[self.y:self.y + self.height, self.x:self.x + self.width]
+
+    @staticmethod
+    def bounding_box(regions):
+        """
+        Smallest rectangle containing all the regions
+        :param regions: list of Region
+        :return: (x, y, width, height)
+        """
+        left = min(region.x for region in regions)
+        top = min(region.y for region in regions)
+        right = max(region.x + region.width for region in regions)
+        bottom = max(region.y + region.height for region in regions)
+        return left, top, right - left, bottom - top
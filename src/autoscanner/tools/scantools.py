@@ -6,16 +6,33 @@ Created on 22 nov. 2015
 
 import sys
 import cStringIO
-from PIL import Image
+import numpy
 
 from itertools import izip
 from PySide import QtGui, QtCore
+from autoscanner.tools.diffengine import DiffEngine
+from autoscanner.tools.capture import Frame, RGB_CHANNELS
+
+
+class _ImageBuffer(object):
+    """
+    Exposes the pixels of a QImage to numpy and keeps the QImage alive
+    for as long as any array refers to its memory
+    """
+    def __init__(self, img, raw):
+        self.img = img
+        self.__array_interface__ = raw.__array_interface__
 
 
 class ScanTools:
     """
     Collection of useful tools for working with images
     """
+
+    # 32 bits per pixel formats are stored as 0xAARRGGBB words
+    RGB_CHANNELS = RGB_CHANNELS
+    RGBA_CHANNELS = [2, 1, 0, 3] if sys.byteorder == "little" else [1, 2, 3, 0]
+
     def __init__(self):
         pass
 
@@ -27,8 +44,75 @@ class ScanTools:
                 QtGui.QDesktopWidget().screenGeometry(screen=screen_id))
         return full_screen_geometry
     
+    @staticmethod
+    def image_buffer(img):
+        """
+        Wraps the raw bits of a 32 bits per pixel QImage without copying
+        :param img: QImage in Format_RGB32 or Format_ARGB32
+        :return: uint8 array of shape (height, width, 4), shares memory with img
+        """
+        height = img.height()
+        stride = img.bytesPerLine()
+
+        raw = numpy.frombuffer(img.constBits(), dtype=numpy.uint8, count=height * stride)
+        raw = raw.reshape(height, stride)[:, :img.width() * 4].reshape(height, img.width(), 4)
+
+        return numpy.asarray(_ImageBuffer(img, raw))
+
     @staticmethod
     def convert_image(img):
+        """
+        Exposes a QImage as an array of pixels, without any encoding
+        :param img: QImage
+        :return: uint8 array of shape (height, width, 3) for opaque images or
+        (height, width, 4) for images with an alpha channel, channels in RGB(A) order
+        """
+        if img.hasAlphaChannel():
+            if img.format() != QtGui.QImage.Format_ARGB32:
+                # premultiplied pixels are converted back, just like the PNG encoder does
+                img = img.convertToFormat(QtGui.QImage.Format_ARGB32)
+
+            # channel order cannot be expressed as a strided view, hence the copy
+            return ScanTools.image_buffer(img).take(ScanTools.RGBA_CHANNELS, axis=2)
+
+        if img.format() not in (QtGui.QImage.Format_RGB32, QtGui.QImage.Format_ARGB32):
+            img = img.convertToFormat(QtGui.QImage.Format_RGB32)
+
+        return ScanTools.image_buffer(img)[:, :, ScanTools.RGB_CHANNELS]
+
+    @staticmethod
+    def image_frame(img):
+        """
+        Frame sharing the pixels of a QImage
+        :param img: QImage
+        :return: Frame, which also keeps the QImage for previews
+        """
+        if img.format() != QtGui.QImage.Format_RGB32:
+            img = img.convertToFormat(QtGui.QImage.Format_RGB32)
+
+        frame = Frame.from_xrgb(ScanTools.image_buffer(img))
+        frame.image = img
+        return frame
+
+    @staticmethod
+    def frame_image(frame):
+        """
+        QImage showing a frame
+        :param frame: Frame
+        :return: QImage owning a copy of the pixels, or the QImage the frame was made from
+        """
+        img = getattr(frame, "image", None)
+        if img is not None:
+            return img
+
+        rgb = numpy.ascontiguousarray(frame.pixels[:, :, :3])
+        return QtGui.QImage(rgb.data, frame.width, frame.height, frame.width * 3, QtGui.QImage.Format_RGB888).copy()
+
+    @staticmethod
+    def convert_image_png(img):
+        # previous implementation going through a PNG round-trip, kept as a reference
+        from PIL import Image
+
         buffer1 = QtCore.QBuffer()
         buffer1.open(QtCore.QIODevice.ReadWrite)
         img.save(buffer1, "PNG")
@@ -42,6 +126,11 @@ class ScanTools:
     
     @staticmethod
     def compare_images(pil_img1, pil_img2):
+        return DiffEngine.score(pil_img1, pil_img2)
+
+    @staticmethod
+    def compare_images_reference(pil_img1, pil_img2):
+        # pure Python implementation, kept for checking the results of DiffEngine
         pairs = izip(pil_img1.getdata(), pil_img2.getdata())
         if len(pil_img1.getbands()) == 1:
             # for gray-scale jpegs
@@ -0,0 +1,152 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import math
+
+from PySide import QtCore
+
+
+class CycleScheduler(object):
+    """
+    Fixed cadence timer based on a monotonic clock.
+    Ticks are aligned on multiples of the period since start, so the time spent
+    between two waits does not make the cadence drift. Slots that are already over
+    when waiting are skipped and counted as missed deadlines.
+    """
+    def __init__(self, period):
+        """
+        :param period: seconds between two ticks, fractions of a second are allowed
+        """
+        self.period = period
+
+        self.timer = QtCore.QElapsedTimer()
+        self.mutex = QtCore.QMutex()
+        self.wait_condition = QtCore.QWaitCondition()
+
+        self.stopped = False
+        self.tick = None
+        self.deadline = None
+        self.woken = None
+        self.interval = None
+        self.missed_deadlines = 0
+
+    def _elapsed(self):
+        # milliseconds since start, with sub-millisecond precision
+        return self.timer.nsecsElapsed() / 1000000.0
+
+    def start(self):
+        """
+        Starts counting, the first tick happens one period from now.
+        A stopped scheduler can be started again.
+        :return: None
+        """
+        self.mutex.lock()
+        self.stopped = False
+        self.missed_deadlines = 0
+        self.timer.start()
+        self.tick = 0.0
+        self.woken = 0.0
+        self.deadline = self.period * 1000.0
+        self.mutex.unlock()
+
+    def wait(self):
+        """
+        Sleeps until the next tick
+        :return: number of deadlines missed since the previous tick, or None when stopped
+        """
+        self.mutex.lock()
+        try:
+            while not self.stopped:
+                remaining = self.deadline - self._elapsed()
+                if remaining <= 0:
+                    break
+
+                self.wait_condition.wait(self.mutex, int(math.ceil(remaining)))
+
+            if self.stopped:
+                return None
+
+            # effective time between the last two ticks
+            now = self._elapsed()
+            self.interval = (now - self.woken) / 1000.0
+            self.woken = now
+
+            # the next tick is the first slot that has not started yet
+            period = self.period * 1000.0
+            missed = int((now - self.deadline) // period)
+            self.tick = self.deadline + missed * period
+            self.deadline = self.tick + period
+            self.missed_deadlines += missed
+
+            return missed
+        finally:
+            self.mutex.unlock()
+
+    def set_period(self, period):
+        """
+        Changes the period, the next tick happens one new period after the current one
+        :param period: seconds between two ticks
+        :return: None
+        """
+        self.mutex.lock()
+        self.period = period
+        if self.tick is not None:
+            # a shorter period may already be over, then the next tick is now and nothing is missed
+            self.deadline = max(self.tick + period * 1000.0, self._elapsed())
+            self.wait_condition.wakeAll()  # the waiting thread recomputes its sleep time
+        self.mutex.unlock()
+
+    def stop(self):
+        """
+        Stops the scheduler and wakes up any waiting thread immediately
+        :return: None
+        """
+        self.mutex.lock()
+        self.stopped = True
+        self.wait_condition.wakeAll()
+        self.mutex.unlock()
+
+
+class AdaptiveRate(object):
+    """
+    Chooses the cycle period from the recent scores:
+    the period backs off towards the maximum while the scores stay flat,
+    and tightens towards the minimum as the scores rise towards the threshold
+    """
+    BACK_OFF = 1.5     # period growth per flat cycle
+    TIGHTEN = 0.5      # period reduction per rising cycle
+    TOLERANCE = 0.05   # change of the score to threshold ratio considered flat
+
+    def __init__(self, min_period, max_period, period=None):
+        """
+        :param min_period: shortest period in seconds
+        :param max_period: longest period in seconds
+        :param period: initial period, defaults to min_period
+        """
+        self.min_period = min_period
+        self.max_period = max_period
+        self.period = min(max(period or min_period, min_period), max_period)
+        self.ratio = None
+
+    def update(self, ratio):
+        """
+        Computes the period of the next cycle
+        :param ratio: highest score to threshold ratio of the last comparison
+        :return: period in seconds
+        """
+        ratio = min(max(ratio, 0.0), 1.0)
+
+        # the closer to the threshold, the shorter the longest allowed period
+        ceiling = self.max_period - (self.max_period - self.min_period) * ratio
+
+        if self.ratio is not None and ratio - self.ratio > AdaptiveRate.TOLERANCE:
+            period = self.period * AdaptiveRate.TIGHTEN
+        else:
+            period = self.period * AdaptiveRate.BACK_OFF
+
+        self.ratio = ratio
+        self.period = min(max(min(period, ceiling), self.min_period), self.max_period)
+        return self.period
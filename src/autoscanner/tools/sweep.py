@@ -0,0 +1,292 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Offline threshold tuning over recorded sessions.
+The score of every frame is computed once per mask, then every combination of
+threshold, clear ratio and dwell time is evaluated in a single pass over the
+frames, all the combinations being advanced together as arrays.
+Labels list the real changes, one "start end" interval per line, in seconds
+from the first frame of the recording. Run from the src directory:
+>python -m autoscanner.tools.sweep session.rec --labels session.txt --thresholds 0.5:5:0.25 --dwell 0,1,3
+"""
+
+import sys
+import csv
+import timeit
+import logging
+import argparse
+
+import numpy
+
+from autoscanner.tools.mask import IgnoreMask
+from autoscanner.tools.recording import RecordingSource
+
+log = logging.getLogger(__name__)
+
+
+class ThresholdSweep(object):
+    """
+    False positives, false negatives and detection latency of a grid of settings,
+    with the same alert states as HysteresisGate against the first frame as baseline
+    """
+    FIELDS = [
+        "mask", "threshold", "clear_ratio", "dwell",
+        "false_positives", "false_negatives", "detected", "mean_latency", "max_latency"
+    ]
+
+    def __init__(self, thresholds, dwells=(0.0,), clear_ratios=(0.8,), masks=None, tolerance=0.0):
+        """
+        :param thresholds: raise thresholds, in percent
+        :param dwells: dwell times, in seconds
+        :param clear_ratios: clear thresholds as a fraction of the raise threshold
+        :param masks: list of (name, rects, image path or None), rects being (x, y, width, height) lists,
+        defaults to comparing every pixel
+        :param tolerance: seconds after a labelled change during which an alert is not a false positive
+        """
+        self.masks = masks or [("none", [], None)]
+        self.tolerance = tolerance
+
+        # one entry per combination, the mask varying slowest
+        grid = numpy.meshgrid(
+            numpy.arange(len(self.masks)),
+            numpy.asarray(thresholds, dtype=numpy.float64),
+            numpy.asarray(clear_ratios, dtype=numpy.float64),
+            numpy.asarray(dwells, dtype=numpy.float64),
+            indexing="ij"
+        )
+        self.mask_index, self.raise_thresholds, self.clear_ratios, self.dwells = [axis.ravel() for axis in grid]
+        self.clear_thresholds = self.raise_thresholds * self.clear_ratios
+
+    def __len__(self):
+        return len(self.raise_thresholds)
+
+    @staticmethod
+    def load_labels(path):
+        """
+        :param path: text file of "start end" lines, in seconds, "#" starts a comment
+        :return: list of (start, end)
+        """
+        intervals = []
+        with open(path) as labels:
+            for line in labels:
+                line = line.split("#")[0].strip()
+                if line:
+                    start, end = [float(value) for value in line.replace(",", " ").split()]
+                    intervals.append((start, end))
+
+        return sorted(intervals)
+
+    def _keep_matrix(self, width, height):
+        # one row of 0/1 per mask, the masked sums of all the masks are a single product
+        keep = numpy.empty((len(self.masks), width * height), dtype=numpy.float64)
+        ncomponents = numpy.empty(len(self.masks), dtype=numpy.float64)
+
+        for i, (_, rects, image) in enumerate(self.masks):
+            ignore_mask = IgnoreMask(width, height)
+            for rect in rects:
+                ignore_mask.add_rect(*rect)
+            if image:
+                ignore_mask.add_image(image)
+
+            keep[i] = ignore_mask.keep_buffer().ravel()
+            # a fully ignored area always scores 0, as in DiffEngine.mask
+            ncomponents[i] = max(1, int(keep[i].sum()) * 3)
+
+        return keep, ncomponents
+
+    def frame_scores(self, path):
+        """
+        Scores of every frame of a recording against its first frame, for every mask
+        :param path: recording file
+        :return: (timestamps, float64 array of shape (frames, masks))
+        """
+        records = RecordingSource.map(path)
+        if len(records) == 0:
+            return numpy.zeros(0), numpy.zeros((0, len(self.masks)))
+
+        baseline = records[0]["pixels"]
+        height, width = baseline.shape[:2]
+        keep, ncomponents = self._keep_matrix(width, height)
+
+        scores = numpy.empty((len(records), len(self.masks)), dtype=numpy.float64)
+        dif = numpy.empty_like(baseline)
+        for i in range(len(records)):
+            pixels = records[i]["pixels"]
+
+            # |a - b| == max(a, b) - min(a, b), computed once for all the masks
+            numpy.maximum(pixels, baseline, out=dif)
+            dif -= numpy.minimum(pixels, baseline)
+            pixel_sums = dif.sum(axis=2, dtype=numpy.float64).ravel()
+
+            scores[i] = keep.dot(pixel_sums)
+
+        scores *= 100.0 / 255.0 / ncomponents
+        return numpy.array(records["timestamp"]), scores
+
+    def evaluate(self, timestamps, scores, intervals):
+        """
+        Replays the alert states of every combination over the scores of a recording
+        :param timestamps: capture times of the frames, in seconds
+        :param scores: scores returned by frame_scores
+        :param intervals: labelled changes, list of (start, end) in seconds from the first frame
+        :return: (false positives, first alert time of every interval or NaN), per combination
+        """
+        count = len(self)
+        active = numpy.zeros(count, dtype=numpy.bool_)
+        since = numpy.full(count, numpy.nan)
+        false_positives = numpy.zeros(count, dtype=numpy.int64)
+        detections = numpy.full((count, len(intervals)), numpy.nan)
+
+        elapsed = timestamps - timestamps[0] if len(timestamps) else timestamps
+        labels = numpy.full(len(elapsed), -1, dtype=numpy.int64)
+        expected = numpy.zeros(len(elapsed), dtype=numpy.bool_)
+        for j, (start, end) in enumerate(intervals):
+            labels[(elapsed >= start) & (elapsed <= end)] = j
+            expected |= (elapsed >= start) & (elapsed <= end + self.tolerance)
+
+        # the first frame is the baseline
+        for i in range(1, len(elapsed)):
+            now = elapsed[i]
+            score = scores[i, self.mask_index]
+
+            # HysteresisGate.update for all the combinations at once
+            leaving = numpy.where(active, score < self.clear_thresholds, score > self.raise_thresholds)
+            since = numpy.where(leaving, numpy.where(numpy.isnan(since), now, since), numpy.nan)
+            committed = leaving & (now - numpy.where(leaving, since, now) >= self.dwells)
+            active ^= committed
+            since[committed] = numpy.nan
+
+            if not expected[i]:
+                false_positives += committed & active
+
+            j = labels[i]
+            if j >= 0:
+                first = detections[:, j]
+                first[active & numpy.isnan(first)] = now
+
+        return false_positives, detections
+
+    def run(self, recordings):
+        """
+        Sweeps every combination over several recordings
+        :param recordings: list of (recording file, list of (start, end))
+        :return: list of dict with the FIELDS keys, best combinations first
+        """
+        false_positives = numpy.zeros(len(self), dtype=numpy.int64)
+        latencies = []
+
+        for path, intervals in recordings:
+            started = timeit.default_timer()
+            timestamps, scores = self.frame_scores(path)
+            scored = timeit.default_timer()
+            recording_fp, detections = self.evaluate(timestamps, scores, intervals)
+            log.info("%s: %d frames scored in %.1f s, %d settings evaluated in %.1f s",
+                     path, len(timestamps), scored - started, len(self), timeit.default_timer() - scored)
+
+            false_positives += recording_fp
+            latencies.append(detections - numpy.array([start for start, _ in intervals]))
+
+        latencies = numpy.hstack(latencies) if latencies else numpy.zeros((len(self), 0))
+        detected = numpy.isfinite(latencies)
+        max_latencies = numpy.where(detected, latencies, -numpy.inf).max(axis=1) if latencies.shape[1] else None
+
+        results = []
+        for i in range(len(self)):
+            found = latencies[i][detected[i]]
+            results.append({
+                "mask": self.masks[self.mask_index[i]][0],
+                "threshold": self.raise_thresholds[i],
+                "clear_ratio": self.clear_ratios[i],
+                "dwell": self.dwells[i],
+                "false_positives": int(false_positives[i]),
+                "false_negatives": int(latencies.shape[1] - detected[i].sum()),
+                "detected": int(detected[i].sum()),
+                "mean_latency": float(found.mean()) if len(found) else None,
+                "max_latency": float(max_latencies[i]) if len(found) else None
+            })
+
+        results.sort(key=lambda result: (
+            result["false_positives"] + result["false_negatives"],
+            result["mean_latency"] if result["mean_latency"] is not None else float("inf")
+        ))
+        return results
+
+
+def parse_values(text):
+    """
+    :param text: comma separated values, or start:stop:step with stop included
+    :return: list of float
+    """
+    if ":" in text:
+        start, stop, step = [float(value) for value in text.split(":")]
+        return list(numpy.arange(start, stop + step / 2.0, step))
+
+    return [float(value) for value in text.split(",")]
+
+
+def parse_mask(text, with_image=False):
+    """
+    :param text: NAME=x,y,width,height;... or NAME=image path
+    :return: (name, rects, image path or None)
+    """
+    name, _, value = text.partition("=")
+    if with_image:
+        return name, [], value
+
+    rects = [tuple(int(number) for number in rect.split(",")) for rect in value.split(";") if rect.strip()]
+    return name, rects, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Threshold sweep over recorded sessions")
+    parser.add_argument("recordings", nargs="+", help="recording files")
+    parser.add_argument("--labels", action="append", default=[],
+                        help="labelled changes of each recording, in the same order, none means no real change")
+    parser.add_argument("--thresholds", type=parse_values, default=parse_values("0.25:5:0.25"),
+                        help="raise thresholds in percent, a,b,c or start:stop:step")
+    parser.add_argument("--clear-ratio", type=parse_values, default=[0.8], help="clear ratios")
+    parser.add_argument("--dwell", type=parse_values, default=[0.0], help="dwell times in seconds")
+    parser.add_argument("--mask-rects", action="append", default=[], metavar="NAME=x,y,w,h;...",
+                        help="ignored rectangles, in image coordinates")
+    parser.add_argument("--mask-image", action="append", default=[], metavar="NAME=PATH",
+                        help="image whose light pixels are ignored")
+    parser.add_argument("--no-mask", action="store_true", help="also sweep without any mask when masks are given")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="seconds after a labelled change during which an alert is not a false positive")
+    parser.add_argument("--output", help="CSV file receiving the results of every setting")
+    parser.add_argument("--top", type=int, default=20, help="number of settings listed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    masks = [parse_mask(text) for text in args.mask_rects] + [parse_mask(text, True) for text in args.mask_image]
+    if masks and args.no_mask:
+        masks.insert(0, ("none", [], None))
+
+    sweep = ThresholdSweep(args.thresholds, args.dwell, args.clear_ratio, masks, args.tolerance)
+    recordings = [
+        (path, ThresholdSweep.load_labels(args.labels[i]) if i < len(args.labels) else [])
+        for i, path in enumerate(args.recordings)
+    ]
+    results = sweep.run(recordings)
+
+    if args.output:
+        with open(args.output, "wb") as output_file:
+            writer = csv.DictWriter(output_file, ThresholdSweep.FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+    sys.stdout.write("{0:<12} {1:>9} {2:>6} {3:>6} {4:>4} {5:>4} {6:>10} {7:>10}\n".format(
+        "mask", "threshold", "clear", "dwell", "FP", "FN", "latency", "max"))
+    for result in results[:args.top]:
+        sys.stdout.write("{0:<12} {1:9.3f} {2:6.2f} {3:6.2f} {4:4d} {5:4d} {6:>10} {7:>10}\n".format(
+            result["mask"], result["threshold"], result["clear_ratio"], result["dwell"],
+            result["false_positives"], result["false_negatives"],
+            "-" if result["mean_latency"] is None else "{0:.2f} s".format(result["mean_latency"]),
+            "-" if result["max_latency"] is None else "{0:.2f} s".format(result["max_latency"])
+        ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import os
+import json
+import math
+import timeit
+import logging
+import threading
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class CycleTracer(object):
+    """
+    Collects the duration of the pipeline stages of each cycle, keeps the most recent ones
+    for percentiles and optionally writes every span to a file.
+    Nothing is measured when the image processor has no tracer.
+    """
+    JSON_LINES = "jsonl"  # one JSON object per span
+    CHROME = "chrome"     # Chrome trace event format, opened with chrome://tracing
+
+    FORMATS = (JSON_LINES, CHROME)
+
+    # spans recorded by the image processor in pipeline order, then the preview redraw of the
+    # main window and the whole cycle, from the grab to the end of the comparison
+    STAGES = ("capture", "convert", "compare", "draw", "cycle")
+
+    def __init__(self, window=200, path=None, trace_format=JSON_LINES):
+        """
+        :param window: number of recent spans per stage kept for the percentiles
+        :param path: file receiving every span, None to only keep the percentiles
+        :param trace_format: one of FORMATS
+        """
+        if trace_format not in CycleTracer.FORMATS:
+            raise ValueError("Unknown trace format: {0}".format(trace_format))
+
+        self.window = window
+        self.path = path
+        self.trace_format = trace_format
+
+        self.durations = {}
+        self.lock = threading.Lock()
+        self.output = None
+        self.separator = ""
+
+    @staticmethod
+    def now():
+        """
+        Current time of the tracer clock
+        :return: seconds, only meaningful relative to another call
+        """
+        return timeit.default_timer()
+
+    def open(self):
+        """
+        Starts a session, the recent spans of the previous one are forgotten
+        and the trace file is overwritten
+        :return: None
+        """
+        with self.lock:
+            self.durations = {}
+
+            if self.path:
+                try:
+                    self.output = open(self.path, "w")
+                except IOError as e:
+                    # tracing never prevents scanning
+                    log.warning("cannot write the trace file: %s", e)
+                    return
+
+                if self.trace_format == CycleTracer.CHROME:
+                    self.output.write("[\n")
+                    self.separator = ""
+
+    def _write(self, stage, started, duration):
+        thread = threading.current_thread()
+
+        if self.trace_format == CycleTracer.CHROME:
+            event = {
+                "name": stage,
+                "ph": "X",
+                "ts": started * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": thread.ident
+            }
+            self.output.write(self.separator + json.dumps(event))
+            self.separator = ",\n"
+        else:
+            event = {
+                "stage": stage,
+                "start": started,
+                "duration": duration,
+                "thread": thread.name
+            }
+            self.output.write(json.dumps(event) + "\n")
+
+    def span(self, stage, started, ended=None):
+        """
+        Records the duration of a stage, can be called from any thread
+        :param stage: stage name
+        :param started: start time, from now
+        :param ended: end time, from now, defaults to now
+        :return: None
+        """
+        if ended is None:
+            ended = CycleTracer.now()
+
+        duration = ended - started
+        with self.lock:
+            if stage not in self.durations:
+                self.durations[stage] = deque(maxlen=self.window)
+            self.durations[stage].append(duration)
+
+            if self.output is not None:
+                self._write(stage, started, duration)
+
+    def percentiles(self, stage):
+        """
+        Statistics of the recent durations of a stage
+        :param stage: stage name
+        :return: (p50, p95, max) in seconds, None when the stage has no span yet
+        """
+        with self.lock:
+            durations = sorted(self.durations.get(stage, ()))
+
+        if not durations:
+            return None
+
+        # nearest-rank percentiles
+        def rank(p):
+            return durations[max(0, int(math.ceil(p * len(durations))) - 1)]
+
+        return rank(0.50), rank(0.95), durations[-1]
+
+    def close(self):
+        """
+        Ends the session and closes the trace file
+        :return: None
+        """
+        with self.lock:
+            if self.output is not None:
+                if self.trace_format == CycleTracer.CHROME:
+                    self.output.write("\n]\n")
+                self.output.close()
+                self.output = None
@@ -133,6 +133,14 @@ class Ui_MainWindow(object):
         self.pushButton_select.setSizePolicy(sizePolicy)
         self.pushButton_select.setObjectName("pushButton_select")
         self.horizontalLayout.addWidget(self.pushButton_select)
+        self.pushButton_ignore = QtGui.QPushButton(self.groupBox_1)
+        sizePolicy = QtGui.QSizePolicy(QtGui.QSizePolicy.Fixed, QtGui.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pushButton_ignore.sizePolicy().hasHeightForWidth())
+        self.pushButton_ignore.setSizePolicy(sizePolicy)
+        self.pushButton_ignore.setObjectName("pushButton_ignore")
+        self.horizontalLayout.addWidget(self.pushButton_ignore)
         self.gridLayout_2.addWidget(self.groupBox_1, 0, 0, 1, 1)
         self.groupBox_2 = QtGui.QGroupBox(self.tab_1)
         self.groupBox_2.setObjectName("groupBox_2")
@@ -159,15 +167,16 @@ class Ui_MainWindow(object):
         self.label_6.setSizePolicy(sizePolicy)
         self.label_6.setObjectName("label_6")
         self.horizontalLayout_2.addWidget(self.label_6)
-        self.spinBox_cycle = QtGui.QSpinBox(self.groupBox_2)
-        self.spinBox_cycle.setToolTip("")
-        self.spinBox_cycle.setStatusTip("")
-        self.spinBox_cycle.setWhatsThis("")
-        self.spinBox_cycle.setMinimum(1)
-        self.spinBox_cycle.setMaximum(600)
-        self.spinBox_cycle.setProperty("value", 3)
-        self.spinBox_cycle.setObjectName("spinBox_cycle")
-        self.horizontalLayout_2.addWidget(self.spinBox_cycle)
+        self.doubleSpinBox_cycle = QtGui.QDoubleSpinBox(self.groupBox_2)
+        self.doubleSpinBox_cycle.setToolTip("")
+        self.doubleSpinBox_cycle.setStatusTip("")
+        self.doubleSpinBox_cycle.setWhatsThis("")
+        self.doubleSpinBox_cycle.setDecimals(3)
+        self.doubleSpinBox_cycle.setMinimum(0.001)
+        self.doubleSpinBox_cycle.setMaximum(600.0)
+        self.doubleSpinBox_cycle.setProperty("value", 3.0)
+        self.doubleSpinBox_cycle.setObjectName("doubleSpinBox_cycle")
+        self.horizontalLayout_2.addWidget(self.doubleSpinBox_cycle)
         self.label = QtGui.QLabel(self.groupBox_2)
         sizePolicy = QtGui.QSizePolicy(QtGui.QSizePolicy.Maximum, QtGui.QSizePolicy.Preferred)
         sizePolicy.setHorizontalStretch(0)
@@ -295,6 +304,7 @@ class Ui_MainWindow(object):
         self.label_3.setText(QtGui.QApplication.translate("MainWindow", "Width:", None, QtGui.QApplication.UnicodeUTF8))
         self.label_4.setText(QtGui.QApplication.translate("MainWindow", "Height:", None, QtGui.QApplication.UnicodeUTF8))
         self.pushButton_select.setText(QtGui.QApplication.translate("MainWindow", "Select Area", None, QtGui.QApplication.UnicodeUTF8))
+        self.pushButton_ignore.setText(QtGui.QApplication.translate("MainWindow", "Ignore Areas", None, QtGui.QApplication.UnicodeUTF8))
         self.groupBox_2.setTitle(QtGui.QApplication.translate("MainWindow", "Control", None, QtGui.QApplication.UnicodeUTF8))
         self.label_5.setText(QtGui.QApplication.translate("MainWindow", "Threshold [%]:", None, QtGui.QApplication.UnicodeUTF8))
         self.label_6.setText(QtGui.QApplication.translate("MainWindow", "Cycle time [s]:", None, QtGui.QApplication.UnicodeUTF8))
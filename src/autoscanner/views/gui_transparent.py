@@ -11,11 +11,13 @@ from autoscanner.tools.scantools import ScanTools
 
 class TransparentWindow(QtGui.QDialog):
     """
-    Full-screen transparent window used for defining a capture zone
+    Full-screen transparent window used for defining a capture zone,
+    or several rectangles when given a list of rectangles to edit
+    (Enter or right click to accept, Backspace to remove the last rectangle)
     """
     OPACITY = 0.25
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, rects=None):
         super(TransparentWindow, self).__init__(parent)
 
         self.layout = QtGui.QGridLayout()
@@ -31,8 +33,30 @@ class TransparentWindow(QtGui.QDialog):
         screen_geometry = ScanTools.get_full_screen_geometry()
         self.setGeometry(screen_geometry)
         self.rubber_band = QtGui.QRubberBand(QtGui.QRubberBand.Rectangle, self)
+        self.rects = list(rects) if rects is not None else None
+
+    def paintEvent(self, event):
+        if self.rects:
+            painter = QtGui.QPainter(self)
+            painter.setBrush(QtCore.Qt.red)
+            for rect in self.rects:
+                painter.drawRect(rect)
+            painter.end()
+
+    def keyPressEvent(self, event):
+        if self.rects is not None and event.key() in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+            self.accept()
+        elif self.rects and event.key() == QtCore.Qt.Key_Backspace:
+            self.rects.pop()
+            self.update()
+        else:
+            super(TransparentWindow, self).keyPressEvent(event)
 
     def mousePressEvent(self, event):
+        if self.rects is not None and event.button() == QtCore.Qt.RightButton:
+            self.accept()
+            return
+
         self.origin = event.pos()
         self.rubber_band.setGeometry(QtCore.QRect(self.origin, QtCore.QSize()))
         self.rubber_band.show()
@@ -42,7 +66,14 @@ class TransparentWindow(QtGui.QDialog):
 
     def mouseReleaseEvent(self, event):
         self.rubber_band.hide()
-        self.accept()
+
+        if self.rects is None:
+            self.accept()
+        elif self.origin is not None:
+            rect = self.rubber_band.geometry()
+            if not rect.isEmpty():
+                self.rects.append(rect)
+                self.update()
 
 
 def main():
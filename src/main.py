@@ -7,6 +7,21 @@ Created on 22 nov. 2015
 
 def main():
     import sys
+    import argparse
+    import multiprocessing
+
+    # required by the process pool comparison backend in frozen executables
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", metavar="CONFIG", help="scan without the main window, as configured in CONFIG")
+    args, _ = parser.parse_known_args()  # the remaining arguments are left to Qt
+
+    if args.headless:
+        from autoscanner import daemon
+
+        sys.exit(daemon.run(args.headless))
+
     from autoscanner import app
 
     sys.exit(app.run())
@@ -0,0 +1,15 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Tests of the scanning tools, run from the repository root:
+>python -m pytest tests
+The tests of the modules depending on PySide are skipped when it is not installed,
+except the alert tests, which only need the signals of the stand-in of qtstub.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
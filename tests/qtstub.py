@@ -0,0 +1,60 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+
+Minimal stand-in for PySide.QtCore, enough for the modules that only declare signals,
+so that their tests run without PySide. It provides no QtGui: the tests needing
+the real PySide skip themselves with pytest.importorskip("PySide.QtGui").
+"""
+
+import sys
+import types
+
+
+class _BoundSignal(object):
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+class Signal(object):
+    def __init__(self, *types):
+        self.name = "signal_{0}".format(id(self))
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.setdefault(self.name, _BoundSignal())
+
+
+def Slot(*types, **kwargs):
+    return lambda func: func
+
+
+class QObject(object):
+    def __init__(self, parent=None):
+        self.parent = parent
+
+
+def install():
+    """
+    Registers the stand-in as PySide.QtCore, unless PySide is installed
+    :return: None
+    """
+    try:
+        import PySide
+    except ImportError:
+        qt_core = types.ModuleType("PySide.QtCore")
+        qt_core.Signal, qt_core.Slot, qt_core.QObject = Signal, Slot, QObject
+
+        pyside = types.ModuleType("PySide")
+        pyside.QtCore = qt_core
+        sys.modules["PySide"] = pyside
+        sys.modules["PySide.QtCore"] = qt_core
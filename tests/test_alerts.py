@@ -0,0 +1,222 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import time
+import threading
+
+import pytest
+
+import qtstub
+
+qtstub.install()  # the alerts only declare signals, they are tested without PySide too
+
+from autoscanner.alerts.dispatcher import AlertDispatcher
+from autoscanner.alerts.pushbullet import PushBullet, PushBulletClient
+from autoscanner.alerts.sinks import Alert, AlertSink, AudioSink
+from autoscanner.alerts.soundalert import SoundAlert
+
+
+class RecordingSink(AlertSink):
+    name = "recording"
+
+    def __init__(self, expected=1):
+        self.alerts = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    def send(self, alert):
+        self.alerts.append(alert)
+        if len(self.alerts) >= self.expected:
+            self.done.set()
+        return True
+
+
+class BlockingSink(RecordingSink):
+    name = "blocking"
+
+    def __init__(self):
+        super(BlockingSink, self).__init__()
+        self.release = threading.Event()
+        self.closed = threading.Event()
+
+    def send(self, alert):
+        self.release.wait(5.0)
+        return super(BlockingSink, self).send(alert)
+
+    def close(self):
+        self.closed.set()
+
+
+@pytest.fixture
+def beeps(monkeypatch):
+    beeps = []
+    monkeypatch.setattr(SoundAlert, "beep", staticmethod(lambda: beeps.append(time.time())))
+    return beeps
+
+
+def test_merged_alert():
+    first = Alert("title", "first", ["a"], timestamp=10.0, details={"history": "alert-1", "changes": {"a": [1]}})
+    second = Alert("title", "second", ["b", "a"], timestamp=12.0,
+                   details={"history": "alert-2", "changes": {"a": [2], "b": [3]}})
+    merged = first.merged(second)
+
+    assert merged.message == "second"
+    assert merged.regions == ["a", "b"]
+    assert (merged.timestamp, merged.last_timestamp) == (10.0, 12.0)
+    assert merged.count == 2
+    assert merged.details == {"history": ["alert-1", "alert-2"], "changes": {"a": [1, 2], "b": [3]}}
+
+    third = merged.merged(Alert("title", "third", ["a"], timestamp=13.0, details={"history": "alert-3"}))
+    assert third.count == 3
+    assert third.details["history"] == ["alert-1", "alert-2", "alert-3"]
+
+
+def test_every_alert_delivered_without_window():
+    sink = RecordingSink(expected=3)
+    dispatcher = AlertDispatcher([sink])
+    for i in range(3):
+        dispatcher.dispatch(Alert("title", str(i)))
+
+    assert sink.done.wait(2.0)
+    dispatcher.stop(2.0)
+    assert sorted(alert.message for alert in sink.alerts) == ["0", "1", "2"]
+
+
+def test_alerts_coalesced_within_the_window():
+    sink = RecordingSink(expected=2)
+    dispatcher = AlertDispatcher([sink], coalesce_window=0.3)
+    for i in range(4):
+        dispatcher.dispatch(Alert("title", str(i), ["region {0}".format(i)]))
+
+    # the first one right away, the following ones once the window ends
+    assert sink.done.wait(2.0)
+    dispatcher.stop(2.0)
+
+    assert [(alert.message, alert.count) for alert in sink.alerts] == [("0", 1), ("3", 3)]
+    assert sink.alerts[1].regions == ["region 1", "region 2", "region 3"]
+
+
+def test_pending_alert_delivered_on_stop():
+    sink = RecordingSink(expected=2)
+    dispatcher = AlertDispatcher([sink], coalesce_window=60.0)
+    dispatcher.dispatch(Alert("title", "first"))
+    dispatcher.dispatch(Alert("title", "second"))
+
+    dispatcher.stop(2.0)
+    assert [alert.message for alert in sink.alerts] == ["first", "second"]
+
+
+def test_replaced_sinks():
+    first = RecordingSink()
+    dispatcher = AlertDispatcher([first])
+    dispatcher.dispatch(Alert("title", "first"))
+
+    sinks = [RecordingSink() for _ in range(3)]
+    dispatcher.sinks = sinks
+    dispatcher.dispatch(Alert("title", "second"))
+
+    dispatcher.stop(2.0)
+    assert [alert.message for alert in first.alerts] == ["first"]
+    assert all([alert.message for alert in sink.alerts] == ["second"] for sink in sinks)
+
+
+def test_endless_audio_does_not_delay_the_other_sinks(beeps):
+    audio = AudioSink(repeat=None, interval=0.01)
+    sink = RecordingSink(expected=3)
+    dispatcher = AlertDispatcher([audio, sink])
+    for i in range(3):
+        dispatcher.dispatch(Alert("title", str(i)))
+
+    # still beeping for the first alert, the next ones wait in the queue of the audio sink only
+    assert sink.done.wait(2.0)
+    assert beeps
+
+    dispatcher.stop(2.0)
+    assert [alert.message for alert in sink.alerts] == ["0", "1", "2"]
+
+
+def test_audio_silenced_before_delivery(beeps):
+    sink = AudioSink(repeat=None, interval=0.01)
+    alert = Alert("title", "message", timestamp=time.time() - 1.0)
+    sink.silence()
+
+    assert sink.send(alert)
+    assert beeps == []
+
+    # a later alert beeps again
+    sink_thread = threading.Thread(target=sink.send, args=(Alert("title", "later", timestamp=time.time() + 0.01),))
+    sink_thread.start()
+    time.sleep(0.1)
+    sink.silence()
+    sink_thread.join(1.0)
+    assert not sink_thread.is_alive()
+    assert beeps
+
+
+def test_stop_interrupts_the_audio(beeps):
+    dispatcher = AlertDispatcher([AudioSink(repeat=None, interval=0.01)], coalesce_window=60.0)
+    dispatcher.dispatch(Alert("title", "beeping"))
+    dispatcher.dispatch(Alert("title", "pending"))
+    time.sleep(0.05)
+
+    started = time.time()
+    dispatcher.stop(5.0)
+    assert time.time() - started < 1.0
+
+    count = len(beeps)
+    time.sleep(0.1)
+    assert len(beeps) == count
+
+
+def test_sinks_closed_once_their_deliveries_are_done():
+    slow, fast = BlockingSink(), BlockingSink()
+    fast.release.set()
+    dispatcher = AlertDispatcher([slow, fast])
+    dispatcher.dispatch(Alert("title", "message"))
+
+    dispatcher.stop(0.2)
+    assert fast.closed.is_set()
+    assert not slow.closed.is_set()
+
+    # the timed out delivery goes on, the sink is closed after it
+    slow.release.set()
+    assert slow.closed.wait(2.0)
+    assert [alert.message for alert in slow.alerts] == ["message"]
+
+
+def test_pushbullet_sends_again_after_a_timed_out_stop(monkeypatch):
+    release = threading.Event()
+    closed = []
+
+    def push_note(client, access_token, title, body):
+        if body == "slow":
+            release.wait(5.0)
+        return True
+
+    monkeypatch.setattr(PushBulletClient, "push_note", push_note)
+    monkeypatch.setattr(PushBulletClient, "close", lambda client: closed.append(client))
+
+    push_bullet = PushBullet()
+    sent = []
+    push_bullet.finished.connect(sent.append)
+    push_bullet.send("key", "title", "slow")
+    push_bullet.stop(0.05)
+
+    # a new thread with its own queue and connection, not stuck behind the previous one
+    push_bullet.send("key", "title", "next")
+    deadline = time.time() + 2.0
+    while not sent and time.time() < deadline:
+        time.sleep(0.01)
+    assert sent == [True]
+    assert closed == []
+
+    release.set()
+    push_bullet.stop(2.0)
+    deadline = time.time() + 2.0
+    while len(closed) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(closed) == 2
+    assert closed[0] is not closed[1]
@@ -0,0 +1,234 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import numpy
+import pytest
+from PIL import Image
+
+from autoscanner.tools.diffengine import DiffEngine
+from autoscanner.tools.backends import ThreadBackend
+from autoscanner.tools.region import Region
+
+MODES = [
+    ("L", (37, 53)),
+    ("RGB", (37, 53, 3)),
+    ("RGBA", (20, 11, 4))
+]
+
+
+def random_pair(shape, seed=0):
+    rng = numpy.random.RandomState(seed)
+    return rng.randint(0, 256, shape).astype(numpy.uint8), rng.randint(0, 256, shape).astype(numpy.uint8)
+
+
+def reference_pair(mode, shape):
+    # images and score of the pure Python implementation of ScanTools
+    pytest.importorskip("PySide.QtGui")
+    from autoscanner.tools.scantools import ScanTools
+
+    arr1, arr2 = random_pair(shape)
+    img1, img2 = Image.fromarray(arr1, mode), Image.fromarray(arr2, mode)
+    return img1, img2, ScanTools.compare_images_reference(img1, img2)
+
+
+@pytest.mark.parametrize("mode, shape", MODES)
+def test_score_matches_the_reference(mode, shape):
+    img1, img2, reference = reference_pair(mode, shape)
+    assert DiffEngine.score(img1, img2) == pytest.approx(reference, abs=1e-9)
+
+
+def test_identical_images_score_zero():
+    arr, _ = random_pair((40, 30, 3))
+    assert DiffEngine.score(arr, arr.copy()) == 0.0
+
+
+def test_score_of_arrays_and_images():
+    arr1, arr2 = random_pair((40, 30, 3))
+    assert DiffEngine.score(Image.fromarray(arr1), Image.fromarray(arr2)) == DiffEngine.score(arr1, arr2)
+
+
+@pytest.mark.parametrize("mode, shape", MODES)
+def test_tiled_matches_the_reference(mode, shape):
+    img1, img2, reference = reference_pair(mode, shape)
+    assert DiffEngine.score_tiled(img1, img2, tile_rows=8) == (pytest.approx(reference, abs=1e-9), True)
+
+
+def test_tiled_without_threshold_is_exact():
+    arr1, arr2 = random_pair((103, 77, 3))
+    score, exact = DiffEngine.score_tiled(arr1, arr2, tile_rows=16)
+
+    assert exact
+    assert score == pytest.approx(DiffEngine.score(arr1, arr2))
+
+
+def test_tiled_early_exit_is_a_lower_bound():
+    arr1, arr2 = random_pair((103, 77, 3))
+    full = DiffEngine.score(arr1, arr2)
+    score, exact = DiffEngine.score_tiled(arr1, arr2, threshold=1.0, tile_rows=8)
+
+    assert not exact
+    assert 1.0 < score < full
+
+
+def test_tiled_under_the_threshold_is_exact():
+    arr1, arr2 = random_pair((103, 77, 3))
+    score, exact = DiffEngine.score_tiled(arr1, arr2, threshold=99.0, tile_rows=8)
+
+    assert exact
+    assert score == pytest.approx(DiffEngine.score(arr1, arr2))
+
+
+def checkerboard_pair(size=64, amplitude=50):
+    # every 2x2 block keeps its mean, only the full resolution sees the change
+    base = numpy.full((size, size, 3), 128, dtype=numpy.uint8)
+    changed = base.copy()
+    rows, cols = numpy.mgrid[:size, :size]
+    changed[(rows + cols) % 2 == 0] += amplitude
+    changed[(rows + cols) % 2 == 1] -= amplitude
+    return base, changed
+
+
+def flat_screen(seed=0):
+    # flat background with a few textured widgets, like most desktops
+    rng = numpy.random.RandomState(seed)
+    arr = numpy.full((96, 128, 3), 200, dtype=numpy.uint8)
+    arr[8:24, 8:40] = rng.randint(0, 256, (16, 32, 3))
+    arr[60:76, 90:120] = rng.randint(0, 256, (16, 30, 3))
+    return arr
+
+
+@pytest.fixture
+def compared_pixels(monkeypatch):
+    # number of pixels read at full resolution
+    counts = []
+    abs_diff_sum = DiffEngine.abs_diff_sum
+
+    def counting(arr1, arr2, keep=None):
+        counts.append(arr1.size)
+        return abs_diff_sum(arr1, arr2, keep)
+
+    monkeypatch.setattr(DiffEngine, "abs_diff_sum", staticmethod(counting))
+    return counts
+
+
+@pytest.mark.parametrize("mode, shape", MODES)
+def test_pyramid_matches_the_reference(mode, shape):
+    img1, img2, reference = reference_pair(mode, shape)
+    score, exact = DiffEngine.score_pyramid(DiffEngine.build_pyramid(img1, 2), img2, -1.0)
+    assert exact
+    assert score == pytest.approx(reference, abs=1e-9)
+
+
+def test_pyramid_refining_every_block_is_exact():
+    base = numpy.random.RandomState(0).randint(0, 256, (103, 77, 3)).astype(numpy.uint8)
+    changed = base.copy()
+    changed[40:60, 10:30] = 0
+    changed[100:, :] = 5  # leftover rows
+
+    score, exact = DiffEngine.score_pyramid(DiffEngine.build_pyramid(base, 3), changed, -1.0)
+    assert exact
+    assert score == pytest.approx(DiffEngine.score(base, changed))
+
+
+def test_pyramid_estimate_is_a_lower_bound():
+    base, changed = checkerboard_pair()
+    score, exact = DiffEngine.score_pyramid(DiffEngine.build_pyramid(base, 3), changed, 1.0)
+
+    assert not exact
+    assert score == 0.0
+    assert DiffEngine.score(base, changed) == pytest.approx(19.6078, abs=1e-4)
+
+
+@pytest.mark.parametrize("threshold", [10.0, 19.0, 50.0])
+def test_pyramid_bounds_see_a_checkerboard(threshold):
+    base, changed = checkerboard_pair()
+    full = DiffEngine.score(base, changed)
+    score, exact = DiffEngine.score_pyramid(DiffEngine.build_pyramid(base, 3), changed, 1.0, threshold)
+
+    # the coarse level misses it, the block ranges do not
+    if exact:
+        assert score == pytest.approx(full)
+    elif threshold < full:
+        assert threshold < score <= full
+    else:
+        assert full <= score <= threshold
+
+
+def test_pyramid_skips_identical_blocks(compared_pixels):
+    base = flat_screen()
+    assert DiffEngine.score_pyramid(DiffEngine.build_pyramid(base, 3), base.copy(), 1.0, 1.0) == (0.0, True)
+    assert sum(compared_pixels) == 0
+
+    changed = base.copy()
+    changed[10, 10] = 0
+    score, exact = DiffEngine.score_pyramid(DiffEngine.build_pyramid(base, 3), changed, -1.0, 1.0)
+
+    # a single block is read at full resolution
+    assert sum(compared_pixels) == 8 * 8 * 3
+    assert exact
+    assert score == pytest.approx(DiffEngine.score(base, changed))
+
+
+@pytest.mark.parametrize("threshold", [0.5, 2.0, 5.0, 20.0])
+def test_pyramid_bounds_decide_the_threshold(threshold):
+    base = flat_screen()
+    for seed in range(5):
+        rng = numpy.random.RandomState(seed)
+        changed = base.copy()
+        changed[rng.randint(0, 80):, rng.randint(0, 100):][:20, :30] = rng.randint(0, 256, 3)
+        full = DiffEngine.score(base, changed)
+        score, exact = DiffEngine.score_pyramid(DiffEngine.build_pyramid(base, 3), changed, 1.0, threshold)
+
+        if exact:
+            assert score == pytest.approx(full)
+        elif score > threshold:
+            assert score <= full + 1e-9
+        else:
+            assert full <= score + 1e-9
+
+
+def test_backend_skips_the_full_compare(monkeypatch, compared_pixels):
+    def full_compare(*args, **kwargs):
+        raise AssertionError("full resolution comparison")
+
+    monkeypatch.setattr(DiffEngine, "score", staticmethod(full_compare))
+    monkeypatch.setattr(DiffEngine, "score_tiled", staticmethod(full_compare))
+
+    base = flat_screen()
+    backend = ThreadBackend(pyramid_levels=3, pyramid_floor=1.0)
+    backend.start(base, [Region("main", 0, 0, 128, 96, 1.0)])
+
+    assert backend.compare(base.copy())["main"] == (0.0, True)
+    assert sum(compared_pixels) == 0
+
+
+def test_backend_keeps_a_pyramid_bound_above_the_threshold():
+    base = numpy.zeros((64, 64, 3), dtype=numpy.uint8)
+    changed = base.copy()
+    changed[:32] = 255
+    backend = ThreadBackend(pyramid_levels=2, pyramid_floor=1.0)
+    backend.start(base, [Region("main", 0, 0, 64, 64, 10.0)])
+
+    score, exact = backend.compare(changed)["main"]
+    assert not exact
+    assert 10.0 < score <= DiffEngine.score(base, changed)
+
+
+def test_backend_update_baseline_keeps_the_masks():
+    base, new = flat_screen(0), flat_screen(1)
+    keep = numpy.ones((96, 128, 1), dtype=numpy.uint8)
+    keep[:8, :20] = 0
+    backend = ThreadBackend(pyramid_levels=3, pyramid_floor=-1.0)
+    backend.start(base, [Region("main", 0, 0, 128, 96, 1.0)], keep)
+    masks = backend.masks
+
+    backend.update_baseline(new)
+    assert backend.masks is masks
+    assert backend.compare(new.copy())["main"] == (0.0, True)
+
+    score, exact = backend.compare(base)["main"]
+    assert exact
+    assert score == pytest.approx(DiffEngine.score(new, base, masks["main"]))
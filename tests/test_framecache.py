@@ -0,0 +1,57 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import numpy
+
+from autoscanner.tools.framecache import FrameCache
+
+
+def frame(value, noise=0):
+    arr = numpy.zeros((64, 64, 3), dtype=numpy.uint8)
+    arr[:32] = value
+    arr[40, 40] = noise  # too small for the perceptual fingerprint
+    return arr
+
+
+def fingerprint(cache, arr):
+    return cache.fingerprint(arr.tostring(), arr)
+
+
+def test_identical_frames_reuse_the_exact_result():
+    cache = FrameCache()
+    cache.reset(fingerprint(cache, frame(200)), "baseline")
+    cache.store(fingerprint(cache, frame(100)), "previous", quiet=False)
+
+    assert cache.lookup(fingerprint(cache, frame(200))) == ("baseline", True)
+    assert cache.lookup(fingerprint(cache, frame(100))) == ("previous", True)
+    assert cache.lookup(fingerprint(cache, frame(200, noise=1))) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_similar_frames_reuse_quiet_results_only():
+    cache = FrameCache(perceptual=True)
+    cache.reset(fingerprint(cache, frame(200)), "baseline")
+    assert cache.lookup(fingerprint(cache, frame(200, noise=1))) == ("baseline", False)
+
+    # a frame over a threshold is only reused by identical frames
+    changed = frame(0)
+    changed[:, :32] = 255
+    cache.store(fingerprint(cache, changed), "changed", quiet=False)
+    assert cache.lookup(fingerprint(cache, changed)) == ("changed", True)
+
+    similar = changed.copy()
+    similar[40, 40] = 7
+    assert cache.lookup(fingerprint(cache, similar)) is None
+
+    cache.store(fingerprint(cache, changed), "changed", quiet=True)
+    assert cache.lookup(fingerprint(cache, similar)) == ("changed", False)
+
+
+def test_invalidate_forgets_the_results():
+    cache = FrameCache(perceptual=True)
+    cache.reset(fingerprint(cache, frame(200)), "baseline")
+    cache.invalidate()
+    assert cache.lookup(fingerprint(cache, frame(200))) is None
@@ -0,0 +1,130 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import time
+import threading
+
+import pytest
+
+from autoscanner.tools.framequeue import FrameQueue
+
+
+def start_thread(target, *args):
+    thread = threading.Thread(target=target, args=args)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def drain(queue):
+    queue.close()
+    items = []
+    while True:
+        item = queue.get()
+        if item is None:
+            return items
+        items.append(item)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        FrameQueue(1, "drop_all")
+
+
+def test_drop_oldest_keeps_the_newest():
+    queue = FrameQueue(2, FrameQueue.DROP_OLDEST)
+    assert all(queue.put(i) for i in range(5))
+
+    assert drain(queue) == [3, 4]
+    assert queue.dropped == 3
+    assert queue.max_depth == 2
+
+
+def test_drop_newest_keeps_the_oldest():
+    queue = FrameQueue(2, FrameQueue.DROP_NEWEST)
+    assert [queue.put(i) for i in range(4)] == [True, True, False, False]
+
+    assert drain(queue) == [0, 1]
+    assert queue.dropped == 2
+
+
+def test_block_waits_for_room():
+    queue = FrameQueue(1, FrameQueue.BLOCK)
+    queue.put(0)
+    producer = start_thread(queue.put, 1)
+
+    producer.join(0.1)
+    assert producer.is_alive()
+    assert queue.get() == 0
+
+    producer.join(1.0)
+    assert not producer.is_alive()
+    assert drain(queue) == [1]
+    assert queue.dropped == 0
+
+
+def test_policy_override():
+    queue = FrameQueue(1, FrameQueue.DROP_OLDEST)
+    queue.put(0)
+    assert not queue.put(1, FrameQueue.DROP_NEWEST)
+    assert drain(queue) == [0]
+
+
+@pytest.mark.parametrize("policy", [FrameQueue.DROP_OLDEST, FrameQueue.DROP_NEWEST])
+def test_pinned_item_is_never_dropped(policy):
+    queue = FrameQueue(1, policy)
+    queue.put("baseline", pinned=True)
+    producer = start_thread(queue.put, 1)
+
+    # the dropping put waits for the baseline to be taken instead
+    producer.join(0.1)
+    assert producer.is_alive()
+    assert queue.get() == "baseline"
+
+    producer.join(1.0)
+    assert not producer.is_alive()
+    assert drain(queue) == [1]
+    assert queue.dropped == 0
+
+
+def test_baseline_retained_under_a_fast_producer():
+    queue = FrameQueue(2, FrameQueue.DROP_OLDEST)
+    queue.put("baseline", pinned=True)
+
+    def produce():
+        for i in range(100):
+            queue.put(i)
+        queue.close()
+
+    producer = start_thread(produce)
+    time.sleep(0.05)  # the producer runs ahead of the consumer
+
+    items = []
+    while True:
+        item = queue.get()
+        if item is None:
+            break
+        items.append(item)
+    producer.join(1.0)
+
+    assert items[0] == "baseline"
+    assert items[-1] == 99
+    assert queue.pinned == 0
+
+
+def test_close_releases_the_producers():
+    queue = FrameQueue(1, FrameQueue.BLOCK)
+    queue.put(0)
+    results = []
+    producer = start_thread(lambda: results.append(queue.put(1)))
+
+    queue.close()
+    producer.join(1.0)
+    assert results == [False]
+
+    # the queued items are still delivered
+    assert queue.get() == 0
+    assert queue.get() is None
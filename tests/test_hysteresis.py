@@ -0,0 +1,56 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+from autoscanner.tools.hysteresis import HysteresisGate
+from autoscanner.tools.region import Region
+
+
+def region(name, threshold):
+    return Region(name, 0, 0, 1, 1, threshold)
+
+
+def test_enter_and_exit():
+    gate = HysteresisGate(clear_ratio=0.5)
+    gate.start([region("main", 2.0)])
+
+    assert gate.update({"main": (1.0, True)}, 0.0) == []
+    assert gate.update({"main": (2.5, True)}, 1.0) == [(HysteresisGate.ENTER, "main")]
+    assert gate.active_regions == ["main"]
+    # between the clear and the raise thresholds, the alert state holds
+    assert gate.update({"main": (1.5, True)}, 2.0) == []
+    assert gate.update({"main": (0.9, True)}, 3.0) == [(HysteresisGate.EXIT, "main")]
+    assert gate.active_regions == []
+
+
+def test_dwell_cancelled_by_a_dip():
+    gate = HysteresisGate(clear_ratio=0.8, dwell=1.0)
+    gate.start([region("main", 2.0)])
+
+    assert gate.update({"main": (3.0, True)}, 0.0) == []
+    assert gate.update({"main": (1.0, True)}, 0.5) == []  # back under, the pending transition is cancelled
+    assert gate.update({"main": (3.0, True)}, 0.9) == []
+    assert gate.update({"main": (3.0, True)}, 1.5) == []
+    assert gate.update({"main": (3.0, True)}, 2.0) == [(HysteresisGate.ENTER, "main")]
+
+
+def test_regions_are_independent():
+    gate = HysteresisGate(clear_ratio=0.8)
+    gate.start([region("left", 1.0), region("right", 5.0)])
+
+    assert gate.update({"left": (2.0, True), "right": (2.0, True)}, 0.0) == [(HysteresisGate.ENTER, "left")]
+    assert sorted(gate.update({"left": (0.5, True), "right": (6.0, True)}, 1.0)) == [
+        (HysteresisGate.ENTER, "right"), (HysteresisGate.EXIT, "left")
+    ]
+    assert gate.active_regions == ["right"]
+
+
+def test_start_clears_the_states():
+    gate = HysteresisGate()
+    gate.start([region("main", 1.0)])
+    gate.update({"main": (2.0, True)}, 0.0)
+
+    gate.start([region("main", 1.0)])
+    assert gate.active_regions == []
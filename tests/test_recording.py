@@ -0,0 +1,118 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import numpy
+import pytest
+
+from autoscanner.tools.capture import Frame
+from autoscanner.tools.recording import FrameRecorder, RecordingSource
+
+
+def make_frames(count, shape=(24, 32, 3), seed=0):
+    rng = numpy.random.RandomState(seed)
+    return [Frame.from_pixels(rng.randint(0, 256, shape).astype(numpy.uint8), 100.0 + i * 0.5) for i in range(count)]
+
+
+def record(path, frames):
+    recorder = FrameRecorder(path)
+    for frame in frames:
+        recorder.append(frame)
+    recorder.close()
+
+
+def replay(path, speed=0.0):
+    source = RecordingSource(path, speed)
+    source.start()
+    frames = []
+    while True:
+        frame = source.grab()
+        if frame is None:
+            break
+        frames.append(frame)
+    source.stop()
+    return frames
+
+
+def assert_same_frames(replayed, frames):
+    assert len(replayed) == len(frames)
+    for replayed_frame, frame in zip(replayed, frames):
+        assert replayed_frame.timestamp == frame.timestamp
+        numpy.testing.assert_array_equal(replayed_frame.pixels, frame.pixels)
+
+
+@pytest.mark.parametrize("shape", [(24, 32, 3), (17, 9, 4)])
+def test_round_trip(tmpdir, shape):
+    path = str(tmpdir.join("session.rec"))
+    frames = make_frames(5, shape)
+    record(path, frames)
+
+    assert RecordingSource.read_header(path) == shape
+    assert len(RecordingSource(path)) == 5
+    assert_same_frames(replay(path), frames)
+
+
+def test_append_to_a_recording(tmpdir):
+    path = str(tmpdir.join("session.rec"))
+    frames = make_frames(6)
+    record(path, frames[:4])
+    record(path, frames[4:])
+
+    assert_same_frames(replay(path), frames)
+
+
+def test_partial_record_dropped(tmpdir):
+    path = str(tmpdir.join("session.rec"))
+    frames = make_frames(4)
+    record(path, frames[:3])
+    with open(path, "ab") as recording:
+        recording.write(b"cut short")
+
+    # the partial record is not mapped, then overwritten by the next frame
+    assert len(RecordingSource(path)) == 3
+    record(path, frames[3:])
+    assert_same_frames(replay(path), frames)
+
+
+def test_frame_size_mismatch(tmpdir):
+    path = str(tmpdir.join("session.rec"))
+    record(path, make_frames(2))
+
+    with pytest.raises(ValueError):
+        record(path, make_frames(1, (24, 33, 3)))
+
+    recorder = FrameRecorder(str(tmpdir.join("other.rec")))
+    recorder.append(make_frames(1)[0])
+    with pytest.raises(ValueError):
+        recorder.append(make_frames(1, (8, 8, 3))[0])
+    recorder.close()
+
+
+def test_not_a_recording(tmpdir):
+    path = tmpdir.join("image.png")
+    path.write("not a recording, long enough to hold a header")
+
+    with pytest.raises(ValueError):
+        RecordingSource.read_header(str(path))
+
+
+def test_paced_replay(tmpdir):
+    path = str(tmpdir.join("session.rec"))
+    frames = make_frames(3)  # 0.5 s apart
+    record(path, frames)
+
+    source = RecordingSource(path, speed=10.0)
+    assert source.paced
+    source.start()
+    grabbed = [source.grab() for _ in range(3)]
+    assert source.grab() is None
+    assert_same_frames(grabbed, frames)
+
+    # interrupted while waiting for the next frame
+    source.start()
+    source.grab()
+    source.interrupt()
+    assert source.grab() is None
+    source.stop()
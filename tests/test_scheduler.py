@@ -0,0 +1,29 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import pytest
+
+pytest.importorskip("PySide.QtGui")  # the scheduler needs the timers and wait conditions of PySide
+
+from autoscanner.tools.scheduler import CycleScheduler
+
+
+def test_wait_returns_none_once_stopped():
+    scheduler = CycleScheduler(10.0)
+    scheduler.start()
+    scheduler.stop()
+    assert scheduler.wait() is None
+
+
+def test_restart_after_stop():
+    scheduler = CycleScheduler(0.01)
+    scheduler.start()
+    scheduler.stop()
+
+    # a session run again with the same scheduler ticks again
+    scheduler.start()
+    assert scheduler.wait() == 0
+    assert scheduler.interval > 0
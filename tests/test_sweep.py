@@ -0,0 +1,114 @@
+"""
+Created on 18 oct. 2026
+
+@author: Valtyr Farshield
+"""
+
+import math
+import itertools
+
+import numpy
+import pytest
+
+from autoscanner.tools.capture import Frame
+from autoscanner.tools.diffengine import DiffEngine
+from autoscanner.tools.hysteresis import HysteresisGate
+from autoscanner.tools.mask import IgnoreMask
+from autoscanner.tools.recording import FrameRecorder
+from autoscanner.tools.region import Region
+from autoscanner.tools.sweep import ThresholdSweep, parse_values
+
+THRESHOLDS = [1.0, 2.0, 3.5]
+CLEAR_RATIOS = [0.5, 0.8, 1.0]
+DWELLS = [0.0, 0.3, 1.0]
+
+
+def noisy_session(seed=0, frames=400):
+    # irregular capture times, scores wandering around the thresholds
+    rng = numpy.random.RandomState(seed)
+    timestamps = 1000.0 + numpy.cumsum(rng.uniform(0.05, 0.25, frames))
+    scores = numpy.clip(2.0 + numpy.cumsum(rng.normal(0.0, 0.4, frames)) * 0.3, 0.0, None)
+    return timestamps, scores
+
+
+def replay_gate(gate, timestamps, scores, intervals):
+    # the same counts as ThresholdSweep.evaluate, from the events of a gate
+    elapsed = timestamps - timestamps[0]
+    false_positives = 0
+    detections = [float("nan")] * len(intervals)
+
+    for now, score in zip(elapsed[1:], scores[1:]):
+        for event, _ in gate.update({"main": (score, True)}, now):
+            expected = any(start <= now <= end for start, end in intervals)
+            if event == HysteresisGate.ENTER and not expected:
+                false_positives += 1
+
+        for j, (start, end) in enumerate(intervals):
+            if gate.active["main"] and start <= now <= end and math.isnan(detections[j]):
+                detections[j] = now
+
+    return false_positives, detections
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_sweep_matches_the_gate(seed):
+    timestamps, scores = noisy_session(seed)
+    intervals = [(5.0, 12.0), (30.0, 45.0)]
+
+    sweep = ThresholdSweep(THRESHOLDS, DWELLS, CLEAR_RATIOS)
+    false_positives, detections = sweep.evaluate(timestamps, scores[:, numpy.newaxis], intervals)
+
+    # the mask varies slowest, then the threshold, the clear ratio and the dwell
+    for i, (threshold, clear_ratio, dwell) in enumerate(itertools.product(THRESHOLDS, CLEAR_RATIOS, DWELLS)):
+        gate = HysteresisGate(clear_ratio, dwell)
+        gate.start([Region("main", 0, 0, 1, 1, threshold)])
+        gate_false_positives, gate_detections = replay_gate(gate, timestamps, scores, intervals)
+
+        assert false_positives[i] == gate_false_positives
+        numpy.testing.assert_array_equal(detections[i], gate_detections)
+
+
+def test_sweep_counts_alerts_without_labels():
+    timestamps, scores = noisy_session(3)
+    sweep = ThresholdSweep([2.0], [0.0], [0.8])
+    false_positives, detections = sweep.evaluate(timestamps, scores[:, numpy.newaxis], [])
+
+    gate = HysteresisGate(0.8)
+    gate.start([Region("main", 0, 0, 1, 1, 2.0)])
+    enters = sum(
+        event == HysteresisGate.ENTER
+        for now, score in zip(timestamps[1:], scores[1:])
+        for event, _ in gate.update({"main": (score, True)}, now)
+    )
+
+    assert detections.shape == (1, 0)
+    assert false_positives[0] == enters > 0
+
+
+def test_frame_scores_match_the_diff_engine(tmpdir):
+    rng = numpy.random.RandomState(0)
+    frames = [rng.randint(0, 256, (24, 32, 3)).astype(numpy.uint8) for _ in range(4)]
+    path = str(tmpdir.join("session.rec"))
+    recorder = FrameRecorder(path)
+    for i, pixels in enumerate(frames):
+        recorder.append(Frame.from_pixels(pixels, float(i)))
+    recorder.close()
+
+    rects = [(2, 3, 10, 8), (20, 0, 12, 24)]
+    sweep = ThresholdSweep([1.0], masks=[("none", [], None), ("rects", rects, None)])
+    timestamps, scores = sweep.frame_scores(path)
+
+    ignore_mask = IgnoreMask(32, 24)
+    for rect in rects:
+        ignore_mask.add_rect(*rect)
+    mask = DiffEngine.mask(ignore_mask.keep_buffer())
+
+    assert list(timestamps) == [0.0, 1.0, 2.0, 3.0]
+    for i, pixels in enumerate(frames):
+        assert scores[i, 0] == pytest.approx(DiffEngine.score(frames[0], pixels))
+        assert scores[i, 1] == pytest.approx(DiffEngine.score(frames[0], pixels, mask))
+
+
+def test_parse_values():
+    assert parse_values("1,2.5") == [1.0, 2.5]
+    assert parse_values("0.5:1.5:0.5") == pytest.approx([0.5, 1.0, 1.5])